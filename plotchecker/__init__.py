@@ -4,7 +4,14 @@ A set of utilities for testing matplotlib plots in an object-oriented manner.
 
 from ._version import version_info, __version__
 
-from .base import PlotChecker, InvalidPlotError
+from .base import PlotChecker, InvalidPlotError, MemoryBudgetError
 from .lineplot import LinePlotChecker
 from .scatterplot import ScatterPlotChecker
-from .barplot import BarPlotChecker
\ No newline at end of file
+from .barplot import BarPlotChecker
+from .histogram import HistogramChecker
+from .image import ImagePlotChecker
+from .mesh import MeshPlotChecker, ContourPlotChecker
+from .errorbar import ErrorbarPlotChecker
+from .fillbetween import FillBetweenPlotChecker
+from .phash import PlotHashIndex
+from .rubric import run_rubric, RubricResult
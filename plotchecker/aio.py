@@ -0,0 +1,126 @@
+"""
+Asynchronous versions of the plot checking functions, for use in an
+``asyncio`` event loop (e.g. in a web server that grades many submissions at
+once). These require Python 3.7 or later, and so are not imported by the
+top-level ``plotchecker`` package.
+
+Extracting and comparing plot data is CPU-bound, so the work is done in an
+executor rather than in the event loop itself. The work for a single plot is
+done one step at a time (constructing the checker, and then each rubric item
+in turn), so the steps never run concurrently on the same figure (matplotlib
+is not thread-safe), and a deadline or a cancellation takes effect between
+steps. A step that has already started in a thread cannot be interrupted,
+but its result is discarded.
+"""
+
+import asyncio
+
+from .rubric import run_rubric_item
+
+
+def _remaining(loop, timeout, deadline):
+    """The time left for the next step, given a per-step ``timeout`` and an
+    absolute ``deadline`` (in the time of the event loop), either of which
+    may be ``None``.
+
+    """
+    if deadline is None:
+        return timeout
+
+    remaining = deadline - loop.time()
+    if remaining <= 0:
+        raise asyncio.TimeoutError()
+    if timeout is None:
+        return remaining
+    return min(timeout, remaining)
+
+
+async def _run_in_executor(executor, timeout, deadline, func, *args):
+    loop = asyncio.get_running_loop()
+    return await asyncio.wait_for(
+        loop.run_in_executor(executor, func, *args),
+        _remaining(loop, timeout, deadline))
+
+
+async def make_checker(cls, axis, executor=None, timeout=None, deadline=None):
+    """Construct a plot checker in an executor.
+
+    Parameters
+    ----------
+    cls : subclass of :class:`~plotchecker.PlotChecker`
+        The type of plot checker, e.g. :class:`~plotchecker.LinePlotChecker`.
+    axis : ``matplotlib.axes.Axes`` object
+        The axes to check.
+    executor : ``concurrent.futures.Executor`` (default: ``None``)
+        The executor to run in (by default, the event loop's default
+        executor).
+    timeout : float (default: ``None``)
+        The maximum number of seconds to wait.
+    deadline : float (default: ``None``)
+        The time (according to ``loop.time()``) by which the checker must be
+        constructed.
+
+    Returns
+    -------
+    checker : instance of ``cls``
+
+    Raises
+    ------
+    asyncio.TimeoutError
+        If the checker could not be constructed in time.
+
+    """
+    return await _run_in_executor(executor, timeout, deadline, cls, axis)
+
+
+async def run_rubric(checker, rubric, executor=None, timeout=None, deadline=None):
+    """Check a plot against each item of a rubric (see
+    :func:`plotchecker.run_rubric`), running each item in an executor.
+
+    Parameters
+    ----------
+    checker : :class:`~plotchecker.PlotChecker`
+        The plot checker to run the rubric on.
+    rubric : list
+        The items of the rubric.
+    executor : ``concurrent.futures.Executor`` (default: ``None``)
+        The executor to run in (by default, the event loop's default
+        executor).
+    timeout : float (default: ``None``)
+        The maximum number of seconds to wait for each item.
+    deadline : float (default: ``None``)
+        The time (according to ``loop.time()``) by which the whole rubric
+        must be finished.
+
+    Returns
+    -------
+    results : list of :class:`~plotchecker.RubricResult`
+
+    Raises
+    ------
+    asyncio.TimeoutError
+        If any item takes longer than ``timeout``, or if the ``deadline``
+        passes before all the items have run.
+
+    """
+    results = []
+    for item in rubric:
+        results.append(await _run_in_executor(
+            executor, timeout, deadline, run_rubric_item, checker, item))
+    return results
+
+
+async def grade(cls, axis, rubric, executor=None, timeout=None, deadline=None):
+    """Construct a plot checker and run a rubric on it (see
+    :func:`~plotchecker.aio.make_checker` and
+    :func:`~plotchecker.aio.run_rubric`), all within the same ``deadline``.
+
+    Returns
+    -------
+    results : list of :class:`~plotchecker.RubricResult`
+
+    """
+    checker = await make_checker(
+        cls, axis, executor=executor, timeout=timeout, deadline=deadline)
+    return await run_rubric(
+        checker, rubric, executor=executor, timeout=timeout, deadline=deadline)
@@ -1,4 +1,8 @@
+import copy
+import matplotlib.container
+import matplotlib.patches
 import numpy as np
+import six
 
 from .base import PlotChecker, InvalidPlotError
 
@@ -6,22 +10,244 @@ from .base import PlotChecker, InvalidPlotError
 class BarPlotChecker(PlotChecker):
     """A plot checker for bar plots.
 
+    If the bars were created with ``bar`` (or anything else that produces a
+    ``matplotlib.container.BarContainer``), then only the patches belonging to
+    those containers are checked, and each container is treated as a separate
+    series of bars (see :meth:`~plotchecker.BarPlotChecker.get_series`).
+    Otherwise, all rectangular patches on the axes are checked, and bars that
+    are stacked on top of each other are treated as separate series.
+
+    Both vertical (``bar``) and horizontal (``barh``) bars are supported. The
+    :attr:`~plotchecker.BarPlotChecker.centers`,
+    :attr:`~plotchecker.BarPlotChecker.heights`,
+    :attr:`~plotchecker.BarPlotChecker.widths` and
+    :attr:`~plotchecker.BarPlotChecker.bottoms` always describe the geometry
+    of the bars in data coordinates, while
+    :attr:`~plotchecker.BarPlotChecker.positions`,
+    :attr:`~plotchecker.BarPlotChecker.lengths` and
+    :attr:`~plotchecker.BarPlotChecker.baselines` take the orientation of each
+    bar into account.
+
     Parameters
     ----------
     axis : ``matplotlib.axes.Axes`` object
         A set of matplotlib axes (e.g. obtained through ``plt.gca()``)
+    artists : list of matplotlib artists, optional
+        Only check these artists of the axes, rather than all of them (e.g.
+        to check one kind of data in a plot that combines several kinds).
+        The texts of the axes are always checked.
 
     """
 
-    def __init__(self, axis):
+    #: The layout of the table of bar geometry and style that is extracted
+    #: from the plotted patches.
+    _bar_dtype = np.dtype([
+        ('x', float),
+        ('y', float),
+        ('width', float),
+        ('height', float),
+        ('facecolor', float, (4,)),
+        ('edgecolor', float, (4,)),
+        ('alpha', float),
+        ('linewidth', float),
+        ('series', int),
+        ('index', int),
+        ('horizontal', bool),
+        ('position', float),
+        ('length', float),
+        ('baseline', float)
+    ])
+
+    _snapshot_attrs = PlotChecker._snapshot_attrs + ('_patch_legend_labels',)
+    _snapshot_state = ('_bars',)
+
+    def __init__(self, axis, artists=None):
         """Initialize the bar plot checker."""
-        super(BarPlotChecker, self).__init__(axis)
-        self._patches = np.array(self.axis.patches)
-        self._patches = self._patches[np.argsort([p.get_x() for p in self._patches])]
+        super(BarPlotChecker, self).__init__(axis, artists=artists)
+
+        containers = self._get_artists(
+            'containers', matplotlib.container.BarContainer)
+
+        if len(containers) > 0:
+            patches = [p for c in containers for p in c.patches]
+            owners = [c for c in containers for p in c.patches]
+            sizes = [len(c.patches) for c in containers]
+            series = np.repeat(np.arange(len(containers)), sizes)
+
+            # older versions of matplotlib don't record the orientation
+            orientations = [getattr(c, 'orientation', None) for c in containers]
+            if None in orientations:
+                horizontal = None
+            else:
+                horizontal = np.repeat(
+                    np.array(orientations) == 'horizontal', sizes)
 
-        if len(self._patches) == 0:
+        else:
+            patches = self._get_artists('patches', matplotlib.patches.Rectangle)
+            owners = patches
+            series = None
+            horizontal = None
+
+        self._check_memory(len(patches) * self._bar_dtype.itemsize, "The bars")
+        self._bars = self._extract_bars(
+            patches, series=series, horizontal=horizontal)
+
+        # the artists that each bar is listed under in the legend
+        self._owners = owners
+
+        if len(self._bars) == 0:
             raise InvalidPlotError("no data found")
 
+    @classmethod
+    def _extract_bars(cls, patches, series=None, horizontal=None):
+        """Extract the geometry and style of the given patches into a single
+        record array (with dtype ``_bar_dtype``), sorted by the positions of
+        the bars (and then by their baselines).
+
+        If ``horizontal`` is not given, then the orientation of the bars is
+        inferred from their geometry. If ``series`` is not given, then each
+        bar is assigned to a series according to its
+        :meth:`~plotchecker.BarPlotChecker._stack_levels`.
+
+        """
+        bars = np.empty(len(patches), dtype=cls._bar_dtype)
+        if len(bars) == 0:
+            return bars
+
+        # this is the only place where we iterate over the patches; everything
+        # else is computed from the resulting table
+        bars['x'], bars['y'], bars['width'], bars['height'] = np.array(
+            [(p.get_x(), p.get_y(), p.get_width(), p.get_height())
+             for p in patches], dtype=float).T
+        bars['facecolor'] = [p.get_facecolor() for p in patches]
+        bars['edgecolor'] = [p.get_edgecolor() for p in patches]
+        bars['linewidth'] = [p.get_linewidth() for p in patches]
+        bars['index'] = np.arange(len(patches))
+
+        # if the alpha was not set explicitly, then it is whatever the alpha
+        # of the face color is
+        alphas = np.array([p.get_alpha() for p in patches], dtype=float)
+        bars['alpha'] = np.where(
+            np.isnan(alphas), bars['facecolor'][:, 3], alphas)
+
+        if horizontal is None:
+            horizontal = cls._infer_horizontal(bars)
+        bars['horizontal'] = horizontal
+
+        # compute the orientation-neutral geometry of the bars
+        h = bars['horizontal']
+        bars['position'] = np.where(
+            h, bars['y'] + (bars['height'] / 2), bars['x'] + (bars['width'] / 2))
+        bars['length'] = np.where(h, bars['width'], bars['height'])
+        bars['baseline'] = np.where(h, bars['x'], bars['y'])
+
+        if series is None:
+            bars['series'] = cls._stack_levels(bars)
+        else:
+            bars['series'] = series
+
+        return bars[np.lexsort((bars['baseline'], bars['position']))]
+
+    @classmethod
+    def _infer_horizontal(cls, bars):
+        """Guess which of the given bars are horizontal, based on their
+        geometry. A bar looks vertical if it is stacked on (or under) another
+        bar with the same left edge and width, or if it has the same bottom
+        as a bar at a different x-value; and it looks horizontal if it is
+        stacked next to another bar with the same bottom and height, or if it
+        has the same left edge as a bar at a different y-value.
+
+        Bars that look like both (or neither) take the orientation of the
+        majority of the other bars. If there is no majority, then the bars
+        are assumed to have a common thickness, so they are horizontal if
+        there are fewer distinct heights than widths, and vertical otherwise.
+
+        """
+        x, y, w, h = bars['x'], bars['y'], bars['width'], bars['height']
+        vertical = cls._touching(x, w, y, y + h) | cls._shared_edges(y, x)
+        horizontal = cls._touching(y, h, x, x + w) | cls._shared_edges(x, y)
+
+        num_vertical = np.sum(vertical & ~horizontal)
+        num_horizontal = np.sum(horizontal & ~vertical)
+        if num_vertical != num_horizontal:
+            default = num_horizontal > num_vertical
+        else:
+            default = len(np.unique(h)) < len(np.unique(w))
+
+        ambiguous = vertical == horizontal
+        horizontal = horizontal & ~vertical
+        horizontal[ambiguous] = default
+        return horizontal
+
+    @classmethod
+    def _group_ids(cls, *keys):
+        """Number the distinct combinations of the given keys (1-D arrays of
+        the same length), returning the number of each element's combination
+        (in sorted order) and the number of combinations.
+
+        """
+        order = np.lexsort(keys[::-1])
+        new = np.zeros(len(order), dtype=bool)
+        new[:1] = True
+        for key in keys:
+            key = key[order]
+            new[1:] |= key[1:] != key[:-1]
+        ids = np.empty(len(order), dtype=int)
+        ids[order] = np.cumsum(new) - 1
+        return ids, int(new.sum())
+
+    @classmethod
+    def _touching(cls, edges, sizes, starts, ends):
+        """For each bar, whether another bar with the same edge and size (e.g.
+        left edge and width) starts where it ends, or ends where it starts,
+        i.e. whether the bar is stacked on another bar.
+
+        """
+        starts, ends = np.minimum(starts, ends), np.maximum(starts, ends)
+        groups, _ = cls._group_ids(edges, sizes)
+
+        # number the values of the starts and ends together, so that each
+        # (group, start) and (group, end) pair has a single integer key
+        _, values = np.unique(np.concatenate([starts, ends]), return_inverse=True)
+        values = values.ravel()
+        num_values = values.max() + 1
+        start_keys = groups * num_values + values[:len(starts)]
+        end_keys = groups * num_values + values[len(starts):]
+        return np.isin(start_keys, end_keys) | np.isin(end_keys, start_keys)
+
+    @classmethod
+    def _shared_edges(cls, edges, positions):
+        """For each bar, whether another bar at a different position has the
+        same edge (e.g. whether bars at different x-values have the same
+        bottom).
+
+        """
+        groups, num_groups = cls._group_ids(edges)
+        pairs, num_pairs = cls._group_ids(groups, positions)
+
+        # count the distinct positions with each edge
+        first = np.zeros(num_pairs, dtype=int)
+        first[pairs] = groups
+        counts = np.bincount(first, minlength=num_groups)
+        return counts[groups] > 1
+
+    @classmethod
+    def _stack_levels(cls, bars):
+        """Compute how far up its stack each bar is, i.e. for each bar, the
+        number of bars that have the same position but a lower baseline.
+
+        """
+        _, groups = np.unique(bars['position'], return_inverse=True)
+        groups = groups.ravel()
+
+        # sort the bars by stack and then by baseline, so the level of each bar
+        # is just its offset from the start of its stack
+        order = np.lexsort((bars['baseline'], groups))
+        starts = np.concatenate([[0], np.cumsum(np.bincount(groups))[:-1]])
+        levels = np.empty(len(bars), dtype=int)
+        levels[order] = np.arange(len(bars)) - starts[groups[order]]
+        return levels
+
     def _parse_expected_attr(self, attr_name, attr_val):
         """Ensure that the given expected attribute values are in the right shape."""
         if attr_name in ('colors', 'edgecolors'):
@@ -33,14 +259,14 @@ class BarPlotChecker(PlotChecker):
             except (ValueError, TypeError):
                 attr_val = np.array([self._color2rgb(x) for x in attr_val])
 
-        elif not hasattr(attr_val, '__iter__'):
+        elif isinstance(attr_val, six.string_types) or not hasattr(attr_val, '__iter__'):
             # if it's not a color, then just make sure we have an array
             attr_val = np.array([attr_val])
 
         # tile the given values if we've only been given one, so it's the same
         # shape as the data
         if len(attr_val) == 1:
-            attr_val = self._tile_or_trim(self.centers, attr_val)
+            attr_val = self._tile_or_trim(self._bars, attr_val)
 
         return attr_val
 
@@ -52,15 +278,76 @@ class BarPlotChecker(PlotChecker):
         num_bars : int
 
         """
-        if num_bars != len(self._patches):
+        if num_bars != len(self._bars):
             raise AssertionError(
                 "Plot has incorrect number of bars: {} (expected {})".format(
-                    len(self._patches), num_bars))
+                    len(self._bars), num_bars))
+
+    @property
+    def num_series(self):
+        """The number of series of plotted bars."""
+        return len(np.unique(self._bars['series']))
+
+    def assert_num_series(self, num_series):
+        """Assert that the plot has the given number of series of bars.
+
+        Parameters
+        ----------
+        num_series : int
+
+        """
+        if num_series != self.num_series:
+            raise AssertionError(
+                "Plot has incorrect number of series: {} (expected {})".format(
+                    self.num_series, num_series))
+
+    @property
+    def series(self):
+        """The index of the series that each plotted bar belongs to."""
+        return np.unique(self._bars['series'], return_inverse=True)[1].ravel()
+
+    def get_series(self, index):
+        """Get a plot checker for just one series of bars, e.g. one group of a
+        grouped bar chart, or one layer of a stacked bar chart.
+
+        Parameters
+        ----------
+        index : int
+            The index of the series, in the order that the series were plotted
+            (or, for stacked bars that are not part of a ``BarContainer``, the
+            index of the layer counting from the bottom).
+
+        Returns
+        -------
+        checker : :class:`~plotchecker.BarPlotChecker`
+
+        Examples
+        --------
+
+        .. code:: python
+
+            fig, ax = plt.subplots()
+            ax.bar(x, y1, color='r')
+            ax.bar(x, y2, bottom=y1, color='b')
+
+            pc = BarPlotChecker(ax)
+            pc.assert_num_series(2)
+            pc.get_series(0).assert_heights_equal(y1)
+            pc.get_series(1).assert_bottoms_equal(y1)
+
+        """
+        bars = self._bars[self.series == index]
+        if len(bars) == 0:
+            raise InvalidPlotError("no series with index {}".format(index))
+
+        checker = copy.copy(self)
+        checker._bars = bars
+        return checker
 
     @property
     def centers(self):
         """The centers of the plotted bars."""
-        return np.array([p.get_x() + (p.get_width() / 2) for p in self._patches])
+        return self._bars['x'] + (self._bars['width'] / 2)
 
     def assert_centers_equal(self, centers):
         """Assert that the given centers are equivalent to the plotted
@@ -101,7 +388,7 @@ class BarPlotChecker(PlotChecker):
     @property
     def heights(self):
         """The heights of the plotted bars."""
-        return np.array([p.get_height() for p in self._patches])
+        return self._bars['height']
 
     def assert_heights_equal(self, heights):
         """Assert that the given heights are equivalent to the plotted
@@ -142,7 +429,7 @@ class BarPlotChecker(PlotChecker):
     @property
     def widths(self):
         """The widths of the plotted bars."""
-        return np.array([p.get_width() for p in self._patches])
+        return self._bars['width']
 
     def assert_widths_equal(self, widths):
         """Assert that the given widths are equivalent to the plotted
@@ -183,7 +470,7 @@ class BarPlotChecker(PlotChecker):
     @property
     def bottoms(self):
         """The y-coordinates of the bottoms of the plotted bars."""
-        return np.array([p.get_y() for p in self._patches])
+        return self._bars['y']
 
     def assert_bottoms_equal(self, bottoms):
         """Assert that the given bottoms are equivalent to the plotted
@@ -221,10 +508,160 @@ class BarPlotChecker(PlotChecker):
             self._parse_expected_attr("bottoms", bottoms),
             **kwargs)
 
+    @property
+    def orientations(self):
+        """The orientation of each plotted bar (either ``'vertical'`` or
+        ``'horizontal'``)."""
+        return np.where(self._bars['horizontal'], 'horizontal', 'vertical')
+
+    def assert_orientations_equal(self, orientations):
+        """Assert that the given orientations are equivalent to the plotted
+        :attr:`~plotchecker.BarPlotChecker.orientations`.
+
+        Parameters
+        ----------
+        orientations : string, or list of strings
+            The expected orientations (``'vertical'`` or ``'horizontal'``). The
+            number of elements should be equal to the (expected) number of
+            plotted bars, or just a single value (which will then be applied to
+            all bars).
+
+        """
+        np.testing.assert_equal(
+            self.orientations,
+            self._parse_expected_attr("orientations", orientations))
+
+    @property
+    def positions(self):
+        """The positions of the plotted bars along the axis the bars are placed
+        on, i.e. the centers of vertical bars along the x-axis, or the centers of
+        horizontal bars along the y-axis."""
+        return self._bars['position']
+
+    def assert_positions_equal(self, positions):
+        """Assert that the given positions are equivalent to the plotted
+        :attr:`~plotchecker.BarPlotChecker.positions`.
+
+        Parameters
+        ----------
+        positions : 1-D array-like
+            The expected positions. The number of elements should be equal to the
+            (expected) number of plotted bars, or just a single value (which
+            will then be applied to all bars).
+
+        """
+        np.testing.assert_equal(
+            self.positions,
+            self._parse_expected_attr("positions", positions))
+
+    def assert_positions_allclose(self, positions, **kwargs):
+        """Assert that the given positions are almost equal to the plotted
+        :attr:`~plotchecker.BarPlotChecker.positions`.
+
+        Parameters
+        ----------
+        positions : 1-D array-like
+            The expected positions. The number of elements should be equal to the
+            (expected) number of plotted bars, or just a single value (which
+            will then be applied to all bars).
+        kwargs :
+            Additional keyword arguments to pass to
+            ``numpy.testing.assert_allclose``
+
+        """
+        np.testing.assert_allclose(
+            self.positions,
+            self._parse_expected_attr("positions", positions),
+            **kwargs)
+
+    @property
+    def lengths(self):
+        """The lengths of the plotted bars along the value axis, i.e. the heights
+        of vertical bars, or the widths of horizontal bars."""
+        return self._bars['length']
+
+    def assert_lengths_equal(self, lengths):
+        """Assert that the given lengths are equivalent to the plotted
+        :attr:`~plotchecker.BarPlotChecker.lengths`.
+
+        Parameters
+        ----------
+        lengths : 1-D array-like
+            The expected lengths. The number of elements should be equal to the
+            (expected) number of plotted bars, or just a single value (which
+            will then be applied to all bars).
+
+        """
+        np.testing.assert_equal(
+            self.lengths,
+            self._parse_expected_attr("lengths", lengths))
+
+    def assert_lengths_allclose(self, lengths, **kwargs):
+        """Assert that the given lengths are almost equal to the plotted
+        :attr:`~plotchecker.BarPlotChecker.lengths`.
+
+        Parameters
+        ----------
+        lengths : 1-D array-like
+            The expected lengths. The number of elements should be equal to the
+            (expected) number of plotted bars, or just a single value (which
+            will then be applied to all bars).
+        kwargs :
+            Additional keyword arguments to pass to
+            ``numpy.testing.assert_allclose``
+
+        """
+        np.testing.assert_allclose(
+            self.lengths,
+            self._parse_expected_attr("lengths", lengths),
+            **kwargs)
+
+    @property
+    def baselines(self):
+        """The baselines of the plotted bars along the value axis, i.e. the bottoms
+        of vertical bars, or the left edges of horizontal bars."""
+        return self._bars['baseline']
+
+    def assert_baselines_equal(self, baselines):
+        """Assert that the given baselines are equivalent to the plotted
+        :attr:`~plotchecker.BarPlotChecker.baselines`.
+
+        Parameters
+        ----------
+        baselines : 1-D array-like
+            The expected baselines. The number of elements should be equal to the
+            (expected) number of plotted bars, or just a single value (which
+            will then be applied to all bars).
+
+        """
+        np.testing.assert_equal(
+            self.baselines,
+            self._parse_expected_attr("baselines", baselines))
+
+    def assert_baselines_allclose(self, baselines, **kwargs):
+        """Assert that the given baselines are almost equal to the plotted
+        :attr:`~plotchecker.BarPlotChecker.baselines`.
+
+        Parameters
+        ----------
+        baselines : 1-D array-like
+            The expected baselines. The number of elements should be equal to the
+            (expected) number of plotted bars, or just a single value (which
+            will then be applied to all bars).
+        kwargs :
+            Additional keyword arguments to pass to
+            ``numpy.testing.assert_allclose``
+
+        """
+        np.testing.assert_allclose(
+            self.baselines,
+            self._parse_expected_attr("baselines", baselines),
+            **kwargs)
+
     @property
     def colors(self):
         """The colors of the plotted bars."""
-        return np.array([self._color2rgb(p.get_facecolor()) for p in self._patches])
+        return self._bars['facecolor'][:, :3]
 
     def assert_colors_equal(self, colors):
         """Assert that the given colors are equivalent to the plotted
@@ -265,7 +702,7 @@ class BarPlotChecker(PlotChecker):
     @property
     def edgecolors(self):
         """The edge colors of the plotted bars."""
-        return np.array([self._color2rgb(p.get_edgecolor()) for p in self._patches])
+        return self._bars['edgecolor'][:, :3]
 
     def assert_edgecolors_equal(self, edgecolors):
         """Assert that the given edgecolors are equivalent to the plotted
@@ -306,16 +743,7 @@ class BarPlotChecker(PlotChecker):
     @property
     def alphas(self):
         """The alpha values of the plotted bars."""
-        all_alphas = []
-
-        for p in self._patches:
-            if p.get_alpha() is None:
-                alpha = self._color2alpha(p.get_facecolor())
-            else:
-                alpha = p.get_alpha()
-            all_alphas.append(alpha)
-
-        return np.array(all_alphas)
+        return self._bars['alpha']
 
     def assert_alphas_equal(self, alphas):
         """Assert that the given alphas are equivalent to the plotted
@@ -356,7 +784,7 @@ class BarPlotChecker(PlotChecker):
     @property
     def linewidths(self):
         """The line widths of the plotted bars."""
-        return np.array([p.get_linewidth() for p in self._patches])
+        return self._bars['linewidth']
 
     def assert_linewidths_equal(self, linewidths):
         """Assert that the given linewidths are equivalent to the plotted
@@ -394,3 +822,37 @@ class BarPlotChecker(PlotChecker):
             self._parse_expected_attr("linewidths", linewidths),
             **kwargs)
 
+    @property
+    def legend_labels(self):
+        """The legend label of each plotted bar, or ``None`` for bars that
+        are not in the legend. Bars created with ``bar`` have the label of
+        the series that they belong to.
+
+        """
+        return self._patch_legend_labels[self._bars['index']]
+
+    @property
+    def _patch_legend_labels(self):
+        """The legend labels of all the bars, in the order in which they were
+        extracted (rather than in the order of
+        :attr:`~plotchecker.BarPlotChecker.legend_labels`).
+
+        """
+        index = self._legend_index
+        return np.array([index.get(id(x)) for x in self._owners], dtype=object)
+
+    def assert_legend_labels_equal(self, legend_labels):
+        """Assert that the given legend labels are equivalent to the plotted
+        :attr:`~plotchecker.BarPlotChecker.legend_labels`.
+
+        Parameters
+        ----------
+        legend_labels :
+            The expected legend labels. This should either be a single label
+            (which will apply to all the bars) or an array with size equal to
+            the number of (expected) bars.
+
+        """
+        np.testing.assert_equal(
+            self.legend_labels,
+            self._parse_expected_attr("legend_labels", legend_labels))
@@ -1,11 +1,35 @@
 from __future__ import division
 
+import collections
+import copy
+import datetime
+import functools
+import pickle
+import threading
+import types
+
 import matplotlib
+import matplotlib.axes
+import matplotlib.axis
+import matplotlib.collections
 import matplotlib.colors
+import matplotlib.container
+import matplotlib.contour
+import matplotlib.dates
+import matplotlib.image
+import matplotlib.lines
 import matplotlib.markers
+import matplotlib.patches
+import matplotlib.spines
+import matplotlib.text
 import numpy as np
 import six
 import warnings
+from timeit import default_timer
+
+from . import metrics
+from .raster import artist_version, axis_raster, as_image, rms, ssim
+from .phash import perceptual_hash
 
 
 try:
@@ -21,6 +45,104 @@ class InvalidPlotError(Exception):
     pass
 
 
+class MemoryBudgetError(MemoryError):
+    """Raised when checking a plot would need more memory than the
+    ``memory_budget`` of the plot checker allows. This is a limit of the
+    grader rather than a problem with the plot, so it is not an
+    :class:`~plotchecker.InvalidPlotError`.
+
+    """
+    pass
+
+
+def _restore_snapshot(cls, frozen, state):
+    """Create a snapshot of a plot checker of type ``cls`` from the values of
+    its properties (``frozen``) and its other attributes (``state``). This is
+    used to unpickle plot checkers.
+
+    """
+    checker = cls._snapshot_class().__new__(cls._snapshot_class())
+    checker._frozen = frozen
+    checker._artist_index = None
+    checker._legend_labels = None
+    checker.__dict__.update(state)
+    return checker
+
+
+#: The assertions that are running in each thread, so that assertions that
+#: are called by other assertions aren't recorded separately.
+_assertions = threading.local()
+
+
+def _instrument_assertion(name, func):
+    """Wrap the assertion method ``func`` so that it records how many times
+    it is called, whether it passes, and how long it takes (see
+    :mod:`plotchecker.metrics`).
+
+    """
+    @functools.wraps(func)
+    def assertion(self, *args, **kwargs):
+        if getattr(_assertions, 'running', False):
+            return func(self, *args, **kwargs)
+
+        labels = {'checker': type(self).__name__, 'assertion': name}
+        start = default_timer()
+        result = 'error'
+        _assertions.running = True
+        try:
+            value = func(self, *args, **kwargs)
+        except (AssertionError, InvalidPlotError):
+            result = 'failed'
+            raise
+        except MemoryBudgetError:
+            result = 'over_budget'
+            raise
+        else:
+            result = 'passed'
+        finally:
+            _assertions.running = False
+            metrics.registry.observe(
+                'plotchecker_assertion_seconds', default_timer() - start, labels)
+            metrics.registry.inc(
+                'plotchecker_assertions_total', dict(labels, result=result))
+        return value
+    return assertion
+
+
+class _CheckerType(type):
+    """The type of plot checkers, which records how many checkers are
+    constructed and how long it takes, and how many times each of their
+    assertions (i.e. their ``assert_*`` methods) are called, whether they
+    pass, and how long they take (see :mod:`plotchecker.metrics`).
+
+    """
+
+    def __init__(cls, name, bases, attrs):
+        super(_CheckerType, cls).__init__(name, bases, attrs)
+        for attr, value in attrs.items():
+            if attr.startswith('assert_') and isinstance(value, types.FunctionType):
+                setattr(cls, attr, _instrument_assertion(attr, value))
+
+    def __call__(cls, *args, **kwargs):
+        labels = {'checker': cls.__name__}
+        start = default_timer()
+        result = 'error'
+        try:
+            checker = type.__call__(cls, *args, **kwargs)
+        except InvalidPlotError:
+            result = 'invalid'
+            raise
+        else:
+            result = 'ok'
+        finally:
+            metrics.registry.observe(
+                'plotchecker_extraction_seconds', default_timer() - start, labels)
+            metrics.registry.inc(
+                'plotchecker_checkers_total', dict(labels, result=result))
+        return checker
+
+
+@six.add_metaclass(_CheckerType)
 class PlotChecker(object):
     """A generic object to test plots.
 
@@ -28,14 +150,551 @@ class PlotChecker(object):
     ----------
     axis : ``matplotlib.axes.Axes`` object
         A set of matplotlib axes (e.g. obtained through ``plt.gca()``)
+    artists : list of matplotlib artists, optional
+        Only check these artists of the axes, rather than all of them (e.g.
+        to check one kind of data in a plot that combines several kinds).
+        The texts of the axes are always checked.
 
     """
 
     _named_colors = _named_colors
 
-    def __init__(self, axis):
+    #: The (approximate) number of array elements that are compared at a
+    #: time when comparing large arrays
+    _chunk_size = 2 ** 20
+
+    #: The maximum number of bytes that the checker may allocate for the
+    #: data it extracts from the plot, and for comparing it (``None`` for no
+    #: limit). This can be set on a single checker, or on a whole class of
+    #: checkers, and is kept by snapshots of the checker. Data that wouldn't
+    #: fit is compared in chunks if possible, and otherwise a
+    #: :class:`~plotchecker.MemoryBudgetError` is raised, rather than running
+    #: out of memory.
+    memory_budget = None
+
+    #: The number of arrays the size of the data that are needed to compare
+    #: it (the data itself, and the temporaries of the comparison).
+    _compare_arrays = 4
+
+    #: Whether to compare data in single precision (float32) when checking
+    #: that it is almost equal, which halves the memory traffic for large
+    #: data. The results are the same as in double precision: any elements
+    #: that are too close to the tolerance to be decided in single precision
+    #: (including NaNs, infinities, and values that overflow) are checked
+    #: again in double precision. This can be set on a single checker, or on a
+    #: whole class of checkers, and is kept by snapshots of the checker.
+    reduced_precision = False
+
+    #: Whether to check that the x- and y-data are almost equal after
+    #: applying the scales of the axes (e.g. after taking the logarithm, on a
+    #: log scale), so that the tolerances apply to positions in the plot
+    #: rather than to the raw values. The expected data is transformed once
+    #: per comparison, and the transformed plotted data is cached. This can
+    #: be set on a single checker, or on a whole class of checkers, and is
+    #: kept by snapshots of the checker (along with the scales of the axes).
+    scaled_comparison = False
+
+    #: The categories that the artists in the plot are sorted into by
+    #: ``_index_artists``. Each artist goes into the first category whose
+    #: type it is an instance of.
+    _artist_categories = (
+        ('lines', matplotlib.lines.Line2D),
+        ('images', matplotlib.image.AxesImage),
+        ('collections', matplotlib.collections.Collection),
+        ('patches', matplotlib.patches.Patch),
+        ('texts', matplotlib.text.Text),
+    )
+
+    #: The properties that are evaluated and stored when the checker is
+    #: pickled (see :meth:`~plotchecker.PlotChecker.snapshot`). Any other
+    #: properties must be computable from these and from ``_snapshot_state``.
+    _snapshot_attrs = (
+        'title', 'xlabel', 'ylabel', 'xlim', 'ylim', 'xticks', 'yticks',
+        'xticklabels', 'yticklabels', 'textlabels', 'textpoints', '_scales')
+
+    #: The attributes that are copied as they are when the checker is pickled.
+    #: These must not refer to any matplotlib objects.
+    _snapshot_state = ()
+
+    #: The options of the checker (which may be set on the checker itself,
+    #: or on its class) that are copied to its snapshots, so that the
+    #: snapshots check the plot in the same way.
+    _snapshot_options = ('memory_budget', 'reduced_precision', 'scaled_comparison')
+
+    def __init__(self, axis, artists=None):
         """Initialize the PlotChecker object."""
         self.axis = axis
+        self._artist_index = None
+        self._legend_labels = None
+        if artists is not None:
+            self._artist_index = self._index_artists(axis, artists)
+
+    def __reduce__(self):
+        """Pickle the checker as a snapshot (see
+        :meth:`~plotchecker.PlotChecker.snapshot`), rather than pickling the
+        whole figure that it refers to.
+
+        """
+        cls = getattr(type(self), '_snapshot_of', type(self))
+        frozen = {}
+        for name in cls._snapshot_attrs:
+            try:
+                frozen[name] = getattr(self, name)
+            except Exception as e:
+                frozen[name] = e
+        state = dict((name, getattr(self, name)) for name in cls._snapshot_state)
+        state.update((name, getattr(self, name)) for name in cls._snapshot_options)
+        return _restore_snapshot, (cls, frozen, state)
+
+    def __copy__(self):
+        # copy the checker itself, rather than its snapshot
+        checker = type(self).__new__(type(self))
+        checker.__dict__.update(self.__dict__)
+        return checker
+
+    def __deepcopy__(self, memo):
+        # copy the checker itself (including the figure that it refers to),
+        # rather than its snapshot
+        checker = type(self).__new__(type(self))
+        memo[id(self)] = checker
+        checker.__dict__.update(copy.deepcopy(self.__dict__, memo))
+
+        # the legend index is keyed by the ids of the original artists
+        checker._legend_labels = None
+        return checker
+
+    def snapshot(self):
+        """Create a snapshot of the checker, which holds just the data that
+        has been extracted from the plot rather than the matplotlib objects.
+
+        The snapshot can be used in the same way as the original checker,
+        except that it isn't affected by later changes to the plot, and
+        attributes that aren't part of the snapshot (such as the
+        :attr:`~plotchecker.PlotChecker.raster` of the plot) are not
+        available. Pickling a checker also pickles just its snapshot, so
+        checkers can be sent to other processes cheaply.
+
+        Returns
+        -------
+        snapshot : subclass of the type of this checker
+
+        """
+        func, args = self.__reduce__()
+        return func(*args)
+
+    @classmethod
+    def _snapshot_class(cls):
+        """The class of snapshots of this type of checker: a subclass of this
+        class, whose ``_snapshot_attrs`` return their stored values, and which
+        has no ``axis``.
+
+        """
+        if '_snapshot_cls' not in cls.__dict__:
+            def frozen_property(name):
+                def get(self):
+                    value = self._frozen[name]
+                    if isinstance(value, Exception):
+                        raise value
+                    return value
+                return property(get, doc=getattr(cls, name).__doc__)
+
+            def axis(self):
+                raise InvalidPlotError(
+                    "This is a snapshot of a plot checker, so the plot itself is not available")
+
+            attrs = dict((name, frozen_property(name)) for name in cls._snapshot_attrs)
+            attrs['axis'] = property(axis)
+            attrs['_snapshot_of'] = cls
+            attrs['__module__'] = cls.__module__
+            attrs['__doc__'] = cls.__doc__
+            cls._snapshot_cls = type(cls.__name__, (cls,), attrs)
+
+        return cls._snapshot_cls
+
+    @classmethod
+    def _index_artists(cls, axis, artists=None):
+        """Sort all the artists in the given axis (or only the given
+        ``artists`` of the axis, plus its texts) into categories (see
+        ``_artist_categories``) with a single pass over its children. Artists
+        that are part of the axes themselves (the background patch, spines
+        and titles) are not included.
+
+        Returns
+        -------
+        index : dict
+            A dictionary mapping each category name to a list of artists, in
+            the order they were added to the axes, plus a ``'containers'``
+            entry with the containers (e.g. from ``bar`` or ``errorbar``) of
+            the axes (only those with any of the given ``artists``, if any).
+
+        """
+        index = dict((name, []) for name, _ in cls._artist_categories)
+        index['containers'] = list(axis.containers)
+        if artists is not None:
+            included = set(id(x) for x in artists)
+            index['containers'] = [
+                c for c in index['containers']
+                if any(id(x) in included for x in c.get_children())]
+
+        excluded = set([id(axis.patch), id(axis.title)])
+        excluded.update(id(x) for x in axis.spines.values())
+        for name in ('_left_title', '_right_title'):
+            if hasattr(axis, name):
+                excluded.add(id(getattr(axis, name)))
+
+        for artist in axis.get_children():
+            if id(artist) in excluded:
+                continue
+            if artists is not None and id(artist) not in included and \
+                    not isinstance(artist, matplotlib.text.Text):
+                continue
+            for name, artist_type in cls._artist_categories:
+                if isinstance(artist, artist_type):
+                    index[name].append(artist)
+                    break
+
+        return index
+
+    @property
+    def _artists(self):
+        """The index of the artists in the plot (see ``_index_artists``),
+        which is computed the first time it is needed.
+
+        """
+        if self._artist_index is None:
+            # reuse the index from the checker cache, if it's still valid
+            cache = getattr(self.axis, '_plotchecker_cache', None)
+            if cache is not None and cache['signature'] == self._artist_signature(self.axis):
+                self._artist_index = cache['index']
+            else:
+                self._artist_index = self._index_artists(self.axis)
+        return self._artist_index
+
+    @classmethod
+    def _artist_signature(cls, axis):
+        """A signature of the state of the artists in the given axis, which
+        changes whenever an artist is added or removed, or whenever an artist
+        is modified (see :func:`~plotchecker.raster.artist_version`). The
+        axis objects (which hold the ticks) are not included, as they are not
+        extracted.
+
+        """
+        return tuple(
+            (id(x), artist_version(x)) for x in axis.get_children()
+            if not isinstance(x, matplotlib.axis.Axis))
+
+    @classmethod
+    def cached(cls, axis):
+        """Get a checker of this type for the given axis, reusing the checker
+        from a previous call (along with any data it has already extracted) if
+        the plot has not changed since then. This is useful when many separate
+        tests each need a checker for the same axis.
+
+        The cache is stored on the axis itself, so it is freed along with the
+        figure. The cache is invalidated when any artist is added, removed,
+        or modified (which matplotlib marks by flagging the artist as stale),
+        even if the figure has been drawn in the meantime.
+
+        Note that the same checker object is returned each time, so any state
+        that is set on it (such as the permutation found by
+        :meth:`~plotchecker.LinePlotChecker.find_permutation`) is shared too.
+
+        Parameters
+        ----------
+        axis : ``matplotlib.axes.Axes`` object
+            A set of matplotlib axes (e.g. obtained through ``plt.gca()``)
+
+        Returns
+        -------
+        checker : instance of this class
+
+        """
+        cache = cls._checker_cache(axis)
+
+        # also remember if the plot is invalid for this type of checker, so
+        # the extraction isn't repeated just to raise the same error
+        if cls not in cache['checkers']:
+            try:
+                cache['checkers'][cls] = cls(axis)
+            except InvalidPlotError as e:
+                cache['checkers'][cls] = e
+
+        checker = cache['checkers'][cls]
+        if isinstance(checker, InvalidPlotError):
+            raise checker
+        return checker
+
+    @classmethod
+    def _checker_cache(cls, axis):
+        """Get the checker cache of the given axis (see
+        :meth:`~plotchecker.PlotChecker.cached`), creating it (or recreating
+        it, if the plot has changed) if necessary.
+
+        """
+        cache = getattr(axis, '_plotchecker_cache', None)
+        if cache is None or cache['signature'] != cls._artist_signature(axis):
+            cache = {
+                'signature': cls._artist_signature(axis),
+                'index': cls._index_artists(axis),
+                'checkers': {}
+            }
+            axis._plotchecker_cache = cache
+        return cache
+
+    @classmethod
+    def detect(cls, axis):
+        """Detect what kind of plot is in the given axis, and get the plot
+        checkers for it.
+
+        The type of plot is inferred from the artists in the axis (e.g. lines
+        with markers but no line style are a scatter plot). Plots that
+        combine several kinds of data (e.g. bars with a line on top) get one
+        checker for each kind, as long as that checker accepts the plot, and
+        each checker only checks the artists of its own kind (e.g. the line
+        checker doesn't include the bars, or the lines of any error bars).
+
+        The checkers are cached on the axis in the same way as by
+        :meth:`~plotchecker.PlotChecker.cached`, so the artists are only
+        indexed once, and later calls return the same checkers (along with
+        the data they have already extracted) until the plot is changed. As
+        the checkers only include some of the artists, they are separate from
+        the checkers returned by ``cached``.
+
+        Histograms that are drawn as bars can't be told apart from bar plots,
+        so they are detected as bar plots; use
+        :class:`~plotchecker.HistogramChecker` directly to check them as
+        histograms.
+
+        Parameters
+        ----------
+        axis : ``matplotlib.axes.Axes`` object
+            A set of matplotlib axes (e.g. obtained through ``plt.gca()``)
+
+        Returns
+        -------
+        checkers : list of :class:`~plotchecker.PlotChecker`
+
+        Raises
+        ------
+        InvalidPlotError
+            If no kind of plot could be detected.
+
+        """
+        cache = cls._checker_cache(axis)
+        if 'detected' not in cache:
+            cache['detected'] = cls._detect(axis, cache['index'])
+
+        checkers = cache['detected']
+        if len(checkers) == 0:
+            raise InvalidPlotError("Could not detect what kind of plot this is")
+        return list(checkers)
+
+    @classmethod
+    def _detect(cls, axis, index):
+        """Create the checkers for each kind of plot in the given axis (see
+        :meth:`~plotchecker.PlotChecker.detect`), given the index of its
+        artists.
+
+        """
+        # the checkers are defined in modules that depend on this one
+        from . import (
+            LinePlotChecker, ScatterPlotChecker, ErrorbarPlotChecker,
+            BarPlotChecker, HistogramChecker, FillBetweenPlotChecker,
+            ImagePlotChecker, MeshPlotChecker, ContourPlotChecker)
+
+        # the artists that each kind of checker should check
+        found = collections.defaultdict(list)
+
+        # the artists that make up error bars or bars are checked along with
+        # their containers
+        contained = set()
+        for container in index['containers']:
+            if isinstance(container, matplotlib.container.ErrorbarContainer):
+                found[ErrorbarPlotChecker].extend(container.get_children())
+            elif isinstance(container, matplotlib.container.BarContainer):
+                found[BarPlotChecker].extend(container.patches)
+            contained.update(id(x) for x in container.get_children())
+
+        for line in index['lines']:
+            if id(line) in contained:
+                continue
+            if len(line.get_xydata()) > 1 and line.get_linestyle() != 'None':
+                found[LinePlotChecker].append(line)
+            elif cls._parse_marker(line.get_marker()) != '':
+                found[ScatterPlotChecker].append(line)
+
+        polytype = getattr(
+            matplotlib.collections, 'FillBetweenPolyCollection',
+            matplotlib.collections.PolyCollection)
+        for collection in index['collections']:
+            if id(collection) in contained:
+                continue
+            if isinstance(collection, matplotlib.collections.PathCollection):
+                found[ScatterPlotChecker].append(collection)
+            elif isinstance(collection, matplotlib.collections.QuadMesh):
+                found[MeshPlotChecker].append(collection)
+            elif isinstance(collection, matplotlib.contour.ContourSet):
+                found[ContourPlotChecker].append(collection)
+            elif isinstance(collection, polytype):
+                found[FillBetweenPlotChecker].append(collection)
+
+        for patch in index['patches']:
+            if id(patch) in contained:
+                continue
+            if isinstance(patch, matplotlib.patches.Rectangle):
+                found[BarPlotChecker].append(patch)
+            elif isinstance(patch, matplotlib.patches.Polygon):
+                found[HistogramChecker].append(patch)
+
+        found[ImagePlotChecker].extend(index['images'])
+
+        checkers = []
+        for checker_cls in (
+                LinePlotChecker, ScatterPlotChecker, ErrorbarPlotChecker,
+                BarPlotChecker, HistogramChecker, FillBetweenPlotChecker,
+                ImagePlotChecker, MeshPlotChecker, ContourPlotChecker):
+            if len(found[checker_cls]) > 0:
+                try:
+                    checkers.append(checker_cls(axis, artists=found[checker_cls]))
+                except InvalidPlotError:
+                    pass
+
+        return checkers
+
+    def _get_artists(self, category, artist_type=None):
+        """Get the artists in the given category of the artist index,
+        optionally only those that are instances of ``artist_type``.
+
+        """
+        artists = self._artists[category]
+        if artist_type is None:
+            return list(artists)
+        return [x for x in artists if isinstance(x, artist_type)]
+
+    @property
+    def _legend_index(self):
+        """A dictionary mapping the id of each artist (or container) in the
+        plot to the label of its entry in the legend. Artists that do not
+        appear in the legend are not included.
+
+        The handles that are drawn in the legend are usually proxies, rather
+        than the plotted artists themselves, and the labels of the entries
+        need not be the labels of the artists (e.g. for
+        ``ax.legend(['train', 'test'])``, or when the handles are passed to
+        ``legend`` explicitly). So each entry is matched up with the artist
+        that is its handle, or else an artist with the same label that looks
+        the same as its handle (see ``_legend_style``), or else the first
+        artist that looks the same as its handle, in the order that
+        matplotlib uses to create legends. Entries that can't be matched up
+        with any artist are left out. The index is only built once.
+
+        """
+        if self._legend_labels is not None:
+            return self._legend_labels
+
+        self._legend_labels = {}
+        legend = self.axis.get_legend()
+        if legend is None:
+            return self._legend_labels
+
+        # older versions of matplotlib call this legendHandles
+        handles = getattr(legend, 'legend_handles', None)
+        if handles is None:
+            handles = legend.legendHandles
+
+        artists = self._legend_candidates()
+        positions = dict((id(x), i) for i, x in enumerate(artists))
+        styles = [self._legend_style(x) for x in artists]
+        by_label = {}
+        by_color = {}
+        for i, artist in enumerate(artists):
+            by_label.setdefault(artist.get_label(), []).append(i)
+            by_color.setdefault(styles[i][0], []).append(i)
+        used = np.zeros(len(artists), dtype=bool)
+
+        def first_match(indices, style):
+            for i in indices:
+                if not used[i] and self._same_style(style, styles[i]):
+                    return i
+            return None
+
+        # skip any entries that matplotlib couldn't create a handle for (and
+        # so aren't shown)
+        for handle, text in zip(handles, legend.texts):
+            if handle is None:
+                continue
+            label = text.get_text()
+            i = positions.get(id(handle))
+            if i is None or used[i]:
+                style = self._legend_style(handle)
+                i = first_match(by_label.get(label, []), style)
+            if i is None and style[0] is not None:
+                i = first_match(by_color.get(style[0], []), style)
+            if i is None:
+                continue
+
+            used[i] = True
+            self._legend_labels[id(artists[i])] = label
+
+        return self._legend_labels
+
+    def _legend_candidates(self):
+        """The artists (and containers) that can appear in the legend, in the
+        order that matplotlib uses to create legends, i.e. the order in which
+        the handles are paired with the labels given to ``legend``.
+
+        """
+        # all the artists of the axes are included, even if only some of them
+        # are being checked, so that the entries of the others aren't matched
+        # up with the checked artists instead
+        index = self._index_artists(self.axis)
+        included = set(
+            id(x) for category in ('lines', 'patches', 'collections')
+            for x in index[category])
+        artists = [x for x in self.axis.get_children() if id(x) in included]
+        artists.extend(index['containers'])
+        return [x for x in artists if x.get_label() != '_nolegend_']
+
+    @classmethod
+    def _legend_style(cls, artist):
+        """The style of an artist (or container, or legend handle) that is
+        shown in the legend, as a tuple of its RGB color, line style, marker
+        and hatch. The line style and marker are only given for lines, and
+        any properties that can't be determined are ``None``.
+
+        """
+        if isinstance(artist, matplotlib.container.Container):
+            children = artist.get_children()
+            if len(children) == 0:
+                return (None, None, None, None)
+            artist = children[0]
+
+        linestyle = marker = hatch = color = None
+        if isinstance(artist, matplotlib.lines.Line2D):
+            color = artist.get_color()
+            linestyle = artist.get_linestyle()
+            marker = cls._parse_marker(artist.get_marker())
+        elif hasattr(artist, 'get_facecolor'):
+            # use the edge color for artists that are only drawn as outlines
+            # (e.g. step histograms, or error bars)
+            for color in (artist.get_facecolor(), artist.get_edgecolor()):
+                color = np.asarray(matplotlib.colors.to_rgba_array(color))
+                if len(color) > 0 and color[0, 3] > 0:
+                    break
+            color = color[0] if len(color) > 0 else None
+            hatch = artist.get_hatch() if hasattr(artist, 'get_hatch') else None
+
+        if color is not None:
+            color = tuple(np.round(matplotlib.colors.to_rgb(color), 6))
+        return (color, linestyle, marker, hatch or None)
+
+    @classmethod
+    def _same_style(cls, a, b):
+        """Whether two legend styles (see ``_legend_style``) are the same,
+        ignoring any properties that are ``None`` in either of them.
+
+        """
+        return all(x is None or y is None or x == y for x, y in zip(a, b))
 
     @classmethod
     def _color2rgb(cls, color):
@@ -134,6 +793,425 @@ class PlotChecker(object):
             y = y[:xn]
         return y
 
+    def _fits_memory(self, nbytes):
+        """Whether ``nbytes`` bytes fit within the ``memory_budget``."""
+        return self.memory_budget is None or nbytes <= self.memory_budget
+
+    def _check_memory(self, nbytes, what):
+        """Raise a :class:`~plotchecker.MemoryBudgetError` if ``what`` (a
+        description of the data) needs more than the ``memory_budget``.
+
+        """
+        if not self._fits_memory(nbytes):
+            raise MemoryBudgetError(
+                "{} would need {:.1f} MB of memory, which is more than the "
+                "memory budget of {:.1f} MB".format(
+                    what, nbytes / 2 ** 20, self.memory_budget / 2 ** 20))
+
+    @classmethod
+    def _chunk_rows(cls, x):
+        """The number of rows (i.e. elements along the first dimension) of
+        ``x`` to process at a time, so that each chunk has roughly
+        ``_chunk_size`` elements.
+
+        """
+        row_size = int(np.prod(x.shape[1:]))
+        return max(1, cls._chunk_size // max(1, row_size))
+
+    @classmethod
+    def _assert_chunked(cls, actual, expected, func=None, offset=0, rows=None, **kwargs):
+        """Compares two (possibly very large) arrays in chunks along their
+        first dimension, stopping at the first chunk that doesn't match. This
+        avoids allocating temporaries the size of the whole array, and avoids
+        comparing the rest of the data once a mismatch has been found.
+
+        Parameters
+        ----------
+        actual : array-like
+            The actual values.
+        expected : array-like
+            The expected values, which must have the same shape as ``actual``.
+        func : function (default=``numpy.testing.assert_equal``)
+            An assertion function to apply to each chunk.
+        offset : int (default: 0)
+            The index of the first row, if the arrays are part of larger
+            arrays (this is only used in the error message).
+        rows : int (default: ``None``)
+            The number of rows to compare at a time (by default, enough rows
+            for roughly ``_chunk_size`` elements).
+        kwargs :
+            Additional keyword arguments to pass to ``func``
+
+        """
+        actual = np.asanyarray(actual)
+        expected = np.asanyarray(expected)
+        if actual.shape != expected.shape:
+            raise AssertionError(
+                "Arrays have different shapes: {} (expected {})".format(
+                    actual.shape, expected.shape))
+
+        if func is None:
+            func = np.testing.assert_equal
+
+        if actual.ndim == 0:
+            func(actual, expected, **kwargs)
+            return
+
+        step = rows if rows is not None else cls._chunk_rows(actual)
+        for i in range(0, actual.shape[0], step):
+            try:
+                func(actual[i:i + step], expected[i:i + step], **kwargs)
+            except AssertionError as e:
+                raise AssertionError(
+                    "Arrays differ within rows {} to {}:{}".format(
+                        offset + i, offset + min(i + step, actual.shape[0]) - 1, e))
+
+    def _assert_within_budget(self, actual, expected, func=None, **kwargs):
+        """Compare two arrays with ``_assert_chunked``, in chunks that are
+        small enough for the comparison to fit within the ``memory_budget``.
+
+        """
+        actual = np.asanyarray(actual)
+        rows = self._chunk_rows(actual)
+        if self.memory_budget is not None and actual.ndim > 0:
+            row_bytes = self._compare_arrays * max(actual.dtype.itemsize, 8) * \
+                int(np.prod(actual.shape[1:]))
+            self._check_memory(row_bytes, "Comparing each row of the data")
+            rows = max(1, min(rows, self.memory_budget // max(1, row_bytes)))
+        self._assert_chunked(actual, expected, func=func, rows=rows, **kwargs)
+
+    def _budgeted(self, func):
+        """Wrap the assertion function ``func`` so that it compares arrays in
+        chunks that fit within the ``memory_budget``, if there is one.
+
+        """
+        if self.memory_budget is None:
+            return func
+
+        def assert_budgeted(actual, expected, **kwargs):
+            self._assert_within_budget(actual, expected, func=func, **kwargs)
+        return assert_budgeted
+
+    @property
+    def _allclose(self):
+        """The assertion function for checking that data is almost equal,
+        depending on whether ``reduced_precision`` is enabled.
+
+        """
+        if self.reduced_precision:
+            return self._assert_allclose_float32
+        return np.testing.assert_allclose
+
+    @classmethod
+    def _is_dates(cls, values):
+        """Whether the given values are dates, judging by their dtype (for
+        numpy and pandas arrays of ``datetime64``), or by their first element
+        (for other sequences of dates).
+
+        """
+        dtype = getattr(values, 'dtype', None)
+        if dtype is not None and getattr(dtype, 'kind', None) == 'M':
+            return True
+        if dtype is not None and dtype != np.dtype(object):
+            return False
+        if isinstance(values, (list, tuple, np.ndarray)) and np.ndim(values) == 1 and len(values) > 0:
+            return isinstance(values[0], (datetime.date, np.datetime64))
+        return False
+
+    @classmethod
+    def _convert_dates(cls, values):
+        """Convert expected data that is given as dates (e.g. an array of
+        ``numpy.datetime64``, a list of ``datetime`` objects, or pandas
+        timestamps) to the numbers that matplotlib uses for dates, with a
+        single call to ``matplotlib.dates.date2num``. Any other values are
+        returned unchanged.
+
+        The values are converted every time they are checked, rather than
+        caching the conversion, so arrays can be modified in place between
+        checks.
+
+        """
+        if not cls._is_dates(values):
+            return values
+        return matplotlib.dates.date2num(values)
+
+    @classmethod
+    def _apply_scale(cls, transform, values):
+        """Apply the transform of a scale to an array of values, or to each
+        array in a list of arrays.
+
+        """
+        if isinstance(values, (list, tuple)):
+            return [cls._apply_scale(transform, x) for x in values]
+        values = np.asanyarray(values, dtype=float)
+        return transform.transform(values.ravel()).reshape(values.shape)
+
+    @property
+    def _scales(self):
+        """The transforms of the scales of the x- and y-axes (keyed by
+        ``'x'`` and ``'y'``), which are kept by snapshots for
+        ``scaled_comparison``. Transforms that can't be pickled (e.g. of
+        ``'function'`` scales) are replaced by an
+        :class:`~plotchecker.InvalidPlotError`, which is raised when they are
+        used.
+
+        """
+        scales = {}
+        for axis_name in ('x', 'y'):
+            transform = getattr(self.axis, axis_name + 'axis').get_transform()
+            try:
+                pickle.dumps(transform)
+            except Exception:
+                transform = InvalidPlotError(
+                    "The {} scale of the {}-axis is not kept by snapshots".format(
+                        getattr(self.axis, 'get_{}scale'.format(axis_name))(), axis_name))
+            scales[axis_name] = transform
+        return scales
+
+    def _scale_transform(self, axis_name):
+        """The transform of the scale of the x- or y-axis (according to
+        ``axis_name``), which for snapshots is the one that was kept by the
+        snapshot.
+
+        """
+        if getattr(self, '_snapshot_of', None) is None:
+            return getattr(self.axis, axis_name + 'axis').get_transform()
+
+        transform = self._scales[axis_name]
+        if isinstance(transform, Exception):
+            raise transform
+        return transform
+
+    def _scaled_data(self, attr, axis_name, expected):
+        """Get the plotted value of the given data attribute, and the expected
+        value, for comparing them. If ``scaled_comparison`` is enabled, then
+        both are transformed by the scale of the x- or y-axis (according to
+        ``axis_name``), and the transformed plotted value is cached.
+
+        Returns
+        -------
+        actual, expected
+
+        """
+        if not self.scaled_comparison:
+            return getattr(self, attr), expected
+
+        transform = self._scale_transform(axis_name)
+        cache = self.__dict__.setdefault('_scaled_cache', {})
+        if attr not in cache or cache[attr][0] is not transform:
+            cache[attr] = (transform, self._apply_scale(transform, getattr(self, attr)))
+        actual = cache[attr][1]
+
+        # lists of arrays (e.g. one per line) are transformed one array at a
+        # time, and anything else as a single array
+        if not isinstance(actual, list):
+            expected = np.asanyarray(expected)
+        return actual, self._apply_scale(transform, expected)
+
+    @classmethod
+    def _assert_allclose_float32(cls, actual, desired, rtol=1e-7, atol=0,
+                                 equal_nan=True, err_msg='', verbose=True):
+        """A version of ``numpy.testing.assert_allclose`` that compares the
+        arrays in chunks in single precision, and only checks the elements
+        whose result is uncertain in single precision again in double
+        precision. Arrays that can't be compared this way (e.g. with
+        different shapes, or masked arrays) are passed on to
+        ``numpy.testing.assert_allclose``.
+
+        """
+        actual = np.asanyarray(actual)
+        desired = np.asanyarray(desired)
+        if (actual.shape != desired.shape or actual.ndim == 0
+                or isinstance(actual, np.ma.MaskedArray)
+                or isinstance(desired, np.ma.MaskedArray)
+                or actual.dtype.kind not in 'biuf' or desired.dtype.kind not in 'biuf'):
+            np.testing.assert_allclose(
+                actual, desired, rtol=rtol, atol=atol, equal_nan=equal_nan,
+                err_msg=err_msg, verbose=verbose)
+            return
+
+        eps = np.finfo(np.float32).eps
+        tiny = np.finfo(np.float32).tiny
+        step = cls._chunk_rows(actual)
+        for i in range(0, actual.shape[0], step):
+            a64 = actual[i:i + step]
+            d64 = desired[i:i + step]
+            with np.errstate(over='ignore', invalid='ignore'):
+                a = a64.astype(np.float32)
+                d = d64.astype(np.float32)
+                diff = np.abs(a - d)
+                tol = np.float32(atol) + np.float32(rtol) * np.abs(d)
+                ok = diff <= tol
+
+                # an upper bound on the rounding errors of the difference and
+                # the tolerance; comparisons with NaN are false, so NaNs (and
+                # infinities, whose margin is infinite) are always uncertain
+                margin = 2 * eps * (np.abs(a) + np.abs(d) + tol) + 2 * tiny
+                uncertain = ~(np.abs(diff - tol) > margin)
+
+            if uncertain.any():
+                ok[uncertain] = np.isclose(
+                    a64[uncertain], d64[uncertain],
+                    rtol=rtol, atol=atol, equal_nan=equal_nan)
+
+            if not ok.all():
+                # get the usual error message
+                np.testing.assert_allclose(
+                    a64, d64, rtol=rtol, atol=atol, equal_nan=equal_nan,
+                    err_msg=err_msg, verbose=verbose)
+
+    @classmethod
+    def _block_mean(cls, x, factor):
+        """Downsamples the first two dimensions of ``x`` by averaging over
+        non-overlapping ``factor``-by-``factor`` blocks. Rows and columns that
+        do not fill a whole block are dropped. The array is processed a chunk
+        of rows at a time, so that the only large allocation is the (small)
+        result.
+
+        Parameters
+        ----------
+        x : array-like
+            An array with at least two dimensions.
+        factor : int
+            The size of the blocks to average over.
+
+        Returns
+        -------
+        downsampled : array with shape ``(x.shape[0] // factor, x.shape[1] //
+            factor) + x.shape[2:]``
+
+        """
+        x = np.asanyarray(x)
+        factor = int(factor)
+        if factor < 1:
+            raise ValueError("Invalid downsampling factor: {}".format(factor))
+
+        nrows = x.shape[0] // factor
+        ncols = x.shape[1] // factor
+        rest = x.shape[2:]
+        out = np.empty((nrows, ncols) + rest, dtype=float)
+
+        step = max(1, cls._chunk_rows(x) // factor)
+        for i in range(0, nrows, step):
+            j = min(i + step, nrows)
+            block = x[i * factor:j * factor, :ncols * factor]
+            block = block.reshape((j - i, factor, ncols, factor) + rest)
+            out[i:j] = block.mean(axis=(1, 3))
+        return out
+
+    @property
+    def raster(self):
+        """The rendered pixels of the plot, including its tick labels, axis
+        labels and title, as a read-only array with shape ``(height, width,
+        4)`` of RGBA values between 0 and 255.
+
+        The figure is rendered with Agg the first time this is accessed, and
+        the render is shared by all checkers of the same figure until the
+        figure is modified (so several raster checks cost one render). The
+        array is a view onto the render, rather than a copy.
+
+        """
+        return axis_raster(self.axis)
+
+    @property
+    def perceptual_hash(self):
+        """A 64-bit perceptual hash of the rendered
+        :attr:`~plotchecker.PlotChecker.raster` of the plot. Plots that look
+        nearly identical have hashes that differ in only a few bits, so these
+        hashes can be used to find near-duplicate plots (see
+        :class:`~plotchecker.PlotHashIndex`).
+
+        """
+        return perceptual_hash(self.raster)
+
+    def _parse_reference_raster(self, reference, downsample):
+        """Get the RGB images (as floats between 0 and 1) of the plot and of
+        the given reference, downsampled by averaging over blocks of
+        ``downsample``-by-``downsample`` pixels.
+
+        """
+        if isinstance(reference, PlotChecker):
+            reference = reference.raster
+        elif isinstance(reference, matplotlib.axes.Axes):
+            reference = axis_raster(reference)
+
+        actual = self.raster
+        expected = as_image(reference)
+        if actual.shape[:2] != expected.shape[:2]:
+            raise AssertionError(
+                "Raster has incorrect size: {} (expected {})".format(
+                    actual.shape[:2], expected.shape[:2]))
+
+        if downsample is not None and downsample > 1:
+            return (
+                self._block_mean(as_image(actual), downsample),
+                self._block_mean(expected, downsample))
+        return as_image(actual), expected
+
+    def assert_raster_allclose(self, reference, max_rms=0.01, downsample=4):
+        """Assert that the rendered :attr:`~plotchecker.PlotChecker.raster`
+        of the plot is almost equal to the given reference image, i.e. that
+        the root-mean-square difference of each color channel is at most
+        ``max_rms``.
+
+        Parameters
+        ----------
+        reference :
+            The reference image. This can be another set of axes (or a plot
+            checker), an array of RGB or RGBA values (either integers between 0
+            and 255, or floats between 0 and 1), or the filename of an image.
+            It must have the same size as the raster of the plot.
+        max_rms : float (default: 0.01)
+            The largest allowed RMS difference for each channel, where colors
+            are given as floats between 0 and 1.
+        downsample : int (default: 4)
+            Both images are downsampled by averaging over blocks of
+            ``downsample``-by-``downsample`` pixels before they are compared,
+            which makes the comparison faster and less sensitive to
+            antialiasing. Use ``None`` to compare every pixel.
+
+        """
+        actual, expected = self._parse_reference_raster(reference, downsample)
+        error = rms(actual, expected)
+        if np.any(error > max_rms):
+            raise AssertionError(
+                "Raster does not match the reference: RMS difference of each "
+                "channel is {} (expected at most {})".format(error, max_rms))
+
+    def assert_raster_similar(self, reference, min_ssim=0.95, downsample=4):
+        """Assert that the rendered :attr:`~plotchecker.PlotChecker.raster`
+        of the plot is structurally similar to the given reference image,
+        i.e. that their structural similarity (SSIM) index is at least
+        ``min_ssim``. This is less sensitive than
+        :meth:`~plotchecker.PlotChecker.assert_raster_allclose` to small
+        changes in color, but more sensitive to elements that are missing,
+        clipped or overlapping.
+
+        The SSIM is computed in grayscale over non-overlapping blocks of 8-by-8
+        pixels (after downsampling).
+
+        Parameters
+        ----------
+        reference :
+            The reference image. This can be another set of axes (or a plot
+            checker), an array of RGB or RGBA values (either integers between 0
+            and 255, or floats between 0 and 1), or the filename of an image.
+            It must have the same size as the raster of the plot.
+        min_ssim : float (default: 0.95)
+            The smallest allowed SSIM, which is 1 for identical images.
+        downsample : int (default: 4)
+            Both images are downsampled by averaging over blocks of
+            ``downsample``-by-``downsample`` pixels before they are compared.
+            Use ``None`` to compare every pixel.
+
+        """
+        actual, expected = self._parse_reference_raster(reference, downsample)
+        index = ssim(actual, expected)
+        if index < min_ssim:
+            raise AssertionError(
+                "Raster does not match the reference: SSIM is {} (expected at "
+                "least {})".format(index, min_ssim))
+
     @property
     def title(self):
         """The title of the matplotlib plot, stripped of whitespace."""
@@ -261,6 +1339,25 @@ class PlotChecker(object):
                 "ylim is incorrect: {} (expected {})".format(
                     self.ylim, ylim))
 
+    @classmethod
+    def _format_ticks(cls, axis, locs):
+        """Format the given tick locations with the major tick formatter of
+        ``axis`` (an ``XAxis`` or ``YAxis``).
+
+        This evaluates the formatter directly rather than reading the text of
+        the tick objects, which are only updated when the figure is drawn (or
+        when the tick labels are requested from matplotlib, which creates a
+        new tick artist for every tick location).
+
+        """
+        formatter = axis.get_major_formatter()
+        if hasattr(formatter, 'format_ticks'):
+            labels = formatter.format_ticks(locs)
+        else:
+            formatter.set_locs(locs)
+            labels = [formatter(x, i) for i, x in enumerate(locs)]
+        return [x.strip() for x in labels]
+
     @property
     def xticks(self):
         """The tick locations along the plot's x-axis."""
@@ -297,8 +1394,12 @@ class PlotChecker(object):
 
     @property
     def xticklabels(self):
-        """The tick labels along the plot's x-axis, stripped of whitespace."""
-        return [x.get_text().strip() for x in self.axis.get_xticklabels()]
+        """The tick labels along the plot's x-axis, stripped of whitespace.
+        There is one label for each of the
+        :attr:`~plotchecker.PlotChecker.xticks`.
+
+        """
+        return self._format_ticks(self.axis.xaxis, self.xticks)
 
     def assert_xticklabels_equal(self, xticklabels):
         """Asserts that the given xticklabels are the same as the plot's
@@ -315,8 +1416,12 @@ class PlotChecker(object):
 
     @property
     def yticklabels(self):
-        """The tick labels along the plot's y-axis, stripped of whitespace."""
-        return [x.get_text().strip() for x in self.axis.get_yticklabels()]
+        """The tick labels along the plot's y-axis, stripped of whitespace.
+        There is one label for each of the
+        :attr:`~plotchecker.PlotChecker.yticks`.
+
+        """
+        return self._format_ticks(self.axis.yaxis, self.yticks)
 
     def assert_yticklabels_equal(self, yticklabels):
         """Asserts that the given yticklabels are the same as the plot's
@@ -335,18 +1440,7 @@ class PlotChecker(object):
     @property
     def _texts(self):
         """All ``matplotlib.text.Text`` objects in the plot, excluding titles."""
-        texts = []
-        for x in self.axis.get_children():
-            if not isinstance(x, matplotlib.text.Text):
-                continue
-            if x == self.axis.title:
-                continue
-            if x == getattr(self.axis, '_left_title', None):
-                continue
-            if x == getattr(self.axis, '_right_title', None):
-                continue
-            texts.append(x)
-        return texts
+        return self._get_artists('texts')
 
     @property
     def textlabels(self):
@@ -0,0 +1,244 @@
+import matplotlib.container
+import numpy as np
+
+from .base import InvalidPlotError
+from .lineplot import LinePlotChecker
+
+
+class ErrorbarPlotChecker(LinePlotChecker):
+    """A plot checker for error bar plots, i.e. plots created with
+    ``errorbar``.
+
+    The central lines of the error bar plots are checked in exactly the same
+    way as by :class:`~plotchecker.LinePlotChecker` (cap lines are not
+    included). In addition, the extents of the error bars are available
+    through :attr:`~plotchecker.ErrorbarPlotChecker.xerr` and
+    :attr:`~plotchecker.ErrorbarPlotChecker.yerr`.
+
+    Parameters
+    ----------
+    axis : ``matplotlib.axes.Axes`` object
+        A set of matplotlib axes (e.g. obtained through ``plt.gca()``)
+    artists : list of matplotlib artists, optional
+        Only check these artists of the axes, rather than all of them (e.g.
+        to check one kind of data in a plot that combines several kinds).
+        The texts of the axes are always checked.
+
+    """
+
+    _snapshot_attrs = LinePlotChecker._snapshot_attrs + ('xerr', 'yerr')
+
+    def __init__(self, axis, artists=None):
+        """Initialize the error bar plot checker."""
+        super(ErrorbarPlotChecker, self).__init__(axis, artists=artists)
+
+        containers = self._get_artists(
+            'containers', matplotlib.container.ErrorbarContainer)
+        if len(containers) == 0:
+            raise InvalidPlotError("No error bars found")
+
+        self._lines = []
+        self._xerr = []
+        self._yerr = []
+        for container in containers:
+            data_line, caplines, barlinecols = container.lines
+            if data_line is None:
+                raise InvalidPlotError("Error bars must be plotted with a line or markers")
+
+            # the error bars along x (if any) always come before the error
+            # bars along y
+            barlinecols = list(barlinecols)
+            xcol = barlinecols.pop(0) if container.has_xerr else None
+            ycol = barlinecols.pop(0) if container.has_yerr else None
+
+            xydata = data_line.get_xydata()
+            self._lines.append(data_line)
+            self._xerr.append(self._parse_segments(xcol, xydata, 0))
+            self._yerr.append(self._parse_segments(ycol, xydata, 1))
+
+        self._perm = list(range(len(self._lines)))
+
+    @classmethod
+    def _parse_segments(cls, collection, xydata, dim):
+        """Compute the lower and upper errors of the given data from the
+        segments of the ``LineCollection`` that draws the error bars along
+        dimension ``dim`` (0 for x, 1 for y).
+
+        Points that have no error bar (because their data is NaN or masked,
+        or because they were skipped by the ``errorevery`` option of
+        ``errorbar``) have errors of NaN.
+
+        Returns
+        -------
+        err : 2-by-N array, where the first row is the lower error and the
+            second row is the upper error.
+
+        """
+        if collection is None:
+            return np.zeros((2, len(xydata)))
+
+        segments = collection.get_segments()
+        if len(segments) > len(xydata):
+            raise InvalidPlotError(
+                "Number of error bars ({}) is more than the number of points ({})".format(
+                    len(segments), len(xydata)))
+
+        # the error bars of points with NaN data are empty, but they are
+        # still there, unless only some points have error bars
+        if len(segments) == len(xydata):
+            points = np.arange(len(segments))
+        else:
+            points = cls._match_segments(segments, xydata, dim)
+        drawn = np.array([len(s) > 0 for s in segments], dtype=bool)
+        points = points[drawn]
+
+        # an M-by-2-by-2 array of (error bar, endpoint, coordinate)
+        coords = np.array(
+            [s for s in segments if len(s) > 0], dtype=float).reshape(-1, 2, 2)[:, :, dim]
+        data = xydata[points, dim]
+        err = np.full((2, len(xydata)), np.nan)
+        err[0, points] = data - coords.min(axis=1)
+        err[1, points] = coords.max(axis=1) - data
+        return err
+
+    @classmethod
+    def _match_segments(cls, segments, xydata, dim):
+        """Find the index of the point that each error bar (along dimension
+        ``dim``) belongs to, when only some of the points have error bars.
+        The error bars are in the same order as their points, and each one is
+        at the same position as its point along the other dimension, and
+        spans its point along dimension ``dim``. Empty error bars are not
+        matched to any point (-1).
+
+        """
+        other = 1 - dim
+        points = np.full(len(segments), -1, dtype=int)
+        i = 0
+        for j, segment in enumerate(segments):
+            if len(segment) == 0:
+                continue
+            segment = np.asarray(segment, dtype=float)
+            lower = segment[:, dim].min()
+            upper = segment[:, dim].max()
+            while i < len(xydata) and not (
+                    np.all(segment[:, other] == xydata[i, other])
+                    and lower <= xydata[i, dim] <= upper):
+                i += 1
+            if i == len(xydata):
+                raise InvalidPlotError("Could not match the error bars to the plotted points")
+            points[j] = i
+            i += 1
+        return points
+
+    @classmethod
+    def _broadcast_err(cls, func):
+        """Wrap the assertion function ``func`` so that the expected errors
+        are broadcast to the shape of the plotted errors before comparing
+        them. This allows the expected errors to be given in any format
+        accepted by ``errorbar`` (a scalar, an array of symmetric errors, or a
+        2-by-N array of lower and upper errors).
+
+        """
+        def assert_err(actual, expected, **kwargs):
+            try:
+                expected = np.broadcast_to(np.asarray(expected, dtype=float), actual.shape)
+            except ValueError:
+                raise AssertionError(
+                    "Invalid shape for errors: {} (expected {})".format(
+                        np.shape(expected), actual.shape))
+            func(actual, expected, **kwargs)
+        return assert_err
+
+    @property
+    def xerr(self):
+        """The errors along the x-axis of the plotted data (list of 2-by-N
+        arrays, one array per line). The first row of each array is the lower
+        error, and the second row is the upper error. Lines without error bars
+        along the x-axis have errors of zero, and points without an error bar
+        (e.g. points with NaN data) have errors of NaN.
+
+        """
+        return self._xerr
+
+    def assert_xerr_equal(self, xerr):
+        """Assert that the given x-errors are equivalent to the plotted
+        :attr:`~plotchecker.ErrorbarPlotChecker.xerr`.
+
+        Parameters
+        ----------
+        xerr : list
+            The expected errors, with one element per (expected) line. Each
+            element may be a scalar, a 1-D array of symmetric errors, or a
+            2-by-N array of lower and upper errors.
+
+        """
+        self._assert_equal(
+            "xerr", xerr, self.xerr,
+            func=self._broadcast_err(np.testing.assert_equal))
+
+    def assert_xerr_allclose(self, xerr, **kwargs):
+        """Assert that the given x-errors are almost equal to the plotted
+        :attr:`~plotchecker.ErrorbarPlotChecker.xerr`.
+
+        Parameters
+        ----------
+        xerr : list
+            The expected errors, with one element per (expected) line. Each
+            element may be a scalar, a 1-D array of symmetric errors, or a
+            2-by-N array of lower and upper errors.
+        kwargs :
+            Additional keyword arguments to pass to
+            ``numpy.testing.assert_allclose``
+
+        """
+        self._assert_equal(
+            "xerr", xerr, self.xerr,
+            func=self._broadcast_err(self._allclose),
+            **kwargs)
+
+    @property
+    def yerr(self):
+        """The errors along the y-axis of the plotted data (list of 2-by-N
+        arrays, one array per line). The first row of each array is the lower
+        error, and the second row is the upper error. Lines without error bars
+        along the y-axis have errors of zero, and points without an error bar
+        (e.g. points with NaN data) have errors of NaN.
+
+        """
+        return self._yerr
+
+    def assert_yerr_equal(self, yerr):
+        """Assert that the given y-errors are equivalent to the plotted
+        :attr:`~plotchecker.ErrorbarPlotChecker.yerr`.
+
+        Parameters
+        ----------
+        yerr : list
+            The expected errors, with one element per (expected) line. Each
+            element may be a scalar, a 1-D array of symmetric errors, or a
+            2-by-N array of lower and upper errors.
+
+        """
+        self._assert_equal(
+            "yerr", yerr, self.yerr,
+            func=self._broadcast_err(np.testing.assert_equal))
+
+    def assert_yerr_allclose(self, yerr, **kwargs):
+        """Assert that the given y-errors are almost equal to the plotted
+        :attr:`~plotchecker.ErrorbarPlotChecker.yerr`.
+
+        Parameters
+        ----------
+        yerr : list
+            The expected errors, with one element per (expected) line. Each
+            element may be a scalar, a 1-D array of symmetric errors, or a
+            2-by-N array of lower and upper errors.
+        kwargs :
+            Additional keyword arguments to pass to
+            ``numpy.testing.assert_allclose``
+
+        """
+        self._assert_equal(
+            "yerr", yerr, self.yerr,
+            func=self._broadcast_err(self._allclose),
+            **kwargs)
@@ -0,0 +1,344 @@
+import matplotlib.collections
+import numpy as np
+
+from .base import PlotChecker, InvalidPlotError
+
+
+class FillBetweenPlotChecker(PlotChecker):
+    """A plot checker for filled areas between two curves, i.e. plots created
+    with ``fill_between`` or ``fill_betweenx`` (such as confidence bands).
+
+    Each call to ``fill_between`` creates one band. For bands created with
+    ``fill_betweenx``, :attr:`~plotchecker.FillBetweenPlotChecker.x_data`
+    holds the y-values, and :attr:`~plotchecker.FillBetweenPlotChecker.y1_data`
+    and :attr:`~plotchecker.FillBetweenPlotChecker.y2_data` hold the x-values
+    of the two curves. If the band was only filled in some places (using the
+    ``where`` argument), then the data of the filled regions are concatenated.
+
+    Parameters
+    ----------
+    axis : ``matplotlib.axes.Axes`` object
+        A set of matplotlib axes (e.g. obtained through ``plt.gca()``)
+    artists : list of matplotlib artists, optional
+        Only check these artists of the axes, rather than all of them (e.g.
+        to check one kind of data in a plot that combines several kinds).
+        The texts of the axes are always checked.
+
+    """
+
+    _snapshot_attrs = PlotChecker._snapshot_attrs + ('colors', 'alphas')
+    _snapshot_state = ('_data',)
+
+    def __init__(self, axis, artists=None):
+        """Initialize the fill between plot checker."""
+        super(FillBetweenPlotChecker, self).__init__(axis, artists=artists)
+
+        # newer versions of matplotlib have a dedicated collection type
+        polytype = getattr(
+            matplotlib.collections, 'FillBetweenPolyCollection',
+            matplotlib.collections.PolyCollection)
+        self._bands = self._get_artists('collections', polytype)
+
+        if len(self._bands) == 0:
+            raise InvalidPlotError("No data found")
+
+        self._data = [self._parse_band(x) for x in self._bands]
+
+    @classmethod
+    def _parse_polygon(cls, verts):
+        """Split the vertices of a single fill between polygon into the
+        independent variable and the two curves.
+
+        The polygon for ``N`` points consists of ``2N + 3`` vertices: the
+        start point on the second curve, the ``N`` points of the first curve,
+        the end point on the second curve, the ``N`` points of the second
+        curve in reverse order, and a final closing vertex. Polygons that
+        don't have this layout (e.g. from other kinds of ``PolyCollection``,
+        which older versions of matplotlib also use for fill between plots)
+        are rejected with an ``InvalidPlotError``.
+
+        Returns
+        -------
+        data : N-by-3 array, with columns corresponding to the independent
+            variable, the first curve, and the second curve.
+        horizontal : boolean
+            Whether the independent variable is the y-coordinate (i.e. the
+            polygon was created by ``fill_betweenx``).
+
+        """
+        n = (len(verts) - 3) // 2
+        if len(verts) == 0:
+            return np.empty((0, 3)), False
+        if n < 1 or len(verts) != 2 * n + 3:
+            raise InvalidPlotError(
+                "Invalid number of vertices for a fill between polygon: {}".format(
+                    len(verts)))
+
+        first = verts[1:n + 1]
+        second = verts[n + 2:(2 * n) + 2][::-1]
+
+        # the independent variable is the one that is shared by both curves
+        horizontal = (
+            not np.array_equal(first[:, 0], second[:, 0]) and
+            np.array_equal(first[:, 1], second[:, 1]))
+        t = int(horizontal)
+
+        # the start and end points are the ends of the second curve
+        if not (np.array_equal(first[:, t], second[:, t]) and
+                np.array_equal(verts[0], second[0]) and
+                np.array_equal(verts[n + 1], second[-1])):
+            raise InvalidPlotError("Polygon is not from a fill between plot")
+
+        data = np.empty((n, 3))
+        data[:, 0] = first[:, t]
+        data[:, 1] = first[:, 1 - t]
+        data[:, 2] = second[:, 1 - t]
+        return data, horizontal
+
+    @classmethod
+    def _parse_band(cls, collection):
+        """Extract the data of all the polygons of a fill between collection.
+
+        Returns
+        -------
+        data : N-by-3 array, with columns corresponding to the independent
+            variable, the first curve, and the second curve.
+        horizontal : boolean
+
+        """
+        parsed = [cls._parse_polygon(p.vertices) for p in collection.get_paths()]
+        if len(parsed) == 0:
+            return np.empty((0, 3)), False
+        data = np.concatenate([x[0] for x in parsed], axis=0)
+        return data, parsed[0][1]
+
+    def _assert_bands(self, attr, expected, actual, func=None, **kwargs):
+        """Helper method for asserting that an attribute of each band is
+        equal to the expected value, one band at a time.
+
+        """
+        if len(expected) != len(actual):
+            raise AssertionError(
+                "Invalid length for attribute '{}': {} (expected {})".format(
+                    attr, len(actual), len(expected)))
+
+        for i in range(len(expected)):
+            try:
+                self._assert_within_budget(actual[i], expected[i], func=func, **kwargs)
+            except AssertionError as e:
+                raise AssertionError(
+                    "Attribute '{}' does not match for band {}: {}".format(attr, i, e))
+
+    def assert_num_bands(self, num_bands):
+        """Assert that the plot has the given number of bands.
+
+        Parameters
+        ----------
+        num_bands : int
+
+        """
+        if num_bands != len(self._data):
+            raise AssertionError(
+                "Plot has incorrect number of bands: {} (expected {})".format(
+                    len(self._data), num_bands))
+
+    @property
+    def orientations(self):
+        """The orientation of each plotted band: ``'vertical'`` for bands
+        created with ``fill_between``, and ``'horizontal'`` for bands created
+        with ``fill_betweenx``.
+
+        """
+        return ['horizontal' if h else 'vertical' for _, h in self._data]
+
+    @property
+    def x_data(self):
+        """The values of the independent variable of the plotted bands (list
+        of arrays, one array per band).
+
+        """
+        return [x[:, 0] for x, _ in self._data]
+
+    def assert_x_data_equal(self, x_data):
+        """Assert that the given x-data is equivalent to the plotted
+        :attr:`~plotchecker.FillBetweenPlotChecker.x_data`.
+
+        Parameters
+        ----------
+        x_data : list of array-like
+            The expected x-data. The number of elements should be equal to the
+            (expected) number of plotted bands.
+
+        """
+        self._assert_bands("x_data", x_data, self.x_data)
+
+    def assert_x_data_allclose(self, x_data, **kwargs):
+        """Assert that the given x-data is almost equal to the plotted
+        :attr:`~plotchecker.FillBetweenPlotChecker.x_data`.
+
+        Parameters
+        ----------
+        x_data : list of array-like
+            The expected x-data. The number of elements should be equal to the
+            (expected) number of plotted bands.
+        kwargs :
+            Additional keyword arguments to pass to
+            ``numpy.testing.assert_allclose``
+
+        """
+        self._assert_bands(
+            "x_data", x_data, self.x_data, func=self._allclose, **kwargs)
+
+    @property
+    def y1_data(self):
+        """The values of the first curve of the plotted bands (list of arrays,
+        one array per band).
+
+        """
+        return [x[:, 1] for x, _ in self._data]
+
+    def assert_y1_data_equal(self, y1_data):
+        """Assert that the given y1-data is equivalent to the plotted
+        :attr:`~plotchecker.FillBetweenPlotChecker.y1_data`.
+
+        Parameters
+        ----------
+        y1_data : list of array-like
+            The expected y1-data. The number of elements should be equal to the
+            (expected) number of plotted bands.
+
+        """
+        self._assert_bands("y1_data", y1_data, self.y1_data)
+
+    def assert_y1_data_allclose(self, y1_data, **kwargs):
+        """Assert that the given y1-data is almost equal to the plotted
+        :attr:`~plotchecker.FillBetweenPlotChecker.y1_data`.
+
+        Parameters
+        ----------
+        y1_data : list of array-like
+            The expected y1-data. The number of elements should be equal to the
+            (expected) number of plotted bands.
+        kwargs :
+            Additional keyword arguments to pass to
+            ``numpy.testing.assert_allclose``
+
+        """
+        self._assert_bands(
+            "y1_data", y1_data, self.y1_data, func=self._allclose, **kwargs)
+
+    @property
+    def y2_data(self):
+        """The values of the second curve of the plotted bands (list of arrays,
+        one array per band).
+
+        """
+        return [x[:, 2] for x, _ in self._data]
+
+    def assert_y2_data_equal(self, y2_data):
+        """Assert that the given y2-data is equivalent to the plotted
+        :attr:`~plotchecker.FillBetweenPlotChecker.y2_data`.
+
+        Parameters
+        ----------
+        y2_data : list of array-like
+            The expected y2-data. The number of elements should be equal to the
+            (expected) number of plotted bands.
+
+        """
+        self._assert_bands("y2_data", y2_data, self.y2_data)
+
+    def assert_y2_data_allclose(self, y2_data, **kwargs):
+        """Assert that the given y2-data is almost equal to the plotted
+        :attr:`~plotchecker.FillBetweenPlotChecker.y2_data`.
+
+        Parameters
+        ----------
+        y2_data : list of array-like
+            The expected y2-data. The number of elements should be equal to the
+            (expected) number of plotted bands.
+        kwargs :
+            Additional keyword arguments to pass to
+            ``numpy.testing.assert_allclose``
+
+        """
+        self._assert_bands(
+            "y2_data", y2_data, self.y2_data, func=self._allclose, **kwargs)
+
+    @property
+    def colors(self):
+        """The fill colors of the plotted bands. Each color is a RGB 3-tuple."""
+        return np.array([self._color2rgb(x.get_facecolor()[0]) for x in self._bands])
+
+    def assert_colors_equal(self, colors):
+        """Assert that the given colors are equivalent to the plotted
+        :attr:`~plotchecker.FillBetweenPlotChecker.colors`.
+
+        Parameters
+        ----------
+        colors : list of expected band colors
+            Each color can be either a matplotlib color name (e.g. ``'r'`` or
+            ``'red'``), a hexcode (e.g. ``"#FF0000"``), a 3-tuple RGB color, or
+            a 4-tuple RGBA color.
+
+        """
+        colors = np.array([self._color2rgb(x) for x in colors])
+        np.testing.assert_equal(self.colors, colors)
+
+    def assert_colors_allclose(self, colors, **kwargs):
+        """Assert that the given colors are almost equal to the plotted
+        :attr:`~plotchecker.FillBetweenPlotChecker.colors`.
+
+        Parameters
+        ----------
+        colors : list of expected band colors
+            Each color can be either a matplotlib color name (e.g. ``'r'`` or
+            ``'red'``), a hexcode (e.g. ``"#FF0000"``), a 3-tuple RGB color, or
+            a 4-tuple RGBA color.
+        kwargs :
+            Additional keyword arguments to pass to
+            ``numpy.testing.assert_allclose``
+
+        """
+        colors = np.array([self._color2rgb(x) for x in colors])
+        np.testing.assert_allclose(self.colors, colors, **kwargs)
+
+    @property
+    def alphas(self):
+        """The alpha values of the plotted bands."""
+        all_alphas = []
+        for x in self._bands:
+            if x.get_alpha() is None:
+                all_alphas.append(self._color2alpha(x.get_facecolor()[0]))
+            else:
+                all_alphas.append(x.get_alpha())
+        return all_alphas
+
+    def assert_alphas_equal(self, alphas):
+        """Assert that the given alpha values are equivalent to the plotted
+        :attr:`~plotchecker.FillBetweenPlotChecker.alphas`.
+
+        Parameters
+        ----------
+        alphas : list of floats
+            The expected alpha values, with length equal to the (expected)
+            number of plotted bands.
+
+        """
+        np.testing.assert_equal(self.alphas, alphas)
+
+    def assert_alphas_allclose(self, alphas, **kwargs):
+        """Assert that the given alpha values are almost equal to the plotted
+        :attr:`~plotchecker.FillBetweenPlotChecker.alphas`.
+
+        Parameters
+        ----------
+        alphas : list of floats
+            The expected alpha values, with length equal to the (expected)
+            number of plotted bands.
+        kwargs :
+            Additional keyword arguments to pass to
+            ``numpy.testing.assert_allclose``
+
+        """
+        np.testing.assert_allclose(self.alphas, alphas, **kwargs)
@@ -0,0 +1,297 @@
+import matplotlib.container
+import matplotlib.patches
+import numpy as np
+
+from .base import PlotChecker, InvalidPlotError
+from .barplot import BarPlotChecker
+
+
+class HistogramChecker(PlotChecker):
+    """A plot checker for histograms.
+
+    Histograms drawn as bars (``histtype='bar'``) as well as histograms drawn
+    as a single outline (``histtype='step'`` or ``histtype='stepfilled'``) are
+    supported, in either orientation. Only a single histogram (i.e. a single
+    dataset) may be plotted on the axes.
+
+    Parameters
+    ----------
+    axis : ``matplotlib.axes.Axes`` object
+        A set of matplotlib axes (e.g. obtained through ``plt.gca()``)
+    artists : list of matplotlib artists, optional
+        Only check these artists of the axes, rather than all of them (e.g.
+        to check one kind of data in a plot that combines several kinds).
+        The texts of the axes are always checked.
+
+    """
+
+    _snapshot_state = ('_bins', '_counts', '_horizontal')
+
+    def __init__(self, axis, artists=None):
+        """Initialize the histogram checker."""
+        super(HistogramChecker, self).__init__(axis, artists=artists)
+
+        containers = self._get_artists(
+            'containers', matplotlib.container.BarContainer)
+        polygons = self._get_artists('patches', matplotlib.patches.Polygon)
+
+        if len(containers) + len(polygons) > 1:
+            raise InvalidPlotError("More than one histogram found")
+
+        if len(polygons) == 1:
+            self._bins, self._counts, self._horizontal = self._parse_polygon(polygons[0])
+        else:
+            horizontal = None
+            if len(containers) == 1:
+                patches = containers[0].patches
+                # older versions of matplotlib don't record the orientation
+                orientation = getattr(containers[0], 'orientation', None)
+                if orientation is not None:
+                    horizontal = orientation == 'horizontal'
+            else:
+                patches = self._get_artists('patches', matplotlib.patches.Rectangle)
+            if len(patches) == 0:
+                raise InvalidPlotError("No data found")
+            self._bins, self._counts, self._horizontal = self._parse_bars(
+                patches, horizontal=horizontal)
+
+    @classmethod
+    def _parse_bars(cls, patches, horizontal=None):
+        """Reconstruct the bin edges and counts of a histogram from its bars.
+        If ``horizontal`` is not given, then the orientation of the bars is
+        inferred from their geometry.
+
+        The bars are narrower than their bins if the histogram was plotted
+        with ``rwidth`` less than one, and they are centered on the left or
+        right edges of their bins if it was plotted with ``align='left'`` or
+        ``align='right'``, so the edges are worked out from the centers and
+        widths of the bars (see ``_bar_edges``), rather than from the edges
+        of the bars themselves.
+
+        Returns
+        -------
+        bins : 1-D array with length equal to the number of bins plus one
+        counts : 1-D array with length equal to the number of bins
+        horizontal : boolean
+
+        """
+        bars = BarPlotChecker._extract_bars(patches, horizontal=horizontal)
+        horizontal = bool(bars['horizontal'][0])
+        if horizontal:
+            lower, size = bars['y'], bars['height']
+        else:
+            lower, size = bars['x'], bars['width']
+
+        bins = cls._bar_edges(lower + size / 2, size)
+        return bins, bars['length'], horizontal
+
+    @classmethod
+    def _bar_edges(cls, centers, widths):
+        """Find the bin edges of the bars of a histogram with the given
+        centers and widths (both sorted by position).
+
+        Each bar is ``rwidth`` times as wide as its bin, and is centered on
+        the middle, the left edge, or the right edge of its bin (depending on
+        the ``align`` option of ``hist``). The bins are contiguous, so the
+        distance between the centers of neighbouring bars gives an estimate
+        of ``rwidth`` for each pair of bars, which must be the same for all
+        the pairs for the right alignment. The alignments are tried in that
+        order, so bars whose bins all have the same width are taken to be
+        aligned with the middle of their bins (as the alignments can't be
+        told apart), and a single bar is taken to fill its bin.
+
+        """
+        if len(centers) == 1:
+            return np.array([centers[0] - widths[0] / 2, centers[0] + widths[0] / 2])
+
+        spacing = np.diff(centers)
+        if np.any(spacing <= 0):
+            raise InvalidPlotError("The bars of the histogram overlap")
+
+        estimates = [
+            ('mid', (widths[:-1] + widths[1:]) / (2 * spacing)),
+            ('left', widths[:-1] / spacing),
+            ('right', widths[1:] / spacing)
+        ]
+        for align, rwidth in estimates:
+            if np.allclose(rwidth, rwidth[0], rtol=1e-6, atol=0):
+                break
+        else:
+            raise InvalidPlotError("The bars of the histogram don't belong to contiguous bins")
+
+        sizes = widths / np.mean(rwidth)
+        if align == 'mid':
+            return np.append(centers - sizes / 2, centers[-1] + sizes[-1] / 2)
+        elif align == 'left':
+            return np.append(centers, centers[-1] + sizes[-1])
+        else:
+            return np.insert(centers, 0, centers[0] - sizes[0])
+
+    @classmethod
+    def _parse_polygon(cls, polygon):
+        """Reconstruct the bin edges and counts of a histogram from the
+        vertices of its outline.
+
+        The outline of a histogram with ``n`` bins starts with ``2n + 2``
+        vertices that trace the top of the bars from the baseline at the first
+        edge to the baseline at the last edge, i.e. ``(e0, b), (e0, c0), (e1,
+        c0), (e1, c1), ..., (en, c[n-1]), (en, b)``. For filled outlines, these
+        are followed by the vertices along the baseline.
+
+        Returns
+        -------
+        bins : 1-D array with length equal to the number of bins plus one
+        counts : 1-D array with length equal to the number of bins
+        horizontal : boolean
+
+        """
+        verts = np.asarray(polygon.get_xy())
+        if polygon.get_fill():
+            num_bins = (len(verts) - 1) // 4
+        else:
+            num_bins = (len(verts) - 2) // 2
+        if num_bins < 1:
+            raise InvalidPlotError("No data found")
+
+        # the vertices come in pairs that share the location of a bin edge,
+        # which tells us which column holds the edges
+        top = verts[:(2 * num_bins) + 2]
+        horizontal = not np.array_equal(top[0::2, 0], top[1::2, 0])
+        if horizontal:
+            top = top[:, ::-1]
+
+        bins = top[0::2, 0]
+        counts = top[1:-1:2, 1] - top[0, 1]
+        return bins, counts, horizontal
+
+    @property
+    def orientation(self):
+        """The orientation of the histogram (either ``'vertical'`` or
+        ``'horizontal'``).
+
+        """
+        return 'horizontal' if self._horizontal else 'vertical'
+
+    def assert_num_bins(self, num_bins):
+        """Assert that the histogram has the given number of bins.
+
+        Parameters
+        ----------
+        num_bins : int
+
+        """
+        if num_bins != len(self._counts):
+            raise AssertionError(
+                "Histogram has incorrect number of bins: {} (expected {})".format(
+                    len(self._counts), num_bins))
+
+    @property
+    def bins(self):
+        """The edges of the bins of the histogram (1-D array, with one more
+        element than the number of bins).
+
+        If all the bins have the same width, then a histogram plotted with
+        ``align='left'`` or ``align='right'`` looks exactly like one with
+        shifted bins, so its bins are taken to be centered on its bars.
+
+        """
+        return self._bins
+
+    def assert_bins_equal(self, bins):
+        """Assert that the given bin edges are equivalent to the plotted
+        :attr:`~plotchecker.HistogramChecker.bins`.
+
+        Parameters
+        ----------
+        bins : 1-D array-like
+            The expected bin edges, including the rightmost edge.
+
+        """
+        np.testing.assert_equal(self.bins, bins)
+
+    def assert_bins_allclose(self, bins, **kwargs):
+        """Assert that the given bin edges are almost equal to the plotted
+        :attr:`~plotchecker.HistogramChecker.bins`.
+
+        Parameters
+        ----------
+        bins : 1-D array-like
+            The expected bin edges, including the rightmost edge.
+        kwargs :
+            Additional keyword arguments to pass to
+            ``numpy.testing.assert_allclose``
+
+        """
+        np.testing.assert_allclose(self.bins, bins, **kwargs)
+
+    @property
+    def counts(self):
+        """The counts (or densities, if the histogram was normalized) of each
+        bin of the histogram.
+
+        """
+        return self._counts
+
+    def assert_counts_equal(self, counts):
+        """Assert that the given counts are equivalent to the plotted
+        :attr:`~plotchecker.HistogramChecker.counts`.
+
+        Parameters
+        ----------
+        counts : 1-D array-like
+            The expected counts, with length equal to the (expected) number of
+            bins.
+
+        """
+        np.testing.assert_equal(self.counts, counts)
+
+    def assert_counts_allclose(self, counts, **kwargs):
+        """Assert that the given counts are almost equal to the plotted
+        :attr:`~plotchecker.HistogramChecker.counts`.
+
+        Parameters
+        ----------
+        counts : 1-D array-like
+            The expected counts, with length equal to the (expected) number of
+            bins.
+        kwargs :
+            Additional keyword arguments to pass to
+            ``numpy.testing.assert_allclose``
+
+        """
+        np.testing.assert_allclose(self.counts, counts, **kwargs)
+
+    def assert_counts_match_samples(self, samples, density=False, weights=None, **kwargs):
+        """Assert that the plotted :attr:`~plotchecker.HistogramChecker.counts`
+        are almost equal to the histogram of the given samples, computed with
+        the plotted :attr:`~plotchecker.HistogramChecker.bins`.
+
+        Parameters
+        ----------
+        samples : 1-D array-like
+            The raw data that the histogram should have been computed from.
+        density : boolean (default: ``False``)
+            Whether the histogram should have been normalized to a density.
+        weights : 1-D array-like (default: ``None``)
+            The weight of each sample, if the histogram was weighted.
+        kwargs :
+            Additional keyword arguments to pass to
+            ``numpy.testing.assert_allclose``
+
+        """
+        samples = np.ravel(samples)
+
+        # the reconstructed outer edges may be off from the original ones by a
+        # rounding error, which would drop the smallest or largest samples
+        # (usually the ones that determined the edges in the first place)
+        bins = np.array(self.bins, dtype=float)
+        if len(samples) > 0:
+            lo, hi = samples.min(), samples.max()
+            if np.isclose(lo, bins[0]):
+                bins[0] = min(bins[0], lo)
+            if np.isclose(hi, bins[-1]):
+                bins[-1] = max(bins[-1], hi)
+
+        expected, _ = np.histogram(
+            samples, bins=bins, density=density, weights=weights)
+        np.testing.assert_allclose(self.counts, expected, **kwargs)
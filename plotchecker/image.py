@@ -0,0 +1,265 @@
+import importlib
+import inspect
+
+import matplotlib.colors
+import numpy as np
+
+from .base import PlotChecker, InvalidPlotError
+
+
+class _ColorMappedPlotChecker(PlotChecker):
+    """Common functionality for plot checkers of data that is mapped to colors
+    through a colormap (images, meshes and contours). Subclasses should set
+    ``self._mappable`` to the relevant ``matplotlib.cm.ScalarMappable``.
+
+    """
+
+    _snapshot_attrs = PlotChecker._snapshot_attrs + ('cmap', '_norm_state', 'clim')
+
+    def _compare_grids(self, actual, expected, func, downsample, **kwargs):
+        """Compare a plotted grid of values (e.g. image data) to the given
+        expected grid using ``func``, optionally downsampling both of them
+        first.
+
+        """
+        expected = np.asanyarray(expected)
+        if downsample is not None:
+            if actual.shape != expected.shape:
+                raise AssertionError(
+                    "Arrays have different shapes: {} (expected {})".format(
+                        actual.shape, expected.shape))
+            actual = self._block_mean(actual, downsample)
+            expected = self._block_mean(expected, downsample)
+        self._assert_within_budget(actual, expected, func=func, **kwargs)
+
+    @property
+    def cmap(self):
+        """The name of the colormap of the plotted data."""
+        return self._mappable.get_cmap().name
+
+    def assert_cmap_equal(self, cmap):
+        """Assert that the given colormap is the same as the plotted
+        :attr:`cmap`.
+
+        Parameters
+        ----------
+        cmap : string or ``matplotlib.colors.Colormap``
+            The expected colormap, or its name.
+
+        """
+        if isinstance(cmap, matplotlib.colors.Colormap):
+            cmap = cmap.name
+        if self.cmap != cmap:
+            raise AssertionError(
+                "cmap is incorrect: '{}' (expected '{}')".format(
+                    self.cmap, cmap))
+
+    @property
+    def norm(self):
+        """The ``matplotlib.colors.Normalize`` instance used to map the plotted
+        data to colors.
+
+        Snapshots (see :meth:`~plotchecker.PlotChecker.snapshot`) only store
+        the type of the norm and the arguments it was created with (e.g. its
+        limits, or the ``vcenter`` of a ``TwoSlopeNorm``), so for snapshots
+        this is a new norm of the same type, created with the same arguments.
+        Norms whose arguments can't all be found (e.g. a ``FuncNorm``) can't
+        be stored in snapshots.
+
+        """
+        if not hasattr(self, '_mappable'):
+            return self._make_norm(*self._norm_state)
+        return self._mappable.norm
+
+    @property
+    def _norm_state(self):
+        """The module and name of the class of the
+        :attr:`~plotchecker.ImagePlotChecker.norm`, and a dictionary of the
+        keyword arguments to create it with, which are found by looking up
+        each parameter of its constructor as an attribute of the norm.
+
+        """
+        norm = self.norm
+        name = type(norm).__name__
+        kwargs = {}
+        for param in inspect.signature(type(norm)).parameters.values():
+            if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+                continue
+            if not hasattr(norm, param.name):
+                raise InvalidPlotError(
+                    "The {} of the plot can't be stored in a snapshot, as its "
+                    "'{}' is unknown".format(name, param.name))
+            kwargs[param.name] = getattr(norm, param.name)
+        return (type(norm).__module__, name, kwargs)
+
+    @classmethod
+    def _make_norm(cls, module, name, kwargs):
+        """Create a norm from its state (see ``_norm_state``)."""
+        norm_cls = getattr(importlib.import_module(module), name)
+        return norm_cls(**kwargs)
+
+    @property
+    def clim(self):
+        """The color limits of the plotted data, as ``(vmin, vmax)``."""
+        return tuple(self._mappable.get_clim())
+
+    def assert_clim_equal(self, clim):
+        """Assert that the given color limits are equivalent to the plotted
+        :attr:`clim`.
+
+        Parameters
+        ----------
+        clim : 2-tuple
+            The expected color limits, as ``(vmin, vmax)``.
+
+        """
+        np.testing.assert_equal(self.clim, tuple(clim))
+
+    def assert_clim_allclose(self, clim, **kwargs):
+        """Assert that the given color limits are almost equal to the plotted
+        :attr:`clim`.
+
+        Parameters
+        ----------
+        clim : 2-tuple
+            The expected color limits, as ``(vmin, vmax)``.
+        kwargs :
+            Additional keyword arguments to pass to
+            ``numpy.testing.assert_allclose``
+
+        """
+        np.testing.assert_allclose(self.clim, clim, **kwargs)
+
+
+class ImagePlotChecker(_ColorMappedPlotChecker):
+    """A plot checker for images, i.e. plots created with ``imshow`` or
+    ``matshow``. Only a single image may be plotted on the axes.
+
+    Large images are compared a chunk at a time (stopping at the first chunk
+    that doesn't match), and can optionally be downsampled before they are
+    compared (see :meth:`~plotchecker.ImagePlotChecker.assert_array_allclose`).
+    The colormap and color limits of the image can be checked with
+    ``cmap``, ``norm`` and ``clim``.
+
+    Parameters
+    ----------
+    axis : ``matplotlib.axes.Axes`` object
+        A set of matplotlib axes (e.g. obtained through ``plt.gca()``)
+    artists : list of matplotlib artists, optional
+        Only check these artists of the axes, rather than all of them (e.g.
+        to check one kind of data in a plot that combines several kinds).
+        The texts of the axes are always checked.
+
+    """
+
+    _snapshot_attrs = _ColorMappedPlotChecker._snapshot_attrs + (
+        'array', 'extent', 'interpolation')
+
+    def __init__(self, axis, artists=None):
+        """Initialize the image plot checker."""
+        super(ImagePlotChecker, self).__init__(axis, artists=artists)
+        images = self._get_artists('images')
+
+        if len(images) == 0:
+            raise InvalidPlotError("No image found")
+        if len(images) > 1:
+            raise InvalidPlotError("More than one image found")
+
+        self._mappable = images[0]
+
+    @property
+    def array(self):
+        """The data of the plotted image. This is the array that is stored by
+        matplotlib (not a copy of it), so it should not be modified.
+
+        """
+        return self._mappable.get_array()
+
+    def assert_array_equal(self, array, downsample=None):
+        """Assert that the given array is equivalent to the plotted
+        :attr:`~plotchecker.ImagePlotChecker.array`.
+
+        Parameters
+        ----------
+        array : array-like
+            The expected image data.
+        downsample : int (default: ``None``)
+            If given, both images are downsampled by averaging over blocks of
+            ``downsample``-by-``downsample`` pixels before they are compared.
+
+        """
+        self._compare_grids(
+            self.array, array, np.testing.assert_equal, downsample)
+
+    def assert_array_allclose(self, array, downsample=None, **kwargs):
+        """Assert that the given array is almost equal to the plotted
+        :attr:`~plotchecker.ImagePlotChecker.array`.
+
+        Parameters
+        ----------
+        array : array-like
+            The expected image data.
+        downsample : int (default: ``None``)
+            If given, both images are downsampled by averaging over blocks of
+            ``downsample``-by-``downsample`` pixels before they are compared.
+            This is useful for very large images, as the downsampling is done
+            in bounded memory.
+        kwargs :
+            Additional keyword arguments to pass to
+            ``numpy.testing.assert_allclose``
+
+        """
+        self._compare_grids(
+            self.array, array, np.testing.assert_allclose, downsample, **kwargs)
+
+    @property
+    def extent(self):
+        """The extent of the plotted image, as ``(left, right, bottom, top)``."""
+        return tuple(self._mappable.get_extent())
+
+    def assert_extent_equal(self, extent):
+        """Assert that the given extent is equivalent to the plotted
+        :attr:`~plotchecker.ImagePlotChecker.extent`.
+
+        Parameters
+        ----------
+        extent : 4-tuple
+            The expected extent, as ``(left, right, bottom, top)``.
+
+        """
+        np.testing.assert_equal(self.extent, tuple(extent))
+
+    def assert_extent_allclose(self, extent, **kwargs):
+        """Assert that the given extent is almost equal to the plotted
+        :attr:`~plotchecker.ImagePlotChecker.extent`.
+
+        Parameters
+        ----------
+        extent : 4-tuple
+            The expected extent, as ``(left, right, bottom, top)``.
+        kwargs :
+            Additional keyword arguments to pass to
+            ``numpy.testing.assert_allclose``
+
+        """
+        np.testing.assert_allclose(self.extent, extent, **kwargs)
+
+    @property
+    def interpolation(self):
+        """The interpolation method of the plotted image."""
+        return self._mappable.get_interpolation()
+
+    def assert_interpolation_equal(self, interpolation):
+        """Assert that the given interpolation method is the same as the
+        plotted :attr:`~plotchecker.ImagePlotChecker.interpolation`.
+
+        Parameters
+        ----------
+        interpolation : string
+            The expected interpolation method (e.g. ``'nearest'``).
+
+        """
+        if self.interpolation != interpolation:
+            raise AssertionError(
+                "interpolation is incorrect: '{}' (expected '{}')".format(
+                    self.interpolation, interpolation))
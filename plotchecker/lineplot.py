@@ -11,13 +11,23 @@ class LinePlotChecker(PlotChecker):
     ----------
     axis : ``matplotlib.axes.Axes`` object
         A set of matplotlib axes (e.g. obtained through ``plt.gca()``)
+    artists : list of matplotlib artists, optional
+        Only check these artists of the axes, rather than all of them (e.g.
+        to check one kind of data in a plot that combines several kinds).
+        The texts of the axes are always checked.
 
     """
 
-    def __init__(self, axis):
+    _snapshot_attrs = PlotChecker._snapshot_attrs + (
+        'x_data', 'y_data', 'colors', 'alphas', 'linewidths',
+        'markerfacecolors', 'markeredgecolors', 'markeredgewidths',
+        'markersizes', 'markers', 'labels', 'legend_labels')
+    _snapshot_state = ('_perm',)
+
+    def __init__(self, axis, artists=None):
         """Initialize the line plot checker."""
-        super(LinePlotChecker, self).__init__(axis)
-        self._lines = self.axis.get_lines()
+        super(LinePlotChecker, self).__init__(axis, artists=artists)
+        self._lines = self._get_artists('lines')
         self._perm = list(range(len(self._lines)))
 
         # check that there are some lines plotted
@@ -76,15 +86,24 @@ class LinePlotChecker(PlotChecker):
 
     def _assert_allclose(self, attr, expected, actual, perm=None, **kwargs):
         """Wrapper for ``self._assert_equal`` that passes
-        ``numpy.testing.assert_allclose`` as the assertion function.
+        ``numpy.testing.assert_allclose`` (or its single precision version, if
+        ``reduced_precision`` is enabled) as the assertion function, comparing
+        the data within the ``memory_budget``.
 
         """
         self._assert_equal(
             attr, expected, actual,
             perm=perm,
-            func=np.testing.assert_allclose,
+            func=self._budgeted(self._allclose),
             **kwargs)
 
+    def _convert_line_dates(self, data):
+        """Convert the expected data of each line from dates, if necessary
+        (see ``_convert_dates``).
+
+        """
+        return [self._convert_dates(x) for x in data]
+
     def find_permutation(self, attr_name, attr_vals):
         """Find the order of the lines such that the given attribute (given
         by ``attr_name`` and ``attr_vals``) has values in the same order as those
@@ -179,10 +198,10 @@ class LinePlotChecker(PlotChecker):
         num_lines : int
 
         """
-        if num_lines != len(self._lines):
+        if num_lines != len(self.x_data):
             raise AssertionError(
                 "Plot has incorrect number of lines: {} (expected {})".format(
-                    len(self._lines), num_lines))
+                    len(self.x_data), num_lines))
 
     @property
     def x_data(self):
@@ -197,10 +216,13 @@ class LinePlotChecker(PlotChecker):
         ----------
         x_data : list of array-like
             The expected x-data. The number of elements should be equal to the
-            (expected) number of plotted lines.
+            (expected) number of plotted lines. The data may also be given as
+            dates (e.g. arrays of ``numpy.datetime64``).
 
         """
-        self._assert_equal("x_data", x_data, self.x_data)
+        self._assert_equal(
+            "x_data", self._convert_line_dates(x_data), self.x_data,
+            func=self._budgeted(np.testing.assert_equal))
 
     def assert_x_data_allclose(self, x_data, **kwargs):
         """Assert that the given x-data is almost equal to the plotted
@@ -210,13 +232,15 @@ class LinePlotChecker(PlotChecker):
         ----------
         x_data : list of array-like
             The expected x-data. The number of elements should be equal to the
-            (expected) number of plotted lines.
+            (expected) number of plotted lines. The data may also be given as
+            dates (e.g. arrays of ``numpy.datetime64``).
         kwargs :
             Additional keyword arguments to pass to
             ``numpy.testing.assert_allclose``
 
         """
-        self._assert_allclose("x_data", x_data, self.x_data, **kwargs)
+        actual, expected = self._scaled_data("x_data", "x", self._convert_line_dates(x_data))
+        self._assert_allclose("x_data", expected, actual, **kwargs)
 
     @property
     def y_data(self):
@@ -231,10 +255,13 @@ class LinePlotChecker(PlotChecker):
         ----------
         y_data : list of array-like
             The expected y-data. The number of elements should be equal to the
-            (expected) number of plotted lines.
+            (expected) number of plotted lines. The data may also be given as
+            dates (e.g. arrays of ``numpy.datetime64``).
 
         """
-        self._assert_equal("y_data", y_data, self.y_data)
+        self._assert_equal(
+            "y_data", self._convert_line_dates(y_data), self.y_data,
+            func=self._budgeted(np.testing.assert_equal))
 
     def assert_y_data_allclose(self, y_data, **kwargs):
         """Assert that the given y-data is almost equal to the plotted
@@ -244,13 +271,15 @@ class LinePlotChecker(PlotChecker):
         ----------
         y_data : list of array-like
             The expected y-data. The number of elements should be equal to the
-            (expected) number of plotted lines.
+            (expected) number of plotted lines. The data may also be given as
+            dates (e.g. arrays of ``numpy.datetime64``).
         kwargs :
             Additional keyword arguments to pass to
             ``numpy.testing.assert_allclose``
 
         """
-        self._assert_allclose("y_data", y_data, self.y_data, **kwargs)
+        actual, expected = self._scaled_data("y_data", "y", self._convert_line_dates(y_data))
+        self._assert_allclose("y_data", expected, actual, **kwargs)
 
     @property
     def colors(self):
@@ -551,3 +580,39 @@ class LinePlotChecker(PlotChecker):
 
         """
         self._assert_equal("labels", labels, self.labels)
+
+    @property
+    def legend_labels(self):
+        """The legend label of each plotted line, or ``None`` for lines that
+        are not in the legend.
+
+        Unlike :attr:`~plotchecker.LinePlotChecker.labels` (which lists the
+        legend entries in the order they appear in the legend), these labels
+        are in the same order as the lines themselves, so they can be checked
+        together with the other attributes of the lines. For example, to
+        check that the red line is labeled ``'train'`` and the blue line is
+        labeled ``'test'``:
+
+        .. code:: python
+
+            pc = LinePlotChecker(ax)
+            pc.find_permutation('colors', ['r', 'b'])
+            pc.assert_legend_labels_equal(['train', 'test'])
+
+        """
+        index = self._legend_index
+        return [index.get(id(x)) for x in self._lines]
+
+    def assert_legend_labels_equal(self, legend_labels):
+        """Assert that the given legend labels are equivalent to the plotted
+        :attr:`~plotchecker.LinePlotChecker.legend_labels`.
+
+        Parameters
+        ----------
+        legend_labels : list of strings
+            The expected legend label of each line (or ``None`` for lines that
+            should not be in the legend), with length equal to the (expected)
+            number of plotted lines.
+
+        """
+        self._assert_equal("legend_labels", legend_labels, self.legend_labels)
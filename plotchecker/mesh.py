@@ -0,0 +1,357 @@
+import matplotlib
+import matplotlib.collections
+import matplotlib.contour
+import numpy as np
+
+from .base import InvalidPlotError
+from .image import _ColorMappedPlotChecker
+
+
+def _matplotlib_version():
+    """The major and minor version of matplotlib, as a tuple of ints."""
+    return tuple(int(x) for x in matplotlib.__version__.split('.')[:2])
+
+
+class MeshPlotChecker(_ColorMappedPlotChecker):
+    """A plot checker for quadrilateral meshes, i.e. plots created with
+    ``pcolormesh`` or ``hist2d``. Only a single mesh may be plotted on the
+    axes.
+
+    Like :class:`~plotchecker.ImagePlotChecker`, large meshes are compared a
+    chunk at a time, and the values of the mesh can optionally be downsampled
+    before they are compared.
+
+    Parameters
+    ----------
+    axis : ``matplotlib.axes.Axes`` object
+        A set of matplotlib axes (e.g. obtained through ``plt.gca()``)
+    artists : list of matplotlib artists, optional
+        Only check these artists of the axes, rather than all of them (e.g.
+        to check one kind of data in a plot that combines several kinds).
+        The texts of the axes are always checked.
+
+    """
+
+    _snapshot_attrs = _ColorMappedPlotChecker._snapshot_attrs + (
+        'coordinates', 'values')
+
+    def __init__(self, axis, artists=None):
+        """Initialize the mesh plot checker."""
+        super(MeshPlotChecker, self).__init__(axis, artists=artists)
+        meshes = self._get_artists('collections', matplotlib.collections.QuadMesh)
+
+        if len(meshes) == 0:
+            raise InvalidPlotError("No mesh found")
+        if len(meshes) > 1:
+            raise InvalidPlotError("More than one mesh found")
+
+        self._mappable = meshes[0]
+
+    @property
+    def coordinates(self):
+        """The coordinates of the vertices of the mesh, as an array with shape
+        ``(M + 1, N + 1, 2)`` for a mesh of ``M``-by-``N`` cells.
+
+        """
+        return self._mappable.get_coordinates()
+
+    @property
+    def x_coordinates(self):
+        """The x-coordinates of the vertices of the mesh, with shape ``(M + 1,
+        N + 1)``.
+
+        """
+        return self.coordinates[..., 0]
+
+    def assert_x_coordinates_equal(self, x_coordinates):
+        """Assert that the given x-coordinates are equivalent to the plotted
+        :attr:`~plotchecker.MeshPlotChecker.x_coordinates`.
+
+        Parameters
+        ----------
+        x_coordinates : array-like
+            The expected x-coordinates, either with the same shape as the mesh
+            vertices, or as a 1-D array of the cell edges along the x-axis.
+
+        """
+        self._assert_within_budget(
+            self.x_coordinates,
+            self._parse_expected_coordinates("x", x_coordinates))
+
+    def assert_x_coordinates_allclose(self, x_coordinates, **kwargs):
+        """Assert that the given x-coordinates are almost equal to the plotted
+        :attr:`~plotchecker.MeshPlotChecker.x_coordinates`.
+
+        Parameters
+        ----------
+        x_coordinates : array-like
+            The expected x-coordinates, either with the same shape as the mesh
+            vertices, or as a 1-D array of the cell edges along the x-axis.
+        kwargs :
+            Additional keyword arguments to pass to
+            ``numpy.testing.assert_allclose``
+
+        """
+        self._assert_within_budget(
+            self.x_coordinates,
+            self._parse_expected_coordinates("x", x_coordinates),
+            func=np.testing.assert_allclose,
+            **kwargs)
+
+    @property
+    def y_coordinates(self):
+        """The y-coordinates of the vertices of the mesh, with shape ``(M + 1,
+        N + 1)``.
+
+        """
+        return self.coordinates[..., 1]
+
+    def assert_y_coordinates_equal(self, y_coordinates):
+        """Assert that the given y-coordinates are equivalent to the plotted
+        :attr:`~plotchecker.MeshPlotChecker.y_coordinates`.
+
+        Parameters
+        ----------
+        y_coordinates : array-like
+            The expected y-coordinates, either with the same shape as the mesh
+            vertices, or as a 1-D array of the cell edges along the y-axis.
+
+        """
+        self._assert_within_budget(
+            self.y_coordinates,
+            self._parse_expected_coordinates("y", y_coordinates))
+
+    def assert_y_coordinates_allclose(self, y_coordinates, **kwargs):
+        """Assert that the given y-coordinates are almost equal to the plotted
+        :attr:`~plotchecker.MeshPlotChecker.y_coordinates`.
+
+        Parameters
+        ----------
+        y_coordinates : array-like
+            The expected y-coordinates, either with the same shape as the mesh
+            vertices, or as a 1-D array of the cell edges along the y-axis.
+        kwargs :
+            Additional keyword arguments to pass to
+            ``numpy.testing.assert_allclose``
+
+        """
+        self._assert_within_budget(
+            self.y_coordinates,
+            self._parse_expected_coordinates("y", y_coordinates),
+            func=np.testing.assert_allclose,
+            **kwargs)
+
+    def _parse_expected_coordinates(self, axis_name, coordinates):
+        """Broadcast 1-D cell edges to the shape of the mesh vertices (without
+        copying them).
+
+        """
+        coordinates = np.asanyarray(coordinates)
+        if coordinates.ndim == 1:
+            if axis_name == "y":
+                coordinates = coordinates[:, np.newaxis]
+            try:
+                coordinates = np.broadcast_to(
+                    coordinates, self.coordinates.shape[:2])
+            except ValueError:
+                raise AssertionError(
+                    "Invalid number of {}-coordinates: {} (expected {})".format(
+                        axis_name, coordinates.size, self.coordinates.shape[:2]))
+        return coordinates
+
+    @property
+    def values(self):
+        """The values of the cells of the mesh, with shape ``(M, N)``."""
+        values = self._mappable.get_array()
+        shape = tuple(x - 1 for x in self.coordinates.shape[:2])
+        if values.ndim == 1 and values.size == shape[0] * shape[1]:
+            values = values.reshape(shape)
+        return values
+
+    def assert_values_equal(self, values, downsample=None):
+        """Assert that the given values are equivalent to the plotted
+        :attr:`~plotchecker.MeshPlotChecker.values`.
+
+        Parameters
+        ----------
+        values : array-like
+            The expected values of the cells.
+        downsample : int (default: ``None``)
+            If given, both the plotted and expected values are downsampled by
+            averaging over blocks of ``downsample``-by-``downsample`` cells
+            before they are compared.
+
+        """
+        self._compare_grids(
+            self.values, values, np.testing.assert_equal, downsample)
+
+    def assert_values_allclose(self, values, downsample=None, **kwargs):
+        """Assert that the given values are almost equal to the plotted
+        :attr:`~plotchecker.MeshPlotChecker.values`.
+
+        Parameters
+        ----------
+        values : array-like
+            The expected values of the cells.
+        downsample : int (default: ``None``)
+            If given, both the plotted and expected values are downsampled by
+            averaging over blocks of ``downsample``-by-``downsample`` cells
+            before they are compared.
+        kwargs :
+            Additional keyword arguments to pass to
+            ``numpy.testing.assert_allclose``
+
+        """
+        self._compare_grids(
+            self.values, values, np.testing.assert_allclose, downsample, **kwargs)
+
+
+class ContourPlotChecker(_ColorMappedPlotChecker):
+    """A plot checker for contour plots, i.e. plots created with ``contour``
+    or ``contourf``. Only a single set of contours may be plotted on the axes.
+
+    This requires matplotlib 3.8 or later, as earlier versions don't add the
+    contours to the axes themselves (only the collections they are drawn
+    with, which don't refer back to the contours).
+
+    Parameters
+    ----------
+    axis : ``matplotlib.axes.Axes`` object
+        A set of matplotlib axes (e.g. obtained through ``plt.gca()``)
+    artists : list of matplotlib artists, optional
+        Only check these artists of the axes, rather than all of them (e.g.
+        to check one kind of data in a plot that combines several kinds).
+        The texts of the axes are always checked.
+
+    """
+
+    _snapshot_attrs = _ColorMappedPlotChecker._snapshot_attrs + (
+        'filled', 'levels', 'segments')
+
+    def __init__(self, axis, artists=None):
+        """Initialize the contour plot checker."""
+        super(ContourPlotChecker, self).__init__(axis, artists=artists)
+        if _matplotlib_version() < (3, 8):
+            raise InvalidPlotError(
+                "Checking contours requires matplotlib 3.8 or later "
+                "(found {})".format(matplotlib.__version__))
+
+        contours = self._get_artists('collections', matplotlib.contour.ContourSet)
+
+        if len(contours) == 0:
+            raise InvalidPlotError("No contours found")
+        if len(contours) > 1:
+            raise InvalidPlotError("More than one set of contours found")
+
+        self._mappable = contours[0]
+
+    @property
+    def filled(self):
+        """Whether the contours are filled (i.e. created with ``contourf``)."""
+        return bool(self._mappable.filled)
+
+    @property
+    def levels(self):
+        """The contour levels."""
+        return np.asarray(self._mappable.levels)
+
+    def assert_levels_equal(self, levels):
+        """Assert that the given levels are equivalent to the plotted
+        :attr:`~plotchecker.ContourPlotChecker.levels`.
+
+        Parameters
+        ----------
+        levels : 1-D array-like
+            The expected contour levels.
+
+        """
+        np.testing.assert_equal(self.levels, levels)
+
+    def assert_levels_allclose(self, levels, **kwargs):
+        """Assert that the given levels are almost equal to the plotted
+        :attr:`~plotchecker.ContourPlotChecker.levels`.
+
+        Parameters
+        ----------
+        levels : 1-D array-like
+            The expected contour levels.
+        kwargs :
+            Additional keyword arguments to pass to
+            ``numpy.testing.assert_allclose``
+
+        """
+        np.testing.assert_allclose(self.levels, levels, **kwargs)
+
+    @property
+    def segments(self):
+        """The vertices of the contours. This is a list with one element per
+        contour level (or, for filled contours, per pair of adjacent levels),
+        each of which is a list of N-by-2 arrays of vertices.
+
+        """
+        return self._mappable.allsegs
+
+    def _assert_segments(self, segments, func, **kwargs):
+        """Compare the plotted segments to the given segments using ``func``,
+        one level at a time.
+
+        """
+        actual = self.segments
+        if len(actual) != len(segments):
+            raise AssertionError(
+                "Invalid number of contour levels: {} (expected {})".format(
+                    len(actual), len(segments)))
+
+        for i in range(len(actual)):
+            if len(actual[i]) != len(segments[i]):
+                raise AssertionError(
+                    "Invalid number of segments for level {}: {} (expected {})".format(
+                        i, len(actual[i]), len(segments[i])))
+            if len(actual[i]) == 0:
+                continue
+
+            # the plotted and expected segments are both concatenated
+            num_points = sum(len(x) for x in actual[i])
+            self._check_memory(
+                4 * np.dtype(float).itemsize * num_points,
+                "The segments of contour level {}".format(i))
+
+            try:
+                self._assert_within_budget(
+                    np.concatenate(actual[i]),
+                    np.concatenate([np.asarray(x) for x in segments[i]]),
+                    func=func, **kwargs)
+            except AssertionError as e:
+                raise AssertionError(
+                    "Segments do not match for level {}: {}".format(i, e))
+
+    def assert_segments_equal(self, segments):
+        """Assert that the given segments are equivalent to the plotted
+        :attr:`~plotchecker.ContourPlotChecker.segments`.
+
+        Parameters
+        ----------
+        segments : list of lists of arrays
+            The expected segments, in the same format as the plotted
+            :attr:`~plotchecker.ContourPlotChecker.segments` (e.g. the
+            ``allsegs`` attribute of a reference contour set).
+
+        """
+        self._assert_segments(segments, np.testing.assert_equal)
+
+    def assert_segments_allclose(self, segments, **kwargs):
+        """Assert that the given segments are almost equal to the plotted
+        :attr:`~plotchecker.ContourPlotChecker.segments`.
+
+        Parameters
+        ----------
+        segments : list of lists of arrays
+            The expected segments, in the same format as the plotted
+            :attr:`~plotchecker.ContourPlotChecker.segments` (e.g. the
+            ``allsegs`` attribute of a reference contour set).
+        kwargs :
+            Additional keyword arguments to pass to
+            ``numpy.testing.assert_allclose``
+
+        """
+        self._assert_segments(segments, np.testing.assert_allclose, **kwargs)
@@ -0,0 +1,372 @@
+"""
+Counters and latency histograms for monitoring how plots are graded (e.g.
+for capacity planning of a grading server). The following metrics are
+recorded in the default :data:`~plotchecker.metrics.registry`:
+
+``plotchecker_checkers_total`` (labels: ``checker``, ``result``)
+    The number of plot checkers that have been constructed, where the
+    ``result`` is ``ok``, ``invalid`` (if the plot was rejected with an
+    :class:`~plotchecker.InvalidPlotError`), or ``error`` (if any other
+    exception was raised).
+``plotchecker_extraction_seconds`` (labels: ``checker``)
+    The time taken to construct each plot checker, which is when the data is
+    extracted from the plot.
+``plotchecker_rubric_items_total`` (labels: ``item``, ``result``)
+    The number of rubric items that have been run (see
+    :func:`plotchecker.run_rubric`), where the ``item`` is the name of the
+    item (e.g. ``assert_x_data_equal``), and the ``result`` is ``passed``,
+    ``failed``, ``over_budget`` or ``error`` (see
+    :func:`plotchecker.rubric.run_rubric_item`).
+``plotchecker_rubric_item_seconds`` (labels: ``item``)
+    The time taken to run each rubric item.
+``plotchecker_assertions_total`` (labels: ``checker``, ``assertion``, ``result``)
+    The number of times that the assertions of the plot checkers (their
+    ``assert_*`` methods) have been called, however they are called (e.g.
+    directly, or through a rubric), where the ``result`` is ``passed``,
+    ``failed``, ``over_budget`` (if the memory budget of the checker was
+    exceeded) or ``error``. Assertions that are called by other assertions
+    are not counted separately.
+``plotchecker_assertion_seconds`` (labels: ``checker``, ``assertion``)
+    The time taken by each assertion.
+
+The grading server (see :mod:`plotchecker.server`) collects these metrics
+from its workers, and also records:
+
+``plotchecker_requests_total`` (labels: ``status``)
+    The number of requests to grade a plot, by the HTTP status of the
+    response.
+``plotchecker_request_seconds``
+    The time taken to respond to each request to grade a plot.
+
+The metrics can be exported in the Prometheus text format, or as a JSON
+snapshot that also includes the median and 99th percentile of each
+histogram:
+
+.. code:: python
+
+    from plotchecker import metrics
+
+    for ax in submissions:
+        run_rubric(LinePlotChecker(ax), rubric)
+
+    metrics.write_prometheus('plotchecker.prom')
+    metrics.write_json('plotchecker.json')
+"""
+
+import json
+import threading
+from timeit import default_timer
+
+#: The upper bounds (in seconds) of the buckets of the latency histograms.
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labels):
+    """A hashable key for a dictionary of labels."""
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    """Format the labels of a metric for the Prometheus text format."""
+    pairs = list(key) + list(extra)
+    if len(pairs) == 0:
+        return ''
+    return '{' + ','.join(
+        '{}="{}"'.format(k, v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class MetricsRegistry(object):
+    """A set of counters and histograms, each identified by a name and a set
+    of labels. All the methods are thread-safe.
+
+    Parameters
+    ----------
+    buckets : tuple of floats (default: ``LATENCY_BUCKETS``)
+        The upper bounds of the buckets of the histograms.
+
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        """Initialize an empty registry."""
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def inc(self, name, labels=None, value=1):
+        """Increase a counter.
+
+        Parameters
+        ----------
+        name : string
+            The name of the counter.
+        labels : dict (default: ``None``)
+            The labels of the counter.
+        value : number (default: 1)
+            The amount to increase the counter by.
+
+        """
+        key = (name, _label_key(labels or {}))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=None):
+        """Record a value (e.g. a duration in seconds) in a histogram.
+
+        Parameters
+        ----------
+        name : string
+            The name of the histogram.
+        value : float
+            The value to record.
+        labels : dict (default: ``None``)
+            The labels of the histogram.
+
+        """
+        key = (name, _label_key(labels or {}))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = {
+                    'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0}
+            i = 0
+            while i < len(self.buckets) and value > self.buckets[i]:
+                i += 1
+            hist['counts'][i] += 1
+            hist['sum'] += value
+
+    def time(self, name, labels=None):
+        """A context manager that records how long its body takes in the
+        given histogram.
+
+        """
+        return _Timer(self, name, labels)
+
+    def quantile(self, name, q, labels=None):
+        """Estimate a quantile of a histogram, by interpolating linearly
+        within the bucket that contains it (in the same way as Prometheus'
+        ``histogram_quantile``).
+
+        Parameters
+        ----------
+        name : string
+            The name of the histogram.
+        q : float
+            The quantile, between 0 and 1 (e.g. 0.99 for the 99th
+            percentile).
+        labels : dict (default: ``None``)
+            The labels of the histogram.
+
+        Returns
+        -------
+        value : float, or ``None`` if nothing has been recorded
+
+        """
+        key = (name, _label_key(labels or {}))
+        with self._lock:
+            hist = self._histograms.get(key)
+            counts = list(hist['counts']) if hist is not None else None
+        return self._quantile(counts, q)
+
+    def _quantile(self, counts, q):
+        if counts is None or sum(counts) == 0:
+            return None
+
+        rank = q * sum(counts)
+        cumulative = 0
+        for i, count in enumerate(counts):
+            if count > 0 and cumulative + count >= rank:
+                # values above the largest bucket can't be interpolated
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+
+    def reset(self):
+        """Remove all the counters and histograms."""
+        with self._lock:
+            self._counters = {}
+            self._histograms = {}
+
+    def to_json(self):
+        """A JSON-serializable snapshot of the metrics.
+
+        Returns
+        -------
+        snapshot : dict
+            A dictionary with a list of ``counters`` (each with a ``name``,
+            ``labels`` and ``value``) and a list of ``histograms`` (each with a
+            ``name``, ``labels``, the ``count`` and ``sum`` of the recorded
+            values, the upper bound and count of each of the ``buckets``, and
+            estimates of the ``p50`` and ``p99``).
+
+        """
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(
+                (key, list(hist['counts']), hist['sum'])
+                for key, hist in self._histograms.items())
+
+        bounds = list(self.buckets) + [None]
+        return {
+            'counters': [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in counters],
+            'histograms': [
+                {
+                    'name': name,
+                    'labels': dict(labels),
+                    'count': sum(counts),
+                    'sum': total,
+                    'buckets': [[le, count] for le, count in zip(bounds, counts)],
+                    'p50': self._quantile(counts, 0.5),
+                    'p99': self._quantile(counts, 0.99)
+                }
+                for (name, labels), counts, total in histograms]
+        }
+
+    def merge(self, snapshot):
+        """Add the metrics from a snapshot created by
+        :meth:`~plotchecker.metrics.MetricsRegistry.to_json` (e.g. by another
+        process) to this registry. The histograms must have the same buckets.
+
+        """
+        with self._lock:
+            for counter in snapshot['counters']:
+                key = (counter['name'], _label_key(counter['labels']))
+                self._counters[key] = self._counters.get(key, 0) + counter['value']
+
+            for hist in snapshot['histograms']:
+                bounds = [le for le, _ in hist['buckets'][:-1]]
+                if tuple(bounds) != self.buckets:
+                    raise ValueError(
+                        "Histogram {} has different buckets".format(hist['name']))
+                key = (hist['name'], _label_key(hist['labels']))
+                ours = self._histograms.get(key)
+                if ours is None:
+                    ours = self._histograms[key] = {
+                        'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0}
+                for i, (_, count) in enumerate(hist['buckets']):
+                    ours['counts'][i] += count
+                ours['sum'] += hist['sum']
+
+    def drain(self):
+        """Take a snapshot of the metrics (see
+        :meth:`~plotchecker.metrics.MetricsRegistry.to_json`) and reset them,
+        e.g. to pass on what a worker process has recorded since the last
+        time it was drained.
+
+        """
+        with self._lock:
+            counters, histograms = self._counters, self._histograms
+            self._counters = {}
+            self._histograms = {}
+        drained = MetricsRegistry(self.buckets)
+        drained._counters = counters
+        drained._histograms = histograms
+        return drained.to_json()
+
+    def to_prometheus(self):
+        """The metrics in the Prometheus text exposition format.
+
+        Returns
+        -------
+        text : string
+
+        """
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(
+                (key, list(hist['counts']), hist['sum'])
+                for key, hist in self._histograms.items())
+
+        lines = []
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                lines.append('# TYPE {} counter'.format(name))
+                typed.add(name)
+            lines.append('{}{} {}'.format(name, _format_labels(labels), _format_value(value)))
+
+        bounds = list(self.buckets) + [float('inf')]
+        for (name, labels), counts, total in histograms:
+            if name not in typed:
+                lines.append('# TYPE {} histogram'.format(name))
+                typed.add(name)
+            cumulative = 0
+            for le, count in zip(bounds, counts):
+                cumulative += count
+                lines.append('{}_bucket{} {}'.format(
+                    name, _format_labels(labels, [('le', _format_value(le))]), cumulative))
+            lines.append('{}_sum{} {}'.format(name, _format_labels(labels), _format_value(total)))
+            lines.append('{}_count{} {}'.format(name, _format_labels(labels), cumulative))
+
+        return '\n'.join(lines) + '\n'
+
+
+class _Timer(object):
+    """Record the duration of a ``with`` block in a histogram."""
+
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = default_timer()
+        return self
+
+    def __exit__(self, *args):
+        self.registry.observe(self.name, default_timer() - self.start, self.labels)
+
+
+#: The registry that plotchecker records its metrics in.
+registry = MetricsRegistry()
+_default_registry = registry
+
+
+def write_prometheus(path, registry=None):
+    """Write the metrics to a file in the Prometheus text format (e.g. for
+    the textfile collector of the Prometheus node exporter).
+
+    Parameters
+    ----------
+    path : string
+        The path of the file.
+    registry : :class:`~plotchecker.metrics.MetricsRegistry` (default: ``None``)
+        The metrics to write (by default, the default registry).
+
+    """
+    if registry is None:
+        registry = _default_registry
+    with open(path, 'w') as fh:
+        fh.write(registry.to_prometheus())
+
+
+def write_json(path, registry=None):
+    """Write a JSON snapshot of the metrics (see
+    :meth:`~plotchecker.metrics.MetricsRegistry.to_json`) to a file.
+
+    Parameters
+    ----------
+    path : string
+        The path of the file.
+    registry : :class:`~plotchecker.metrics.MetricsRegistry` (default: ``None``)
+        The metrics to write (by default, the default registry).
+
+    """
+    if registry is None:
+        registry = _default_registry
+    with open(path, 'w') as fh:
+        json.dump(registry.to_json(), fh, indent=2, sort_keys=True)
@@ -0,0 +1,226 @@
+from __future__ import division
+
+import numpy as np
+import six
+
+from .raster import as_image
+
+
+def _resize(image, size):
+    """Resize a 2-D image to ``size``-by-``size`` pixels by averaging over
+    (approximately equal) blocks of pixels. Images that are smaller than the
+    output are upsampled by repeating pixels.
+
+    """
+    for dim in (0, 1):
+        n = image.shape[dim]
+        if n >= size:
+            starts = np.linspace(0, n, size + 1).astype(int)
+            counts = np.diff(starts)
+            sums = np.add.reduceat(image, starts[:-1], axis=dim)
+            shape = [1, 1]
+            shape[dim] = size
+            image = sums / counts.reshape(shape)
+        else:
+            index = (np.arange(size) * n) // size
+            image = np.take(image, index, axis=dim)
+    return image
+
+
+def _dct_matrix(n):
+    """The orthonormal DCT-II matrix of size ``n``."""
+    k = np.arange(n)[:, np.newaxis]
+    i = np.arange(n)[np.newaxis, :]
+    m = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    m[0] /= np.sqrt(2)
+    return m
+
+
+def perceptual_hash(image, hash_size=8, highfreq_factor=4):
+    """Compute the perceptual hash (pHash) of an image.
+
+    The image is converted to grayscale and resized to a small square, and
+    the low frequencies of its discrete cosine transform are thresholded at
+    their median. Images that look alike have hashes that differ in only a
+    few bits, even if they were rendered at slightly different sizes.
+
+    Parameters
+    ----------
+    image :
+        An RGB or RGBA image (see :func:`plotchecker.raster.as_image`).
+    hash_size : int (default: 8)
+        The hash has ``hash_size ** 2`` bits.
+    highfreq_factor : int (default: 4)
+        The image is resized to ``hash_size * highfreq_factor`` pixels square
+        before the transform.
+
+    Returns
+    -------
+    hash : int
+
+    """
+    gray = np.dot(as_image(image), [0.299, 0.587, 0.114])
+    n = hash_size * highfreq_factor
+    small = _resize(gray, n)
+
+    dct = _dct_matrix(n)
+    freqs = np.dot(np.dot(dct, small), dct.T)[:hash_size, :hash_size]
+    bits = (freqs > np.median(freqs)).ravel()
+
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def hamming_distance(a, b):
+    """The number of bits that differ between the hashes ``a`` and ``b``."""
+    return bin(a ^ b).count('1')
+
+
+class PlotHashIndex(object):
+    """An index of the perceptual hashes of plots, for finding plots that look
+    nearly identical (e.g. across many different submissions).
+
+    The hashes are stored in a BK-tree, so finding all the hashes within a
+    small Hamming distance of a query only visits a small part of the tree,
+    rather than every hash in the index.
+
+    Examples
+    --------
+
+    .. code:: python
+
+        index = PlotHashIndex()
+        for name, ax in submissions:
+            index.add(name, PlotChecker(ax).perceptual_hash)
+
+        for name1, name2, distance in index.near_duplicates(4):
+            print(name1, name2, distance)
+
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        # each node of the tree is a list of [hash, keys, children], where the
+        # children are a dictionary mapping distances to child nodes
+        self._root = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, key, value):
+        """Add a hash to the index.
+
+        Parameters
+        ----------
+        key :
+            An identifier for the plot (e.g. the name of the submission).
+        value : int or ``PlotChecker``
+            The perceptual hash of the plot (see
+            :attr:`~plotchecker.PlotChecker.perceptual_hash`), or a plot
+            checker to compute the hash from.
+
+        """
+        if not isinstance(value, six.integer_types):
+            value = value.perceptual_hash
+
+        self._size += 1
+        if self._root is None:
+            self._root = [value, [key], {}]
+            return
+
+        node = self._root
+        while True:
+            distance = hamming_distance(value, node[0])
+            if distance == 0:
+                node[1].append(key)
+                return
+            if distance not in node[2]:
+                node[2][distance] = [value, [key], {}]
+                return
+            node = node[2][distance]
+
+    def query(self, value, max_distance):
+        """Find all the plots in the index whose hashes are within a given
+        Hamming distance of the given hash.
+
+        Parameters
+        ----------
+        value : int or ``PlotChecker``
+            The perceptual hash to look up, or a plot checker to compute the
+            hash from.
+        max_distance : int
+            The largest number of bits that may differ.
+
+        Returns
+        -------
+        matches : list of ``(key, distance)`` tuples, sorted by distance
+
+        """
+        if not isinstance(value, six.integer_types):
+            value = value.perceptual_hash
+
+        matches = [
+            (key, distance)
+            for _, keys, distance in self._query_nodes(value, max_distance)
+            for key in keys]
+        return sorted(matches, key=lambda x: x[1])
+
+    def near_duplicates(self, max_distance):
+        """Find all pairs of plots in the index whose hashes are within a given
+        Hamming distance of each other.
+
+        Parameters
+        ----------
+        max_distance : int
+            The largest number of bits that may differ.
+
+        Returns
+        -------
+        pairs : list of ``(key1, key2, distance)`` tuples, sorted by distance
+
+        """
+        pairs = []
+        nodes = [self._root] if self._root is not None else []
+        while nodes:
+            node = nodes.pop()
+            nodes.extend(node[2].values())
+
+            # plots with exactly the same hash
+            keys = node[1]
+            for i in range(len(keys)):
+                for j in range(i + 1, len(keys)):
+                    pairs.append((keys[i], keys[j], 0))
+
+            # each pair of distinct hashes is found twice (once from each
+            # side), so only keep it from the side with the smaller hash; this
+            # also skips the node itself
+            for value, keys2, distance in self._query_nodes(node[0], max_distance):
+                if value > node[0]:
+                    for key1 in keys:
+                        for key2 in keys2:
+                            pairs.append((key1, key2, distance))
+
+        return sorted(pairs, key=lambda x: x[2])
+
+    def _query_nodes(self, value, max_distance):
+        """Find the nodes of the tree within ``max_distance`` of the given
+        hash, as a list of ``(hash, keys, distance)`` tuples.
+
+        """
+        matches = []
+        nodes = [self._root] if self._root is not None else []
+        while nodes:
+            node = nodes.pop()
+            distance = hamming_distance(value, node[0])
+            if distance <= max_distance:
+                matches.append((node[0], node[1], distance))
+
+            # by the triangle inequality, only the children whose distance to
+            # this node is close to the query's distance can contain matches
+            for d, child in node[2].items():
+                if abs(d - distance) <= max_distance:
+                    nodes.append(child)
+        return matches
@@ -0,0 +1,242 @@
+from __future__ import division
+
+import weakref
+
+import numpy as np
+import six
+from matplotlib.backends.backend_agg import RendererAgg
+import matplotlib.image
+
+#: The most recent render of each figure. The renders don't refer back to
+#: their figures, so they are freed along with the figures.
+_renders = weakref.WeakKeyDictionary()
+
+
+class _VersionCallback(object):
+    """A ``stale_callback`` for an artist, which counts how many times the
+    artist has been marked as stale (i.e., modified) before calling the
+    original callback of the artist.
+
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def __call__(self, artist, val):
+        artist._plotchecker_version += 1
+        if self.callback is not None:
+            self.callback(artist, val)
+
+
+def artist_version(artist):
+    """Get the version of the given artist (or figure), which is increased
+    whenever the artist is modified, or (for figures and axes) whenever any
+    of their artists are modified.
+
+    Unlike the ``stale`` flag of the artist, the version is not reset when
+    the figure is drawn, so it can be used to tell whether the artist has
+    changed since some earlier point, however the figure has been drawn in
+    the meantime. The modifications are counted by the ``stale_callback``
+    of the artist, which is installed the first time this is called.
+
+    Parameters
+    ----------
+    artist : ``matplotlib.artist.Artist`` object
+
+    Returns
+    -------
+    version : int
+
+    """
+    if not isinstance(artist.stale_callback, _VersionCallback):
+        # if the callback has been replaced since it was installed, then
+        # modifications may have been missed
+        artist._plotchecker_version = getattr(artist, '_plotchecker_version', 0) + 1
+        artist.stale_callback = _VersionCallback(artist.stale_callback)
+    return artist._plotchecker_version
+
+
+def render(figure):
+    """Render the given figure with Agg, reusing the previous render of the
+    figure if it has not been modified since then (i.e., if the
+    :func:`~plotchecker.raster.artist_version` of the figure and its size
+    are the same).
+
+    The figure is drawn with a separate renderer, so the canvas of the figure
+    (and any backend that it belongs to) is not affected, and neither are the
+    ``stale`` flags of the figure and its artists.
+
+    Parameters
+    ----------
+    figure : ``matplotlib.figure.Figure`` object
+
+    Returns
+    -------
+    render : dict
+        A dictionary with the ``'renderer'``, the RGBA ``'buffer'`` of the
+        renderer (a read-only array of shape ``(height, width, 4)`` that
+        shares memory with the renderer), and the ``'bboxes'`` of each of
+        the axes of the figure (as slices of the rows and columns of the
+        buffer, keyed by the id of the axes).
+
+    """
+    width, height = figure.get_size_inches() * figure.dpi
+    size = (int(round(width)), int(round(height)), figure.dpi)
+
+    cached = _renders.get(figure)
+    if cached is not None and cached['size'] == size and \
+            cached['version'] == artist_version(figure):
+        return cached
+
+    # drawing clears the stale flags of the figure and its artists, which
+    # backends use to decide whether to redraw the figure, so they are put
+    # back afterwards (without calling the callbacks of the artists)
+    artists = [figure] + figure.axes + [
+        x for axis in figure.axes for x in axis.get_children()]
+    stale = [x.stale for x in artists]
+
+    renderer = RendererAgg(size[0], size[1], size[2])
+    figure.draw(renderer)
+
+    # wrap the buffer of the renderer without copying it
+    buf = np.asarray(renderer.buffer_rgba())
+    buf.flags.writeable = False
+
+    # computing the bounding boxes of the axes updates the positions of their
+    # titles, which marks the titles (and so the figure) as modified even
+    # though nothing has actually changed, so this is done once here, before
+    # the version of the figure is recorded
+    bboxes = {}
+    for axis in figure.axes:
+        bboxes[id(axis)] = _bbox_slices(axis.get_tightbbox(renderer), buf.shape)
+
+    for artist, val in zip(artists, stale):
+        artist._stale = val
+
+    cached = {
+        'size': size,
+        'version': artist_version(figure),
+        'renderer': renderer,
+        'buffer': buf,
+        'bboxes': bboxes
+    }
+    _renders[figure] = cached
+    return cached
+
+
+def axis_raster(axis):
+    """Get the rendered pixels of the given axes, including their tick
+    labels, axis labels and title (i.e., the region covered by the tight
+    bounding box of the axes, clipped to the figure).
+
+    Parameters
+    ----------
+    axis : ``matplotlib.axes.Axes`` object
+
+    Returns
+    -------
+    raster : read-only array with shape ``(height, width, 4)`` and dtype
+        ``uint8``, which is a view onto the (cached) render of the figure.
+
+    """
+    cached = render(axis.figure)
+    if id(axis) not in cached['bboxes']:
+        cached['bboxes'][id(axis)] = _bbox_slices(
+            axis.get_tightbbox(cached['renderer']), cached['buffer'].shape)
+    rows, cols = cached['bboxes'][id(axis)]
+    return cached['buffer'][rows, cols]
+
+
+def _bbox_slices(bbox, shape):
+    """Convert a bounding box in display coordinates to the slices of the rows
+    and columns of a buffer with the given shape, clipped to the buffer.
+
+    """
+    height, width = shape[:2]
+
+    # the origin of the display coordinates is at the bottom left, while the
+    # first row of the buffer is at the top
+    x0 = int(np.clip(np.floor(bbox.x0), 0, width))
+    x1 = int(np.clip(np.ceil(bbox.x1), 0, width))
+    y0 = int(np.clip(np.floor(height - bbox.y1), 0, height))
+    y1 = int(np.clip(np.ceil(height - bbox.y0), 0, height))
+    return slice(y0, y1), slice(x0, x1)
+
+
+def as_image(image):
+    """Convert the given image to an RGB array of floats between 0 and 1.
+
+    Parameters
+    ----------
+    image :
+        Either an array with shape ``(height, width, 3)`` or ``(height,
+        width, 4)`` (of integers between 0 and 255, or floats between 0 and
+        1), or the filename of an image to load. The alpha channel, if any,
+        is ignored.
+
+    Returns
+    -------
+    image : array with shape ``(height, width, 3)``
+
+    """
+    if isinstance(image, six.string_types):
+        image = matplotlib.image.imread(image)
+
+    image = np.asarray(image)
+    if image.ndim != 3 or image.shape[2] not in (3, 4):
+        raise ValueError("Invalid image shape: {}".format(image.shape))
+
+    image = image[..., :3]
+    if np.issubdtype(image.dtype, np.integer):
+        return image / 255
+    return image.astype(float)
+
+
+def rms(actual, expected):
+    """Compute the root-mean-square difference of each color channel between
+    two RGB images with the same shape.
+
+    Returns
+    -------
+    rms : array with shape ``(3,)``
+
+    """
+    return np.sqrt(np.mean((actual - expected) ** 2, axis=(0, 1)))
+
+
+def ssim(actual, expected, window=8):
+    """Compute a simplified structural similarity (SSIM) index between two
+    RGB images with the same shape. The images are converted to grayscale,
+    and the SSIM is computed over non-overlapping ``window``-by-``window``
+    blocks (rather than a sliding Gaussian window), and then averaged over
+    the blocks.
+
+    Returns
+    -------
+    ssim : float
+        The mean SSIM, which is 1 for identical images.
+
+    """
+    luma = np.array([0.299, 0.587, 0.114])
+    x = np.dot(actual, luma)
+    y = np.dot(expected, luma)
+
+    # use the whole image as a single window if it is too small
+    wr = min(window, x.shape[0])
+    wc = min(window, x.shape[1])
+    nr = x.shape[0] // wr
+    nc = x.shape[1] // wc
+    x = x[:nr * wr, :nc * wc].reshape(nr, wr, nc, wc)
+    y = y[:nr * wr, :nc * wc].reshape(nr, wr, nc, wc)
+
+    mx = x.mean(axis=(1, 3))
+    my = y.mean(axis=(1, 3))
+    vx = x.var(axis=(1, 3))
+    vy = y.var(axis=(1, 3))
+    cov = (x * y).mean(axis=(1, 3)) - (mx * my)
+
+    c1 = 0.01 ** 2
+    c2 = 0.03 ** 2
+    index = ((2 * mx * my + c1) * (2 * cov + c2)) / \
+        ((mx ** 2 + my ** 2 + c1) * (vx + vy + c2))
+    return float(index.mean())
@@ -0,0 +1,114 @@
+from collections import namedtuple
+from timeit import default_timer
+
+import six
+
+from . import metrics
+from .base import InvalidPlotError, MemoryBudgetError
+
+#: The result of a single item of a rubric: the ``name`` of the item, whether
+#: it ``passed``, and the ``message`` of the assertion error if it didn't.
+RubricResult = namedtuple('RubricResult', ['name', 'passed', 'message'])
+
+
+def parse_rubric_item(item):
+    """Convert an item of a rubric into a ``(name, check)`` pair, where
+    ``check`` is a function that takes a plot checker and raises an
+    ``AssertionError`` if the item fails.
+
+    Parameters
+    ----------
+    item :
+        Either a function that takes a plot checker, or a tuple of ``(name,
+        args)`` or ``(name, args, kwargs)``, where ``name`` is the name of a
+        method of the plot checker (e.g. ``'assert_x_data_equal'``) that will
+        be called with the given arguments.
+
+    """
+    if callable(item):
+        return getattr(item, '__name__', repr(item)), item
+
+    if isinstance(item, tuple) and len(item) in (2, 3) and isinstance(item[0], six.string_types):
+        name = item[0]
+        args = tuple(item[1])
+        kwargs = dict(item[2]) if len(item) == 3 else {}
+
+        def check(checker):
+            getattr(checker, name)(*args, **kwargs)
+        return name, check
+
+    raise ValueError("Invalid rubric item: {!r}".format(item))
+
+
+def run_rubric_item(checker, item):
+    """Run a single item of a rubric (see
+    :func:`~plotchecker.rubric.parse_rubric_item`) on the given plot checker.
+
+    The item fails if it raises an ``AssertionError`` or an
+    :class:`~plotchecker.InvalidPlotError`. It also fails if checking it
+    would exceed the memory budget of the checker (i.e. if it raises a
+    :class:`~plotchecker.MemoryBudgetError`), but as that isn't necessarily a
+    fault of the plot, it is counted with a result of ``'over_budget'``
+    rather than ``'failed'`` in the metrics. Any other error is raised, and
+    is counted with a result of ``'error'``.
+
+    Returns
+    -------
+    result : :class:`~plotchecker.RubricResult`
+
+    """
+    name, check = parse_rubric_item(item)
+    start = default_timer()
+    outcome = 'error'
+    try:
+        check(checker)
+    except (AssertionError, InvalidPlotError) as e:
+        result = RubricResult(name, False, str(e))
+        outcome = 'failed'
+    except MemoryBudgetError as e:
+        result = RubricResult(name, False, str(e))
+        outcome = 'over_budget'
+    else:
+        result = RubricResult(name, True, None)
+        outcome = 'passed'
+    finally:
+        metrics.registry.observe(
+            'plotchecker_rubric_item_seconds', default_timer() - start, {'item': name})
+        metrics.registry.inc(
+            'plotchecker_rubric_items_total', {'item': name, 'result': outcome})
+    return result
+
+
+def run_rubric(checker, rubric):
+    """Check a plot against each item of a rubric, without stopping at the
+    first item that fails.
+
+    Parameters
+    ----------
+    checker : :class:`~plotchecker.PlotChecker`
+        The plot checker to run the rubric on.
+    rubric : list
+        The items of the rubric. Each item is either a function that takes the
+        plot checker and raises an ``AssertionError`` if the item fails, or a
+        tuple of ``(name, args)`` or ``(name, args, kwargs)``, where ``name``
+        is the name of a method of the plot checker.
+
+    Returns
+    -------
+    results : list of :class:`~plotchecker.RubricResult`
+
+    Examples
+    --------
+
+    .. code:: python
+
+        pc = LinePlotChecker(ax)
+        results = run_rubric(pc, [
+            ('assert_num_lines', [1]),
+            ('assert_x_data_allclose', [[x]], {'rtol': 1e-5}),
+            lambda pc: pc.assert_title_equal('Results'),
+        ])
+        score = sum(r.passed for r in results)
+
+    """
+    return [run_rubric_item(checker, item) for item in rubric]
@@ -1,4 +1,5 @@
 import numpy as np
+import six
 
 from .base import PlotChecker, InvalidPlotError
 
@@ -9,27 +10,181 @@ class ScatterPlotChecker(PlotChecker):
     ----------
     axis : ``matplotlib.axes.Axes`` object
         A set of matplotlib axes (e.g. obtained through ``plt.gca()``)
+    artists : list of matplotlib artists, optional
+        Only check these artists of the axes, rather than all of them (e.g.
+        to check one kind of data in a plot that combines several kinds).
+        The texts of the axes are always checked.
 
     """
 
-    def __init__(self, axis):
+    #: The layout of the table of marker styles that is extracted from the
+    #: plotted lines (one row per line, which applies to all of its points,
+    #: with the number of points of each line in ``_line_counts``).
+    #: Plots with one line per point can have a very large number of lines, so
+    #: this is much more compact than keeping the styles of each line as
+    #: separate Python objects.
+    _line_dtype = np.dtype([
+        ('facecolor', float, (3,)),
+        ('edgecolor', float, (3,)),
+        ('alpha', float),
+        ('edgewidth', float),
+        ('size', float)
+    ])
+
+    _snapshot_attrs = PlotChecker._snapshot_attrs + (
+        'x_data', 'y_data', 'colors', 'alphas', 'edgecolors', 'edgewidths',
+        'sizes', 'markersizes', 'markers', 'legend_labels', '_num_points')
+
+    #: The number of bytes of each point of the x- or y-data.
+    _point_bytes = np.dtype(float).itemsize
+
+    def __init__(self, axis, artists=None):
         """Initialize the scatter plot checker."""
 
-        super(ScatterPlotChecker, self).__init__(axis)
-        self.lines = self.axis.get_lines()
-        self.collections = self.axis.collections
+        super(ScatterPlotChecker, self).__init__(axis, artists=artists)
+        self.lines = self._get_artists('lines')
+        self.collections = self._get_artists('collections')
+        self._line_table = None
+        self._line_points = None
 
         # check that there are only lines or collections, not both
         if len(self.lines) == 0 and len(self.collections) == 0:
             raise InvalidPlotError("No data found")
 
         # check that if there are lines, linestyle is '' and markers are not ''
-        for x in self.lines:
-            if len(x.get_xydata()) > 1 and x.get_linestyle() != 'None':
+        self._line_counts = np.array([len(x.get_xydata()) for x in self.lines], dtype=int)
+        for x, count in zip(self.lines, self._line_counts):
+            if count > 1 and x.get_linestyle() != 'None':
                 raise InvalidPlotError("This is supposed to be a scatter plot, but it has lines!")
             if self._parse_marker(x.get_marker()) == '':
                 raise InvalidPlotError("This is supposed to be a scatter plot, but there are no markers!")
 
+    @classmethod
+    def _extract_lines(cls, lines):
+        """Extract the marker styles of the given lines into a record array
+        (with dtype ``_line_dtype``).
+
+        """
+        table = np.empty(len(lines), dtype=cls._line_dtype)
+        if len(lines) == 0:
+            return table
+
+        # this is the only place where we iterate over the styles of the
+        # lines; everything else is computed from the resulting table
+        table['facecolor'] = [cls._color2rgb(x.get_markerfacecolor()) for x in lines]
+        table['edgecolor'] = [cls._color2rgb(x.get_markeredgecolor()) for x in lines]
+        table['alpha'] = [
+            cls._color2alpha(x.get_markerfacecolor()) if x.get_alpha() is None else x.get_alpha()
+            for x in lines]
+        table['edgewidth'] = [x.get_markeredgewidth() for x in lines]
+        table['size'] = [x.get_markersize() ** 2 for x in lines]
+        return table
+
+    def _line_attr(self, field):
+        """The given field of the marker styles of the lines, repeated for
+        each of their points (or, for the ``'points'`` field, the points of
+        all the lines in a single array).
+
+        """
+        if field == 'points':
+            if self._line_points is None:
+                points = [x.get_xydata() for x in self.lines]
+                if len(points) == 1:
+                    self._line_points = points[0]
+                else:
+                    self._check_memory(
+                        2 * self._point_bytes * self._line_counts.sum(),
+                        "The points of the lines")
+                    self._line_points = np.concatenate(points, axis=0)
+            return self._line_points
+
+        if self._line_table is None:
+            self._line_table = self._extract_lines(self.lines)
+        return np.repeat(self._line_table[field], self._line_counts, axis=0)
+
+    @property
+    def _num_points(self):
+        """The total number of plotted points."""
+        return int(self._line_counts.sum()) + sum(len(x.get_offsets()) for x in self.collections)
+
+    def _check_points_memory(self, point_bytes, what):
+        """Check that an array with ``point_bytes`` bytes for each point fits
+        within the ``memory_budget``.
+
+        """
+        self._check_memory(point_bytes * self._num_points, what)
+
+    def _point_segments(self, column):
+        """The given column of the points (0 for the x-data and 1 for the
+        y-data) of each line and collection, without copying them.
+
+        """
+        if getattr(self, '_snapshot_of', None) is not None:
+            # snapshots already hold all of the data
+            return [self.x_data if column == 0 else self.y_data]
+
+        if len(self.lines) == 0:
+            segments = []
+        elif self._line_points is not None:
+            segments = [self._line_points[:, column]]
+        else:
+            segments = [x.get_xydata()[:, column] for x in self.lines]
+        segments.extend(x.get_offsets()[:, column] for x in self.collections)
+        return segments
+
+    def _point_column(self, column, what):
+        """The given column of the points, as a single array."""
+        self._check_points_memory(self._point_bytes, what)
+        all_data = []
+        if len(self.lines) > 0:
+            all_data.append(self._line_attr('points')[:, column])
+        if len(self.collections) > 0:
+            all_data.append(np.concatenate([x.get_offsets()[:, column] for x in self.collections]))
+        return np.concatenate(all_data, axis=0)
+
+    def _assert_points(self, column, expected, func=None, **kwargs):
+        """Compare the given column of the points with the expected values.
+
+        If comparing the whole arrays at once wouldn't fit within the
+        ``memory_budget``, then the points of each line and collection are
+        compared in chunks instead, without concatenating them.
+
+        """
+        if func is None:
+            func = np.testing.assert_equal
+
+        num_points = self._num_points
+        if self._fits_memory(self._compare_arrays * self._point_bytes * num_points):
+            func(self.x_data if column == 0 else self.y_data, expected, **kwargs)
+            return
+
+        expected = np.asanyarray(expected)
+        if expected.shape != (num_points,):
+            raise AssertionError(
+                "Arrays have different shapes: {} (expected {})".format(
+                    (num_points,), expected.shape))
+
+        # each chunk also needs to fit within the budget
+        rows = self.memory_budget // (self._compare_arrays * self._point_bytes)
+        rows = max(1, min(rows, self._chunk_size))
+
+        offset = 0
+        for segment in self._point_segments(column):
+            self._assert_chunked(
+                segment, expected[offset:offset + len(segment)],
+                func=func, offset=offset, rows=rows, **kwargs)
+            offset += len(segment)
+
+    def _assert_scaled_points(self, attr, axis_name, expected, **kwargs):
+        """Check that the x- or y-data is almost equal to the expected values
+        after applying the scale of the axis (see ``scaled_comparison``).
+
+        """
+        self._check_points_memory(
+            self._compare_arrays * self._point_bytes, "Comparing the scaled data")
+        actual, expected = self._scaled_data(attr, axis_name, expected)
+        self._allclose(actual, expected, **kwargs)
+
     def _parse_expected_attr(self, attr_name, attr_val):
         """Ensure that the given expected attribute values are in the right shape."""
         if attr_name in ('colors', 'edgecolors'):
@@ -41,14 +196,16 @@ class ScatterPlotChecker(PlotChecker):
             except (ValueError, TypeError):
                 attr_val = np.array([self._color2rgb(x) for x in attr_val])
 
-        elif not hasattr(attr_val, '__iter__'):
+        elif isinstance(attr_val, six.string_types) or not hasattr(attr_val, '__iter__'):
             # if it's not a color, then just make sure we have an array
             attr_val = np.array([attr_val])
 
         # tile the given values if we've only been given one, so it's the same
         # shape as the data
         if len(attr_val) == 1:
-            attr_val = self._tile_or_trim(self.x_data, attr_val)
+            # (an empty array with a row for each point, which doesn't need
+            # to hold any data)
+            attr_val = self._tile_or_trim(np.empty((self._num_points, 0)), attr_val)
 
         return attr_val
 
@@ -60,20 +217,15 @@ class ScatterPlotChecker(PlotChecker):
         num_points : int
 
         """
-        if num_points != len(self.x_data):
+        if num_points != self._num_points:
             raise AssertionError(
                 "Plot has incorrect number of points: {} (expected {})".format(
-                    len(self.x_data), num_points))
+                    self._num_points, num_points))
 
     @property
     def x_data(self):
         """The x-values of the plotted data (1-D array)."""
-        all_x_data = []
-        if len(self.lines) > 0:
-            all_x_data.append(np.concatenate([x.get_xydata()[:, 0] for x in self.lines]))
-        if len(self.collections) > 0:
-            all_x_data.append(np.concatenate([x.get_offsets()[:, 0] for x in self.collections]))
-        return np.concatenate(all_x_data, axis=0)
+        return self._point_column(0, "The x-data")
 
     def assert_x_data_equal(self, x_data):
         """Assert that the given x-data is equivalent to the plotted
@@ -83,10 +235,11 @@ class ScatterPlotChecker(PlotChecker):
         ----------
         x_data : 1-D array-like
             The expected x-data. The number of elements should be equal to the
-            (expected) number of plotted points.
+            (expected) number of plotted points. The data may also be given as
+            dates (e.g. an array of ``numpy.datetime64``).
 
         """
-        np.testing.assert_equal(self.x_data, x_data)
+        self._assert_points(0, self._convert_dates(x_data))
 
     def assert_x_data_allclose(self, x_data, **kwargs):
         """Assert that the given x-data is almost equal to the plotted
@@ -96,23 +249,23 @@ class ScatterPlotChecker(PlotChecker):
         ----------
         x_data : 1-D array-like
             The expected x-data. The number of elements should be equal to the
-            (expected) number of plotted points.
+            (expected) number of plotted points. The data may also be given as
+            dates (e.g. an array of ``numpy.datetime64``).
         kwargs :
             Additional keyword arguments to pass to
             ``numpy.testing.assert_allclose``
 
         """
-        np.testing.assert_allclose(self.x_data, x_data, **kwargs)
+        x_data = self._convert_dates(x_data)
+        if self.scaled_comparison:
+            self._assert_scaled_points("x_data", "x", x_data, **kwargs)
+        else:
+            self._assert_points(0, x_data, func=self._allclose, **kwargs)
 
     @property
     def y_data(self):
         """The y-values of the plotted data (1-D array)."""
-        all_y_data = []
-        if len(self.lines) > 0:
-            all_y_data.append(np.concatenate([x.get_xydata()[:, 1] for x in self.lines]))
-        if len(self.collections) > 0:
-            all_y_data.append(np.concatenate([x.get_offsets()[:, 1] for x in self.collections]))
-        return np.concatenate(all_y_data, axis=0)
+        return self._point_column(1, "The y-data")
 
     def assert_y_data_equal(self, y_data):
         """Assert that the given y-data is equivalent to the plotted
@@ -122,10 +275,11 @@ class ScatterPlotChecker(PlotChecker):
         ----------
         y_data : 1-D array-like
             The expected y-data. The number of elements should be equal to the
-            (expected) number of plotted points.
+            (expected) number of plotted points. The data may also be given as
+            dates (e.g. an array of ``numpy.datetime64``).
 
         """
-        np.testing.assert_equal(self.y_data, y_data)
+        self._assert_points(1, self._convert_dates(y_data))
 
     def assert_y_data_allclose(self, y_data, **kwargs):
         """Assert that the given y-data is almost equal to the plotted
@@ -135,24 +289,27 @@ class ScatterPlotChecker(PlotChecker):
         ----------
         y_data : 1-D array-like
             The expected y-data. The number of elements should be equal to the
-            (expected) number of plotted points.
+            (expected) number of plotted points. The data may also be given as
+            dates (e.g. an array of ``numpy.datetime64``).
         kwargs :
             Additional keyword arguments to pass to
             ``numpy.testing.assert_allclose``
 
         """
-        np.testing.assert_allclose(self.y_data, y_data, **kwargs)
+        y_data = self._convert_dates(y_data)
+        if self.scaled_comparison:
+            self._assert_scaled_points("y_data", "y", y_data, **kwargs)
+        else:
+            self._assert_points(1, y_data, func=self._allclose, **kwargs)
 
     @property
     def colors(self):
         """The colors of the plotted points. Columns correspond to RGB values."""
+        self._check_points_memory(3 * self._point_bytes, "The colors")
         all_colors = []
 
         if len(self.lines) > 0:
-            for x in self.lines:
-                points = x.get_xydata()
-                colors = np.array([self._color2rgb(x.get_markerfacecolor())])
-                all_colors.append(self._tile_or_trim(points, colors))
+            all_colors.append(self._line_attr('facecolor'))
 
         if len(self.collections) > 0:
             for x in self.collections:
@@ -201,16 +358,11 @@ class ScatterPlotChecker(PlotChecker):
     @property
     def alphas(self):
         """The alpha values of the plotted points."""
+        self._check_points_memory(self._point_bytes, "The alphas")
         all_alphas = []
 
         if len(self.lines) > 0:
-            for x in self.lines:
-                points = x.get_xydata()
-                if x.get_alpha() is None:
-                    alpha = np.array([self._color2alpha(x.get_markerfacecolor())])
-                else:
-                    alpha = np.array([x.get_alpha()])
-                all_alphas.append(self._tile_or_trim(points, alpha))
+            all_alphas.append(self._line_attr('alpha'))
 
         if len(self.collections) > 0:
             for x in self.collections:
@@ -261,13 +413,11 @@ class ScatterPlotChecker(PlotChecker):
     @property
     def edgecolors(self):
         """The edge colors of the plotted points. Columns correspond to RGB values."""
+        self._check_points_memory(3 * self._point_bytes, "The edge colors")
         all_colors = []
 
         if len(self.lines) > 0:
-            for x in self.lines:
-                points = x.get_xydata()
-                colors = np.array([self._color2rgb(x.get_markeredgecolor())])
-                all_colors.append(self._tile_or_trim(points, colors))
+            all_colors.append(self._line_attr('edgecolor'))
 
         if len(self.collections) > 0:
             for x in self.collections:
@@ -316,13 +466,11 @@ class ScatterPlotChecker(PlotChecker):
     @property
     def edgewidths(self):
         """The edge widths of the plotted points."""
+        self._check_points_memory(self._point_bytes, "The edge widths")
         all_colors = []
 
         if len(self.lines) > 0:
-            for x in self.lines:
-                points = x.get_xydata()
-                colors = np.array([x.get_markeredgewidth()])
-                all_colors.append(self._tile_or_trim(points, colors))
+            all_colors.append(self._line_attr('edgewidth'))
 
         if len(self.collections) > 0:
             for x in self.collections:
@@ -374,13 +522,11 @@ class ScatterPlotChecker(PlotChecker):
         :attr:`~plotchecker.ScatterPlotChecker.markersizes`.
 
         """
+        self._check_points_memory(self._point_bytes, "The sizes")
         all_sizes = []
 
         if len(self.lines) > 0:
-            for x in self.lines:
-                points = x.get_xydata()
-                sizes = np.array([x.get_markersize() ** 2])
-                all_sizes.append(self._tile_or_trim(points, sizes))
+            all_sizes.append(self._line_attr('size'))
 
         if len(self.collections) > 0:
             for x in self.collections:
@@ -496,3 +642,37 @@ class ScatterPlotChecker(PlotChecker):
         """
         np.testing.assert_equal(
             self.markers, self._parse_expected_attr("markers", markers))
+
+    @property
+    def legend_labels(self):
+        """The legend label of each plotted point (i.e. the label of the
+        legend entry of the line or collection that the point belongs to), or
+        ``None`` for points that are not in the legend.
+
+        """
+        self._check_points_memory(np.dtype(object).itemsize, "The legend labels")
+        index = self._legend_index
+        line_labels = np.empty(len(self.lines), dtype=object)
+        line_labels[:] = [index.get(id(x)) for x in self.lines]
+        all_labels = [np.repeat(line_labels, self._line_counts)]
+        for x in self.collections:
+            labels = np.empty(len(x.get_offsets()), dtype=object)
+            labels[:] = index.get(id(x))
+            all_labels.append(labels)
+        return np.concatenate(all_labels)
+
+    def assert_legend_labels_equal(self, legend_labels):
+        """Assert that the given legend labels are equivalent to the plotted
+        :attr:`~plotchecker.ScatterPlotChecker.legend_labels`.
+
+        Parameters
+        ----------
+        legend_labels :
+            The expected legend labels. This should either be a single label
+            (which will apply to all the points) or an array with size equal
+            to the number of (expected) points.
+
+        """
+        np.testing.assert_equal(
+            self.legend_labels,
+            self._parse_expected_attr("legend_labels", legend_labels))
@@ -0,0 +1,534 @@
+"""
+A local grading server, which keeps a pool of worker processes with
+matplotlib and plotchecker already imported, so that checking a submission
+doesn't pay the cost of starting Python and importing matplotlib each time.
+
+Start the server with::
+
+    plotchecker serve --port 8765 --workers 4
+
+or, to listen on a Unix socket rather than on localhost::
+
+    plotchecker serve --socket /tmp/plotchecker.sock
+
+or, to also write the metrics of the server (see :mod:`plotchecker.metrics`)
+to a file when it shuts down::
+
+    plotchecker serve --metrics-file plotchecker.prom
+
+The server prints a secret token when it starts (or uses the token in the
+``PLOTCHECKER_TOKEN`` environment variable, if it is set, or writes it to the
+file given by ``--token-file`` rather than printing it). Then ``POST`` a
+request created by :func:`~plotchecker.server.encode_request` (or, to send
+just the data that has been extracted from the plot, by
+:func:`~plotchecker.server.encode_snapshot_request`) to ``/grade``, with the
+headers given by :func:`~plotchecker.server.request_headers`. The response is a
+JSON object with a list of ``results`` (with the ``name``, ``passed`` and
+``message`` of each item of the rubric), or an ``error`` message. The
+metrics that the workers have recorded are collected by the server, and can be
+fetched in the Prometheus text format with a ``GET`` request to ``/metrics``.
+
+The requests are pickled, and unpickling data can run arbitrary code, so the
+server should only ever be reachable by trusted clients. It only listens on
+a loopback address or on a Unix socket, and only accepts requests with the
+``application/x-plotchecker-pickle`` content type (which web pages can't send
+to other sites without the permission of the server) and with the token of
+the server. The requests are only unpickled by the worker processes, once
+they have been accepted.
+"""
+
+import argparse
+import hmac
+import ipaddress
+import json
+import multiprocessing
+import os
+import pickle
+import secrets
+import socket
+import socketserver
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from timeit import default_timer
+
+from . import metrics
+
+#: The content type of grading requests.
+CONTENT_TYPE = 'application/x-plotchecker-pickle'
+
+#: The header that holds the token of the server in grading requests.
+TOKEN_HEADER = 'X-Plotchecker-Token'
+
+
+def encode_request(figure, checker, rubric, axis=0):
+    """Create a request to grade a plot.
+
+    Parameters
+    ----------
+    figure : ``matplotlib.figure.Figure`` object
+        The figure containing the plot.
+    checker : string
+        The name of the plot checker to use (e.g. ``'LinePlotChecker'``).
+    rubric : list
+        The items of the rubric (see :func:`plotchecker.run_rubric`). These
+        must be picklable, so functions must be defined at the top level of a
+        module that the server can import.
+    axis : int (default: 0)
+        The index of the axes of the figure to check.
+
+    Returns
+    -------
+    request : bytes
+
+    """
+    return pickle.dumps({
+        'figure': figure,
+        'axis': axis,
+        'checker': checker,
+        'rubric': rubric
+    }, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def encode_snapshot_request(checker, rubric):
+    """Create a request to grade a plot that has already been extracted by a
+    plot checker. Only a snapshot of the checker is sent (see
+    :meth:`plotchecker.PlotChecker.snapshot`), which is much smaller than the
+    figure.
+
+    Parameters
+    ----------
+    checker : :class:`~plotchecker.PlotChecker`
+        The plot checker (or a snapshot of it).
+    rubric : list
+        The items of the rubric (see
+        :func:`~plotchecker.server.encode_request`).
+
+    Returns
+    -------
+    request : bytes
+
+    """
+    return pickle.dumps({
+        'snapshot': checker,
+        'rubric': rubric
+    }, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def request_headers(token):
+    """Get the headers of a grading request (see
+    :func:`~plotchecker.server.encode_request`) to a server with the given
+    token.
+
+    Parameters
+    ----------
+    token : string
+        The token of the server.
+
+    Returns
+    -------
+    headers : dict
+
+    """
+    return {'Content-Type': CONTENT_TYPE, TOKEN_HEADER: token}
+
+
+def _is_loopback(host):
+    """Whether every address that ``host`` resolves to is a loopback
+    address.
+
+    """
+    try:
+        infos = socket.getaddrinfo(host, None)
+    except (socket.gaierror, UnicodeError):
+        return False
+    addresses = [info[4][0].split('%')[0] for info in infos]
+    return len(addresses) > 0 and all(
+        ipaddress.ip_address(x).is_loopback for x in addresses)
+
+
+def _init_worker():
+    """Import (and warm up) everything that is needed to check plots, once
+    per worker process.
+
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import plotchecker
+
+    # the first figure and text that are drawn load the fonts
+    fig, ax = plt.subplots()
+    ax.plot([0, 1], [0, 1])
+    ax.set_title('warmup')
+    plotchecker.PlotChecker(ax).raster
+    plt.close(fig)
+    metrics.registry.reset()
+
+
+def _grade(request):
+    """Grade a request created by :func:`~plotchecker.server.encode_request`,
+    in a worker process.
+
+    Returns
+    -------
+    response : dict
+        The response to the request, along with the ``metrics`` that the
+        worker has recorded since the last request.
+
+    """
+    try:
+        response = _grade_request(request)
+    except Exception as e:
+        response = {'error': "{}: {}".format(type(e).__name__, e)}
+    response['metrics'] = metrics.registry.drain()
+    return response
+
+
+def _run_worker(conn):
+    """The main loop of a worker process, which grades the requests that it
+    receives through the connection ``conn`` one at a time, until the
+    connection is closed.
+
+    """
+    _init_worker()
+    while True:
+        try:
+            request = conn.recv_bytes()
+        except EOFError:
+            break
+        conn.send(_grade(request))
+
+
+class _Worker(object):
+    """A worker process (see :func:`~plotchecker.server._run_worker`),
+    along with the connection to it.
+
+    """
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_run_worker, args=(child_conn,))
+        self.process.daemon = True
+        self.process.start()
+        child_conn.close()
+
+    def grade(self, request, timeout=None):
+        """Grade a request in the worker, raising a
+        ``multiprocessing.TimeoutError`` if it takes longer than ``timeout``
+        seconds, or an ``EOFError`` if the worker has died.
+
+        """
+        self.conn.send_bytes(request)
+        if not self.conn.poll(timeout):
+            raise multiprocessing.TimeoutError
+        return self.conn.recv()
+
+    def kill(self):
+        """Stop the worker, even if it is in the middle of a request."""
+        self.process.terminate()
+        self.process.join()
+        self.conn.close()
+
+
+def _grade_request(request):
+    import plotchecker
+
+    request = pickle.loads(request)
+    if 'snapshot' in request:
+        checker = request['snapshot']
+        if not isinstance(checker, plotchecker.PlotChecker):
+            return {'error': "Invalid plot checker: {!r}".format(checker)}
+        make_checker = lambda: checker
+
+    else:
+        try:
+            cls = getattr(plotchecker, request['checker'])
+            if not (isinstance(cls, type) and issubclass(cls, plotchecker.PlotChecker)):
+                raise AttributeError
+        except AttributeError:
+            return {'error': "Invalid plot checker: {}".format(request['checker'])}
+        make_checker = lambda: cls(request['figure'].axes[request['axis']])
+
+    try:
+        checker = make_checker()
+        results = plotchecker.run_rubric(checker, request['rubric'])
+    except plotchecker.InvalidPlotError as e:
+        return {'error': "Invalid plot: {}".format(e)}
+    except Exception as e:
+        return {'error': "{}: {}".format(type(e).__name__, e)}
+
+    return {'results': [r._asdict() for r in results]}
+
+
+class _GradingHandler(BaseHTTPRequestHandler):
+    """Handle requests to grade plots, by passing them on to the worker
+    pool of the server.
+
+    """
+
+    def do_GET(self):
+        if self.path != '/metrics':
+            self._respond(404, {'error': "Not found: {}".format(self.path)})
+            return
+
+        body = metrics.registry.to_prometheus().encode('utf-8')
+        self._respond(200, body, content_type='text/plain; version=0.0.4')
+
+    def do_POST(self):
+        if self.path != '/grade':
+            self._respond(404, {'error': "Not found: {}".format(self.path)})
+            return
+
+        # the request is rejected without reading it, unless it comes from a
+        # client that knows the token
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip()
+        if content_type != CONTENT_TYPE:
+            self._reject(415, "Unsupported content type: {}".format(content_type))
+            return
+        token = self.headers.get(TOKEN_HEADER, '').encode('utf-8')
+        if not hmac.compare_digest(token, self.server.token.encode('utf-8')):
+            self._reject(403, "Invalid token")
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        request = self.rfile.read(length)
+        start = default_timer()
+        worker = self.server.acquire_worker()
+        try:
+            response = worker.grade(request, self.server.timeout_seconds)
+        except multiprocessing.TimeoutError:
+            # the worker is still busy with the request, so it is replaced
+            self.server.replace_worker(worker)
+            status, response = 504, {'error': "Grading timed out"}
+        except (EOFError, OSError):
+            self.server.replace_worker(worker)
+            status, response = 500, {'error': "The worker process died"}
+        else:
+            self.server.release_worker(worker)
+            metrics.registry.merge(response.pop('metrics'))
+            status = 400 if 'error' in response else 200
+
+        metrics.registry.observe(
+            'plotchecker_request_seconds', default_timer() - start)
+        metrics.registry.inc('plotchecker_requests_total', {'status': status})
+        self._respond(status, response)
+
+    def _reject(self, status, message):
+        """Respond to a request that won't be graded, without reading it."""
+        self.close_connection = True
+        metrics.registry.inc('plotchecker_requests_total', {'status': status})
+        self._respond(status, {'error': message})
+
+    def _respond(self, status, response, content_type='application/json'):
+        if isinstance(response, bytes):
+            body = response
+        else:
+            body = json.dumps(response).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # clients of Unix sockets don't have an address
+        if not self.client_address:
+            return self.server.server_address
+        return BaseHTTPRequestHandler.address_string(self)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+class _GradingServerMixin(socketserver.ThreadingMixIn):
+    daemon_threads = True
+
+    def start_pool(self, workers, timeout, quiet, token):
+        # the workers are forked from a separate server process, which has
+        # already imported plotchecker, rather than from this (multithreaded)
+        # process; this is done before the server opens its socket, so the
+        # workers don't inherit it
+        methods = multiprocessing.get_all_start_methods()
+        if 'forkserver' in methods:
+            self.context = multiprocessing.get_context('forkserver')
+            self.context.set_forkserver_preload(['plotchecker'])
+        else:
+            self.context = multiprocessing.get_context()
+
+        self.timeout_seconds = timeout
+        self.quiet = quiet
+        self.token = token if token is not None else secrets.token_urlsafe(32)
+        self._workers = []
+        self._idle = []
+        self._workers_changed = threading.Condition()
+        for _ in range(workers or os.cpu_count() or 1):
+            worker = _Worker(self.context)
+            self._workers.append(worker)
+            self._idle.append(worker)
+
+    def acquire_worker(self):
+        """Wait for an idle worker, and take it out of the pool."""
+        with self._workers_changed:
+            while len(self._idle) == 0:
+                self._workers_changed.wait()
+            return self._idle.pop()
+
+    def release_worker(self, worker):
+        """Put a worker back in the pool once it's done with a request."""
+        with self._workers_changed:
+            self._idle.append(worker)
+            self._workers_changed.notify()
+
+    def replace_worker(self, worker):
+        """Kill a worker that is stuck in a request (or that has died), and
+        put a new one in the pool in its place.
+
+        """
+        worker.kill()
+        new_worker = _Worker(self.context)
+        with self._workers_changed:
+            self._workers[self._workers.index(worker)] = new_worker
+            self._idle.append(new_worker)
+            self._workers_changed.notify()
+
+    def close_pool(self):
+        with self._workers_changed:
+            workers = list(self._workers)
+        for worker in workers:
+            worker.kill()
+
+    def server_close(self):
+        super(_GradingServerMixin, self).server_close()
+        self.close_pool()
+
+
+class GradingServer(_GradingServerMixin, HTTPServer):
+    """A grading server that listens on a TCP port (see
+    :mod:`plotchecker.server`).
+
+    Parameters
+    ----------
+    address : tuple (default: ``('127.0.0.1', 8765)``)
+        The host and port to listen on. The host must be a loopback address
+        (or a name that only resolves to loopback addresses).
+    workers : int (default: ``None``)
+        The number of worker processes (by default, the number of CPUs).
+    timeout : float (default: ``None``)
+        The maximum number of seconds to spend grading each request. Workers
+        that take longer are killed and replaced by new workers.
+    quiet : boolean (default: ``False``)
+        Whether to disable logging each request.
+    token : string (default: ``None``)
+        The token that clients must send with each request (see
+        :func:`~plotchecker.server.request_headers`). By default, a random
+        token is created, which is available as the ``token`` attribute of
+        the server.
+
+    """
+
+    def __init__(self, address=('127.0.0.1', 8765), workers=None, timeout=None,
+                 quiet=False, token=None):
+        """Initialize the server and start the worker processes."""
+        if not _is_loopback(address[0]):
+            raise ValueError(
+                "The server can only listen on a loopback address, not {!r}".format(address[0]))
+        self.start_pool(workers, timeout, quiet, token)
+        try:
+            HTTPServer.__init__(self, address, _GradingHandler)
+        except Exception:
+            self.close_pool()
+            raise
+
+
+class UnixGradingServer(_GradingServerMixin, socketserver.UnixStreamServer):
+    """A grading server that listens on a Unix socket (see
+    :mod:`plotchecker.server`). The parameters are the same as for
+    :class:`~plotchecker.server.GradingServer`, except that ``address`` is
+    the path of the socket.
+
+    """
+
+    def __init__(self, address, workers=None, timeout=None, quiet=False, token=None):
+        """Initialize the server and start the worker processes."""
+        self.start_pool(workers, timeout, quiet, token)
+        try:
+            socketserver.UnixStreamServer.__init__(self, address, _GradingHandler)
+        except Exception:
+            self.close_pool()
+            raise
+
+    def server_close(self):
+        super(UnixGradingServer, self).server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+def main(argv=None):
+    """Run the ``plotchecker`` command line interface."""
+    parser = argparse.ArgumentParser(prog='plotchecker')
+    subparsers = parser.add_subparsers(dest='command')
+    serve = subparsers.add_parser('serve', help='run a local grading server')
+    serve.add_argument(
+        '--host', default='127.0.0.1',
+        help='the host to listen on (which must be a loopback address)')
+    serve.add_argument(
+        '--port', type=int, default=8765, help='the port to listen on')
+    serve.add_argument(
+        '--socket', help='listen on this Unix socket instead of on a port')
+    serve.add_argument(
+        '--workers', type=int, default=None,
+        help='the number of worker processes (default: the number of CPUs)')
+    serve.add_argument(
+        '--timeout', type=float, default=None,
+        help='the maximum number of seconds to spend grading a request')
+    serve.add_argument(
+        '--quiet', action='store_true', help="don't log each request")
+    serve.add_argument(
+        '--token-file',
+        help='write the token of the server to this file, rather than printing it')
+    serve.add_argument(
+        '--metrics-file',
+        help='write the metrics to this file on shutdown (as JSON if it ends '
+             'with .json, and in the Prometheus text format otherwise)')
+
+    args = parser.parse_args(argv)
+    if args.command != 'serve':
+        parser.print_help()
+        return 1
+
+    token = os.environ.get('PLOTCHECKER_TOKEN') or None
+    if args.socket:
+        server = UnixGradingServer(
+            args.socket, workers=args.workers, timeout=args.timeout, quiet=args.quiet,
+            token=token)
+    else:
+        try:
+            server = GradingServer(
+                (args.host, args.port), workers=args.workers, timeout=args.timeout,
+                quiet=args.quiet, token=token)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.token_file:
+        # the token file is only readable by its owner
+        fd = os.open(args.token_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(server.token)
+    elif token is None:
+        sys.stderr.write("plotchecker: token: {}\n".format(server.token))
+        sys.stderr.flush()
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.metrics_file:
+            if args.metrics_file.endswith('.json'):
+                metrics.write_json(args.metrics_file)
+            else:
+                metrics.write_prometheus(args.metrics_file)
+    return 0
@@ -0,0 +1,228 @@
+"""
+Transport of plot checker snapshots between processes through shared
+memory (this requires Python 3.8 or later, and so is not imported by the
+top-level ``plotchecker`` package).
+
+When a snapshot of a plot checker (see
+:meth:`plotchecker.PlotChecker.snapshot`) is shared, its numeric arrays are
+copied once into a single shared memory block, and everything else is
+pickled into a small descriptor. Other processes can then load the snapshot
+from the descriptor, and its arrays are views onto the shared memory rather
+than copies.
+
+.. code:: python
+
+    # in the coordinator
+    with SharedSnapshot(LinePlotChecker(ax)) as shared:
+        results = pool.apply(grade, (shared.descriptor, rubric))
+
+    # in the worker
+    def grade(descriptor, rubric):
+        with load_shared_snapshot(descriptor) as checker:
+            return run_rubric(checker, rubric)
+
+The process that shares the snapshot owns the shared memory, and frees it
+when the :class:`~plotchecker.sharedmem.SharedSnapshot` is closed (so it
+must not be closed until all the workers are done with it).
+"""
+
+import inspect
+import io
+import os
+import pickle
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+#: Arrays are aligned to this many bytes within the shared memory block.
+_alignment = 64
+
+#: Whether shared memory can be attached to without registering it with the
+#: resource tracker (which requires Python 3.13 or later).
+_attach_untracked = 'track' in inspect.signature(shared_memory.SharedMemory).parameters
+
+
+class _AttachedMemory(shared_memory.SharedMemory):
+    """A shared memory block that another process owns. The block is closed
+    when the snapshot loaded from it is done with, unless arrays from it are
+    still in use, in which case it stays mapped for as long as they exist
+    (as they refer to its memory map) and is unmapped along with the last of
+    them.
+
+    """
+
+    def __del__(self):
+        # the memory map doesn't need the file descriptor once it exists
+        fd = getattr(self, '_fd', -1)
+        if fd >= 0:
+            os.close(fd)
+            self._fd = -1
+
+
+def _attach(name):
+    """Attach to an existing shared memory block, without leaving it
+    registered with the resource tracker of this process (which would
+    otherwise free the block when this process exits, even though it doesn't
+    own it).
+
+    """
+    if _attach_untracked:
+        return _AttachedMemory(name=name, track=False)
+
+    # versions of Python before 3.13 always register the block
+    from multiprocessing import resource_tracker
+    shm = _AttachedMemory(name=name)
+    resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+class _ArrayPickler(pickle.Pickler):
+    """Pickle an object, leaving out any large numeric arrays, which are
+    collected in ``self.arrays`` instead.
+
+    """
+
+    def __init__(self, file, min_size):
+        pickle.Pickler.__init__(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.min_size = min_size
+        self.arrays = []
+
+    def persistent_id(self, obj):
+        if type(obj) is np.ndarray and not obj.dtype.hasobject and obj.nbytes >= self.min_size:
+            self.arrays.append(obj)
+            return len(self.arrays) - 1
+        return None
+
+
+class _ArrayUnpickler(pickle.Unpickler):
+    """Unpickle an object pickled by ``_ArrayPickler``, with the arrays that
+    were left out replaced by views onto a buffer.
+
+    """
+
+    def __init__(self, file, buf, layout):
+        pickle.Unpickler.__init__(self, file)
+        self.buf = buf
+        self.layout = layout
+
+    def persistent_load(self, pid):
+        offset, shape, dtype = self.layout[pid]
+
+        # unlike creating an ndarray directly on the buffer, ``frombuffer``
+        # holds on to the buffer, so the shared memory can't be closed while
+        # the array still exists
+        count = int(np.prod(shape))
+        array = np.frombuffer(self.buf, dtype=dtype, count=count, offset=offset)
+        array = array.reshape(shape)
+
+        # other processes may be reading the same memory
+        array.flags.writeable = False
+        return array
+
+
+class SharedSnapshot(object):
+    """A snapshot of a plot checker whose arrays are stored in shared memory.
+
+    Parameters
+    ----------
+    checker : :class:`~plotchecker.PlotChecker`
+        The plot checker (or a snapshot of it) to share.
+    min_size : int (default: 4096)
+        Arrays that are smaller than this many bytes are pickled into the
+        descriptor instead of being put in shared memory.
+
+    """
+
+    def __init__(self, checker, min_size=4096):
+        """Copy the arrays of the checker's snapshot into shared memory."""
+        f = io.BytesIO()
+        pickler = _ArrayPickler(f, min_size)
+        pickler.dump(checker)
+
+        layout = []
+        size = 0
+        for array in pickler.arrays:
+            offset = -(-size // _alignment) * _alignment
+            layout.append((offset, array.shape, array.dtype))
+            size = offset + array.nbytes
+
+        self._shm = None
+        if len(layout) > 0:
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            for array, (offset, shape, dtype) in zip(pickler.arrays, layout):
+                dest = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf, offset=offset)
+                dest[...] = array
+                del dest
+
+        #: The descriptor of the snapshot, to pass to
+        #: :func:`~plotchecker.sharedmem.load_shared_snapshot`.
+        self.descriptor = pickle.dumps({
+            'name': self._shm.name if self._shm is not None else None,
+            'layout': layout,
+            'pickle': f.getvalue()
+        }, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def close(self):
+        """Free the shared memory. Any snapshots that have been loaded from
+        it must have been closed already.
+
+        """
+        if self._shm is not None:
+            self._shm.close()
+            if not _attach_untracked:
+                # a process that attached to the block may have unregistered
+                # it from the resource tracker that this process shares
+                from multiprocessing import resource_tracker
+                resource_tracker.register(self._shm._name, 'shared_memory')
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+@contextmanager
+def load_shared_snapshot(descriptor):
+    """Load a snapshot of a plot checker that has been shared by a
+    :class:`~plotchecker.sharedmem.SharedSnapshot`, with arrays that are
+    read-only views onto the shared memory.
+
+    This is a context manager. The shared memory is detached at the end of
+    the ``with`` statement, unless the snapshot or any of its arrays are
+    still referenced, in which case it stays attached until they are all
+    gone, so the snapshot can be returned or kept like any other object.
+
+    Parameters
+    ----------
+    descriptor : bytes
+        The :attr:`~plotchecker.sharedmem.SharedSnapshot.descriptor` of the
+        shared snapshot.
+
+    """
+    descriptor = pickle.loads(descriptor)
+    shm = buf = None
+    if descriptor['name'] is not None:
+        shm = _attach(descriptor['name'])
+        buf = shm.buf
+
+    unpickler = _ArrayUnpickler(
+        io.BytesIO(descriptor['pickle']), buf, descriptor['layout'])
+    checker = unpickler.load()
+
+    # only the arrays keep the memory attached from here on
+    del unpickler, buf
+    try:
+        yield checker
+    finally:
+        del checker
+        if shm is not None:
+            try:
+                shm.close()
+            except BufferError:
+                # arrays from the snapshot are still in use, and the memory
+                # is detached when the last of them is gone
+                pass
@@ -1,9 +1,17 @@
+import sys
+
 import matplotlib
 matplotlib.use("Agg")
 
 import matplotlib.pyplot as plt
 import pytest
 
+# plotchecker.aio needs Python 3.7, and its tests use async syntax, so they
+# can't even be collected on older versions
+collect_ignore = []
+if sys.version_info < (3, 7):
+    collect_ignore.append("test_aio.py")
+
 
 @pytest.fixture
 def axis(request):
@@ -25,3 +33,17 @@ def axes(request):
     request.addfinalizer(fin)
 
     return axes
+
+
+@pytest.fixture
+def axes_list(request):
+    """The axes of three separate figures (rather than subplots of the same
+    figure, which can be aligned differently with the pixel grid)."""
+    figs = [plt.figure() for _ in range(3)]
+
+    def fin():
+        for fig in figs:
+            plt.close(fig)
+    request.addfinalizer(fin)
+
+    return [fig.add_subplot(111) for fig in figs]
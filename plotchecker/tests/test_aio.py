@@ -0,0 +1,72 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from .. import LinePlotChecker, InvalidPlotError, RubricResult
+from .. import aio
+
+
+def test_grade(axis):
+    axis.plot([1, 2, 3], [4, 5, 6])
+    results = asyncio.run(aio.grade(
+        LinePlotChecker, axis,
+        [('assert_num_lines', [1]), ('assert_num_lines', [2])]))
+    assert [r.passed for r in results] == [True, False]
+
+
+def test_invalid_plot(axis):
+    with pytest.raises(InvalidPlotError):
+        asyncio.run(aio.make_checker(LinePlotChecker, axis))
+
+
+def test_timeout(axis):
+    axis.plot([1, 2, 3], [4, 5, 6])
+    pc = LinePlotChecker(axis)
+    calls = []
+
+    def slow(pc):
+        calls.append(1)
+        time.sleep(0.2)
+
+    async def run(**kwargs):
+        with ThreadPoolExecutor(1) as executor:
+            return await aio.run_rubric(pc, [slow, slow], executor=executor, **kwargs)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run(timeout=0.05))
+    assert len(calls) == 1
+
+    # the deadline applies to the whole rubric
+    async def run_with_deadline():
+        deadline = asyncio.get_running_loop().time() + 0.3
+        return await run(deadline=deadline)
+
+    del calls[:]
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run_with_deadline())
+    assert len(calls) == 2
+
+    assert asyncio.run(run(timeout=1)) == [RubricResult('slow', True, None)] * 2
+
+
+def test_cancel(axis):
+    axis.plot([1, 2, 3], [4, 5, 6])
+    pc = LinePlotChecker(axis)
+    calls = []
+
+    def slow(pc):
+        calls.append(1)
+        time.sleep(0.1)
+
+    async def run():
+        task = asyncio.ensure_future(aio.run_rubric(pc, [slow] * 5))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    time.sleep(0.1)
+    assert len(calls) == 1
@@ -1,5 +1,8 @@
+import pickle
+
 import pytest
 import numpy as np
+import matplotlib.pyplot as plt
 
 from .. import BarPlotChecker, InvalidPlotError
 
@@ -300,3 +303,153 @@ def test_example(axes):
         pc.assert_edgecolors_equal('k')
         pc.assert_alphas_equal(alphas)
         pc.assert_linewidths_equal(1)
+
+
+def test_stacked_order(axis):
+    """Are stacked bars ordered by their centers and then their bottoms?"""
+    x = np.arange(5)
+    y1 = np.linspace(1, 5, 5)
+    y2 = np.linspace(2, 3, 5)
+    axis.bar(x, y2, bottom=y1, align='center')
+    axis.bar(x, y1, align='center')
+
+    pc = BarPlotChecker(axis)
+    pc.assert_num_bars(10)
+    pc.assert_centers_equal(np.repeat(x, 2))
+    pc.assert_bottoms_equal(np.vstack([np.zeros(5), y1]).T.ravel())
+    pc.assert_heights_equal(np.vstack([y1, y2]).T.ravel())
+
+
+def test_grouped_series(axis):
+    """Can the series of a grouped bar chart be checked separately?"""
+    x = np.arange(5)
+    y1 = np.linspace(1, 5, 5)
+    y2 = np.linspace(2, 3, 5)
+    axis.bar(x - 0.2, y1, width=0.4, color='r')
+    axis.bar(x + 0.2, y2, width=0.4, color='b')
+    axis.add_patch(plt.Rectangle((0, 0), 10, 10))
+
+    pc = BarPlotChecker(axis)
+    pc.assert_num_bars(10)
+    pc.assert_num_series(2)
+    pc.assert_centers_allclose(np.vstack([x - 0.2, x + 0.2]).T.ravel())
+
+    pc.get_series(0).assert_centers_allclose(x - 0.2)
+    pc.get_series(0).assert_heights_equal(y1)
+    pc.get_series(0).assert_colors_equal('r')
+    pc.get_series(1).assert_centers_allclose(x + 0.2)
+    pc.get_series(1).assert_heights_equal(y2)
+    pc.get_series(1).assert_colors_equal('b')
+
+    with pytest.raises(InvalidPlotError):
+        pc.get_series(2)
+
+
+def test_stacked_series(axis):
+    """Are stacked bars split into series even without containers?"""
+    x = np.arange(5)
+    y1 = np.linspace(1, 5, 5)
+    y2 = np.linspace(2, 3, 5)
+    for i in range(len(x)):
+        axis.add_patch(plt.Rectangle((x[i] - 0.4, y1[i]), 0.8, y2[i]))
+        axis.add_patch(plt.Rectangle((x[i] - 0.4, 0), 0.8, y1[i]))
+
+    pc = BarPlotChecker(axis)
+    pc.assert_num_series(2)
+    pc.get_series(0).assert_heights_equal(y1)
+    pc.get_series(1).assert_bottoms_equal(y1)
+    pc.get_series(1).assert_heights_equal(y2)
+
+
+def test_horizontal(axis):
+    """Are horizontal bars handled correctly?"""
+    y = np.arange(10)
+    w = np.linspace(1, 5, 10)
+    l = np.linspace(0, 1, 10)
+    axis.barh(y[::-1], w[::-1], left=l[::-1], height=0.5)
+
+    pc = BarPlotChecker(axis)
+    pc.assert_orientations_equal('horizontal')
+    pc.assert_positions_equal(y)
+    pc.assert_lengths_allclose(w)
+    pc.assert_baselines_equal(l)
+    pc.assert_centers_allclose(l + w / 2)
+    pc.assert_heights_equal(0.5)
+
+    with pytest.raises(AssertionError):
+        pc.assert_orientations_equal('vertical')
+
+
+def test_infer_horizontal(axis):
+    """Is the orientation of bars inferred if there are no containers?"""
+    y = np.arange(5)
+    w = np.linspace(1, 5, 5)
+    for i in range(len(y)):
+        axis.add_patch(plt.Rectangle((0, y[i] - 0.4), w[i], 0.8))
+
+    pc = BarPlotChecker(axis)
+    pc.assert_orientations_equal('horizontal')
+    pc.assert_positions_allclose(y)
+    pc.assert_lengths_equal(w)
+    pc.assert_baselines_equal(0)
+
+
+
+def test_infer_stacked_orientation(axis):
+    """Is the orientation of a single stack of bars inferred correctly?"""
+    axis.add_patch(plt.Rectangle((-0.4, 0), 0.8, 2))
+    axis.add_patch(plt.Rectangle((-0.4, 2), 0.8, 3))
+
+    pc = BarPlotChecker(axis)
+    pc.assert_orientations_equal('vertical')
+    pc.assert_num_series(2)
+    pc.assert_baselines_equal([0, 2])
+    pc.assert_lengths_equal([2, 3])
+
+    axis.clear()
+    axis.add_patch(plt.Rectangle((0, -0.4), 2, 0.8))
+    axis.add_patch(plt.Rectangle((2, -0.4), 3, 0.8))
+
+    pc = BarPlotChecker(axis)
+    pc.assert_orientations_equal('horizontal')
+    pc.assert_num_series(2)
+    pc.assert_baselines_equal([0, 2])
+    pc.assert_lengths_equal([2, 3])
+
+def test_vertical(axis):
+    """Do the orientation-neutral properties work for vertical bars?"""
+    x = np.arange(10)
+    y = np.linspace(1, 5, 10)
+    b = np.linspace(0, 1, 10)
+    axis.bar(x, y, bottom=b)
+
+    pc = BarPlotChecker(axis)
+    pc.assert_orientations_equal('vertical')
+    pc.assert_positions_equal(x)
+    pc.assert_lengths_equal(y)
+    pc.assert_baselines_equal(b)
+
+
+def test_legend_labels(axis):
+    axis.bar([0, 1], [1, 2], width=0.4, label='foo')
+    axis.bar([0.5, 1.5], [3, 4], width=0.4, label='bar')
+    axis.legend()
+
+    pc = BarPlotChecker(axis)
+    pc.assert_legend_labels_equal(['foo', 'bar', 'foo', 'bar'])
+    pc.get_series(1).assert_legend_labels_equal('bar')
+    with pytest.raises(AssertionError):
+        pc.assert_legend_labels_equal('foo')
+
+
+def test_snapshot(axis):
+    axis.bar([0, 1], [1, 2], width=0.4, label='foo')
+    axis.bar([0.5, 1.5], [3, 4], width=0.4, label='bar')
+    axis.legend()
+
+    pc = pickle.loads(pickle.dumps(BarPlotChecker(axis)))
+    pc.assert_num_bars(4)
+    pc.assert_heights_equal([1, 3, 2, 4])
+    pc.get_series(1).assert_heights_equal([3, 4])
+    pc.get_series(1).assert_legend_labels_equal('bar')
+
@@ -1,7 +1,12 @@
+import copy
+import pickle
+
 import pytest
 import numpy as np
 
-from .. import PlotChecker
+from .. import (
+    PlotChecker, LinePlotChecker, ScatterPlotChecker, BarPlotChecker,
+    ErrorbarPlotChecker, ImagePlotChecker, InvalidPlotError)
 
 
 def test_color2rgb():
@@ -128,6 +133,21 @@ def test_assert_yticklabels_equal(axis):
     with pytest.raises(AssertionError):
         pc.assert_yticklabels_equal(['a', 'b', 'c'])
 
+
+def test_default_ticklabels(axis):
+    axis.plot([0, 1], [0, 2])
+    axis.set_xlim(0, 1)
+    pc = PlotChecker(axis)
+    pc.assert_xticklabels_equal(['0.0', '0.2', '0.4', '0.6', '0.8', '1.0'])
+
+    # the labels follow the view limits, without drawing the figure
+    axis.set_xlim(0, 10)
+    pc.assert_xticklabels_equal(['0', '2', '4', '6', '8', '10'])
+
+    axis.set_yticks([0, 1, 2])
+    pc.assert_yticklabels_equal(['0', '1', '2'])
+
+
 def test_texts(axis):
     x = np.random.rand(10)
     y = np.random.rand(10)
@@ -164,3 +184,235 @@ def test_texts_allclose(axis):
     with pytest.raises(AssertionError):
         pc.assert_textpoints_allclose(np.array([x, y]).T, rtol=1e-13)
     pc.assert_textpoints_allclose(np.array([x, y]).T)
+
+
+def test_assert_chunked(monkeypatch):
+    monkeypatch.setattr(PlotChecker, "_chunk_size", 10)
+    x = np.arange(1, 101).reshape(50, 2)
+    PlotChecker._assert_chunked(x, x.copy())
+    PlotChecker._assert_chunked(x, x + 1e-12, func=np.testing.assert_allclose)
+
+    y = x.copy()
+    y[-1, 1] = 0
+    with pytest.raises(AssertionError):
+        PlotChecker._assert_chunked(x, y)
+    with pytest.raises(AssertionError):
+        PlotChecker._assert_chunked(x, x[:10])
+
+
+def test_block_mean(monkeypatch):
+    monkeypatch.setattr(PlotChecker, "_chunk_size", 10)
+    x = np.arange(35, dtype=float).reshape(7, 5)
+    y = PlotChecker._block_mean(x, 2)
+    np.testing.assert_array_equal(y, np.array([[3, 5], [13, 15], [23, 25]]))
+
+    with pytest.raises(ValueError):
+        PlotChecker._block_mean(x, 0)
+
+
+def test_artist_index(axis):
+    axis.set_title("title")
+    l, = axis.plot([1, 2], [3, 4])
+    s = axis.scatter([1, 2], [3, 4])
+    b = axis.bar([1, 2], [3, 4])
+    t = axis.text(0.5, 0.5, "foo")
+    i = axis.imshow(np.random.rand(2, 2))
+
+    pc = PlotChecker(axis)
+    index = pc._artists
+    assert index['lines'] == [l]
+    assert index['collections'] == [s]
+    assert index['patches'] == list(b.patches)
+    assert index['texts'] == [t]
+    assert index['images'] == [i]
+    assert index['containers'] == [b]
+
+    # the index is only computed once
+    assert pc._artists is index
+    assert pc._get_artists('texts') == [t]
+
+
+def test_cached(axis):
+    l, = axis.plot([1, 2], [3, 4])
+
+    pc = LinePlotChecker.cached(axis)
+    pc.assert_x_data_equal([[1, 2]])
+    pc.assert_xticks_equal(axis.get_xticks())
+    assert LinePlotChecker.cached(axis) is pc
+    assert PlotChecker.cached(axis) is not pc
+    assert PlotChecker(axis)._artists is pc._artists
+
+    # modifying an artist invalidates the cache
+    l.set_data([5, 6], [7, 8])
+    pc2 = LinePlotChecker.cached(axis)
+    assert pc2 is not pc
+    pc2.assert_x_data_equal([[5, 6]])
+
+    # so does adding a new artist
+    axis.plot([1, 2], [3, 4])
+    pc3 = LinePlotChecker.cached(axis)
+    assert pc3 is not pc2
+    pc3.assert_num_lines(2)
+
+
+def test_cached_draw(axis):
+    """Is the cache invalidated by modifications that are followed by a draw?"""
+    bc = axis.bar([0, 1, 2], [1, 2, 3])
+    pc = BarPlotChecker.cached(axis)
+    pc.assert_heights_equal([1, 2, 3])
+
+    # drawing the figure by itself doesn't invalidate the cache, and the
+    # stale flags of the artists are left alone
+    axis.figure.canvas.draw()
+    assert BarPlotChecker.cached(axis) is pc
+    bc.patches[0].set_height(10)
+    assert bc.patches[0].stale
+
+    axis.figure.canvas.draw()
+    pc2 = BarPlotChecker.cached(axis)
+    assert pc2 is not pc
+    pc2.assert_heights_equal([10, 2, 3])
+
+
+def test_cached_invalid(axis):
+    with pytest.raises(InvalidPlotError):
+        LinePlotChecker.cached(axis)
+    with pytest.raises(InvalidPlotError):
+        LinePlotChecker.cached(axis)
+
+    axis.plot([1, 2], [3, 4])
+    LinePlotChecker.cached(axis).assert_num_lines(1)
+
+
+def test_assert_allclose_float32():
+    x = np.array([1.0, np.nan, np.inf, -np.inf, 1e300, 1e-300, 0.0])
+    PlotChecker._assert_allclose_float32(x, x.copy())
+    PlotChecker._assert_allclose_float32(x * (1 + 1e-8), x, rtol=2e-8)
+
+    # just within and just outside of the tolerance, which can't be told
+    # apart in single precision
+    PlotChecker._assert_allclose_float32(np.array([1.0 + 1e-9]), np.array([1.0]), rtol=1e-9 + 1e-15)
+    with pytest.raises(AssertionError):
+        PlotChecker._assert_allclose_float32(np.array([1.0 + 1e-9]), np.array([1.0]), rtol=1e-9 - 1e-15)
+
+    with pytest.raises(AssertionError):
+        PlotChecker._assert_allclose_float32(x, x, equal_nan=False)
+    with pytest.raises(AssertionError):
+        PlotChecker._assert_allclose_float32(np.array([1e300]), np.array([1.1e300]))
+    with pytest.raises(AssertionError):
+        PlotChecker._assert_allclose_float32(np.array([np.inf]), np.array([-np.inf]))
+    with pytest.raises(AssertionError):
+        PlotChecker._assert_allclose_float32(x, x[:-1])
+
+
+def test_reduced_precision(axis):
+    x = np.linspace(0, 1, 1000)
+    axis.plot(x, x ** 2)
+
+    pc = LinePlotChecker(axis)
+    pc.reduced_precision = True
+    pc.assert_y_data_allclose([x ** 2 + 1e-9], atol=2e-9)
+    with pytest.raises(AssertionError):
+        pc.assert_y_data_allclose([x ** 2 + 1e-9], atol=5e-10)
+
+    # the option is kept by snapshots
+    for snapshot in (pc.snapshot(), pickle.loads(pickle.dumps(pc))):
+        assert snapshot.reduced_precision
+        assert snapshot._allclose.__func__ is PlotChecker._assert_allclose_float32.__func__
+
+
+def test_detect(axes):
+    axes[0].plot([1, 2], [3, 4])
+    axes[1].plot([1, 2], [3, 4], 'o')
+    axes[2].scatter([1, 2], [3, 4])
+
+    for ax, checker_cls in zip(axes, [LinePlotChecker, ScatterPlotChecker, ScatterPlotChecker]):
+        checkers = PlotChecker.detect(ax)
+        assert [type(x) for x in checkers] == [checker_cls]
+        assert PlotChecker.detect(ax)[0] is checkers[0]
+
+
+def test_detect_mixed(axes):
+    axes[0].bar([1, 2, 3], [4, 5, 6])
+    axes[0].plot([1, 2, 3], [4, 5, 6], 'k-')
+    checkers = PlotChecker.detect(axes[0])
+    assert [type(x) for x in checkers] == [LinePlotChecker, BarPlotChecker]
+    checkers[0].assert_num_lines(1)
+    checkers[1].assert_num_bars(3)
+
+    # the lines of the error bars aren't detected as a separate line plot
+    axes[1].errorbar([1, 2], [3, 4], yerr=[0.5, 0.5])
+    axes[1].imshow(np.zeros((2, 2)))
+    checkers = PlotChecker.detect(axes[1])
+    assert [type(x) for x in checkers] == [ErrorbarPlotChecker, ImagePlotChecker]
+
+    with pytest.raises(InvalidPlotError):
+        PlotChecker.detect(axes[2])
+
+
+def test_detect_separate_artists(axes):
+    """Does each detected checker only check the artists of its own kind?"""
+    x = np.arange(10)
+    axes[0].errorbar(x, x, yerr=0.5, capsize=3)
+    axes[0].plot(x, x * 2.0)
+    checkers = PlotChecker.detect(axes[0])
+    assert [type(x) for x in checkers] == [LinePlotChecker, ErrorbarPlotChecker]
+    checkers[0].assert_num_lines(1)
+    checkers[0].assert_y_data_equal([x * 2.0])
+    checkers[1].assert_num_lines(1)
+    checkers[1].assert_y_data_equal([x])
+
+    axes[1].plot(x, x, '-')
+    axes[1].plot(x, x * 2.0, 'o')
+    axes[1].set_title('foo')
+    checkers = PlotChecker.detect(axes[1])
+    assert [type(x) for x in checkers] == [LinePlotChecker, ScatterPlotChecker]
+    checkers[0].assert_num_lines(1)
+    checkers[0].assert_y_data_equal([x])
+    checkers[1].assert_y_data_equal(x * 2.0)
+    checkers[1].assert_title_equal('foo')
+
+    # the checkers for the whole plot still include all of the artists
+    LinePlotChecker.cached(axes[1]).assert_num_lines(2)
+
+
+def test_snapshot(axis):
+    axis.plot([1, 2], [3, 4])
+    axis.set_title('foo')
+    axis.set_xlim(0, 5)
+    axis.text(1, 2, 'bar')
+
+    pc = PlotChecker(axis)
+    for snapshot in (pc.snapshot(), pickle.loads(pickle.dumps(pc))):
+        assert isinstance(snapshot, PlotChecker)
+        snapshot.assert_title_equal('foo')
+        snapshot.assert_xlim_equal((0, 5))
+        snapshot.assert_xticklabels_equal(pc.xticklabels)
+        snapshot.assert_textlabels_equal(['bar'])
+        with pytest.raises(InvalidPlotError):
+            snapshot.raster
+
+        # snapshots aren't affected by changes to the plot
+        axis.set_title('baz')
+        snapshot.assert_title_equal('foo')
+        axis.set_title('foo')
+
+    # snapshots can be pickled too
+    snapshot = pickle.loads(pickle.dumps(pc.snapshot()))
+    snapshot.assert_title_equal('foo')
+    assert len(pickle.dumps(pc)) < len(pickle.dumps(axis.figure)) / 10
+
+    # copying a checker doesn't take a snapshot
+    assert type(copy.copy(pc)) is PlotChecker
+    pc2 = copy.deepcopy(pc)
+    assert type(pc2) is PlotChecker
+    assert pc2.axis is not axis
+    pc2.assert_title_equal('foo')
+
+
+def test_snapshot_errors(axis):
+    axis.scatter([1, 2], [3, 4])
+    snapshot = ScatterPlotChecker(axis).snapshot()
+    snapshot.assert_x_data_equal([1, 2])
+    with pytest.raises(NotImplementedError):
+        snapshot.markers
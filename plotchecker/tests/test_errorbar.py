@@ -0,0 +1,102 @@
+import pytest
+import numpy as np
+
+from .. import ErrorbarPlotChecker, InvalidPlotError
+
+
+def test_empty_plot(axis):
+    """Is an error thrown when there is nothing plotted?"""
+    with pytest.raises(InvalidPlotError):
+        ErrorbarPlotChecker(axis)
+
+
+def test_no_errorbars(axis):
+    """Is an error thrown when there are lines, but no error bars?"""
+    axis.plot([1, 2, 3], [4, 5, 6])
+    with pytest.raises(InvalidPlotError):
+        ErrorbarPlotChecker(axis)
+
+
+def test_data(axis):
+    """Are the lines and errors correct?"""
+    x = np.arange(10)
+    y = np.linspace(1, 5, 10)
+    yerr = np.vstack([np.linspace(0, 1, 10), np.linspace(1, 2, 10)])
+    axis.errorbar(x, y, yerr=yerr, xerr=0.5, capsize=3, color='r')
+
+    pc = ErrorbarPlotChecker(axis)
+    pc.assert_num_lines(1)
+    pc.assert_x_data_equal([x])
+    pc.assert_y_data_equal([y])
+    pc.assert_colors_equal(['r'])
+    pc.assert_xerr_equal([0.5])
+    pc.assert_xerr_allclose([np.full(10, 0.5)])
+    pc.assert_yerr_allclose([yerr])
+
+    with pytest.raises(AssertionError):
+        pc.assert_xerr_equal([0.4])
+    with pytest.raises(AssertionError):
+        pc.assert_yerr_allclose([yerr[::-1]])
+    with pytest.raises(AssertionError):
+        pc.assert_yerr_allclose([yerr[:, :5]])
+
+
+def test_multiple(axis):
+    """Are the errors of multiple lines correct?"""
+    x = np.arange(10)
+    y1 = np.linspace(1, 5, 10)
+    y2 = np.linspace(5, 6, 10)
+    axis.errorbar(x, y1, yerr=0.1, fmt='ro')
+    axis.errorbar(x, y2, xerr=np.linspace(0, 1, 10), fmt='b-')
+
+    pc = ErrorbarPlotChecker(axis)
+    pc.assert_num_lines(2)
+    pc.assert_xerr_allclose([0, np.linspace(0, 1, 10)])
+    pc.assert_yerr_allclose([0.1, 0])
+
+    pc.find_permutation('colors', ['b', 'r'])
+    pc.assert_y_data_equal([y2, y1])
+    pc.assert_yerr_allclose([0, 0.1])
+
+
+def test_reduced_precision(axis, monkeypatch):
+    """Are the errors compared in single precision when reduced precision is
+    enabled?"""
+    x = np.arange(10)
+    axis.errorbar(x, x, xerr=0.5, yerr=np.linspace(0, 1, 10))
+
+    calls = []
+    assert_allclose_float32 = ErrorbarPlotChecker._assert_allclose_float32
+    def spy(actual, desired, **kwargs):
+        calls.append(desired)
+        assert_allclose_float32(actual, desired, **kwargs)
+
+    pc = ErrorbarPlotChecker(axis)
+    pc.reduced_precision = True
+    monkeypatch.setattr(pc, '_assert_allclose_float32', spy)
+    pc.assert_xerr_allclose([0.5])
+    pc.assert_yerr_allclose([np.linspace(0, 1, 10)])
+    assert len(calls) == 2
+    with pytest.raises(AssertionError):
+        pc.assert_yerr_allclose([np.linspace(0, 1.1, 10)])
+
+
+def test_missing_errorbars(axis):
+    """Are points without error bars given errors of NaN?"""
+    x = np.arange(6)
+    y = np.array([1, 2, np.nan, 4, 5, 6])
+    axis.errorbar(x, y, yerr=0.5)
+    axis.errorbar(x, x * 2.0, xerr=0.5, yerr=0.25, errorevery=2)
+
+    pc = ErrorbarPlotChecker(axis)
+    pc.assert_num_lines(2)
+    pc.assert_x_data_equal([x, x])
+    pc.assert_y_data_equal([y, x * 2.0])
+
+    yerr = np.full(6, 0.5)
+    yerr[2] = np.nan
+    pc.assert_yerr_allclose([yerr, [0.25, np.nan] * 3])
+    pc.assert_xerr_allclose([0, [0.5, np.nan] * 3])
+
+    with pytest.raises(AssertionError):
+        pc.assert_yerr_allclose([0.5, 0.25])
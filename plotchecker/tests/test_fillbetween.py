@@ -0,0 +1,91 @@
+import pytest
+import numpy as np
+import matplotlib.collections
+
+from .. import FillBetweenPlotChecker, InvalidPlotError
+
+
+def test_empty_plot(axis):
+    """Is an error thrown when there is nothing plotted?"""
+    with pytest.raises(InvalidPlotError):
+        FillBetweenPlotChecker(axis)
+
+
+def test_data(axis):
+    """Are the x, y1 and y2 values correct?"""
+    x = np.linspace(0, 1, 100)
+    y1 = np.sin(x)
+    y2 = np.cos(x)
+    axis.fill_between(x, y1, y2, color='r', alpha=0.5)
+
+    pc = FillBetweenPlotChecker(axis)
+    pc.assert_num_bands(1)
+    assert pc.orientations == ['vertical']
+    pc.assert_x_data_equal([x])
+    pc.assert_y1_data_equal([y1])
+    pc.assert_y2_data_equal([y2])
+    pc.assert_x_data_allclose([x])
+    pc.assert_y1_data_allclose([y1])
+    pc.assert_y2_data_allclose([y2])
+    pc.assert_colors_equal(['r'])
+    pc.assert_alphas_equal([0.5])
+
+    with pytest.raises(AssertionError):
+        pc.assert_num_bands(2)
+    with pytest.raises(AssertionError):
+        pc.assert_y1_data_equal([y2])
+    with pytest.raises(AssertionError):
+        pc.assert_y2_data_allclose([y2 + 1e-3])
+    with pytest.raises(AssertionError):
+        pc.assert_x_data_allclose([x[:50]])
+    with pytest.raises(AssertionError):
+        pc.assert_colors_equal(['b'])
+
+
+def test_scalar_and_where(axis):
+    """Are bands with a scalar curve and gaps handled correctly?"""
+    x = np.arange(10.)
+    y = x ** 2
+    where = x != 4
+    axis.fill_between(x, 0, y, where=where)
+
+    pc = FillBetweenPlotChecker(axis)
+    pc.assert_x_data_equal([x[where]])
+    pc.assert_y1_data_equal([np.zeros(9)])
+    pc.assert_y2_data_equal([y[where]])
+
+
+def test_multiple_and_horizontal(axis):
+    """Are multiple bands, including horizontal ones, handled correctly?"""
+    t = np.linspace(0, 1, 20)
+    axis.fill_between(t, t, t + 1, color='r')
+    axis.fill_betweenx(t, -t, t ** 2, color='b')
+
+    pc = FillBetweenPlotChecker(axis)
+    pc.assert_num_bands(2)
+    assert pc.orientations == ['vertical', 'horizontal']
+    pc.assert_x_data_equal([t, t])
+    pc.assert_y1_data_equal([t, -t])
+    pc.assert_y2_data_equal([t + 1, t ** 2])
+    pc.assert_colors_equal(['r', 'b'])
+
+
+def test_other_polygons(axis, monkeypatch):
+    """Are polygons that aren't from fill between plots rejected by older
+    versions of matplotlib (which have no dedicated collection type)?"""
+    # steps still have the fill between layout
+    x = np.arange(5)
+    band = axis.fill_between(x, x ** 2, step='pre')
+    data, horizontal = FillBetweenPlotChecker._parse_polygon(
+        band.get_paths()[0].vertices)
+    assert not horizontal
+    band.remove()
+
+    with pytest.raises(InvalidPlotError):
+        FillBetweenPlotChecker._parse_polygon(np.zeros((6, 2)))
+
+    axis.hexbin(np.arange(10), np.arange(10), gridsize=3)
+    monkeypatch.delattr(
+        matplotlib.collections, 'FillBetweenPolyCollection', raising=False)
+    with pytest.raises(InvalidPlotError):
+        FillBetweenPlotChecker(axis)
@@ -0,0 +1,104 @@
+import pytest
+import numpy as np
+
+from .. import HistogramChecker, InvalidPlotError
+
+
+def test_empty_plot(axis):
+    """Is an error thrown when there is nothing plotted?"""
+    with pytest.raises(InvalidPlotError):
+        HistogramChecker(axis)
+
+
+def test_multiple_histograms(axis):
+    """Is an error thrown when there is more than one histogram?"""
+    axis.hist(np.random.rand(10))
+    axis.hist(np.random.rand(10))
+    with pytest.raises(InvalidPlotError):
+        HistogramChecker(axis)
+
+
+@pytest.mark.parametrize("histtype", ['bar', 'step', 'stepfilled'])
+@pytest.mark.parametrize("orientation", ['vertical', 'horizontal'])
+def test_bins_and_counts(axis, histtype, orientation):
+    """Are the bins and counts correct?"""
+    samples = np.random.randn(1000)
+    counts, bins = np.histogram(samples, bins=20)
+    axis.hist(samples, bins=20, histtype=histtype, orientation=orientation)
+
+    pc = HistogramChecker(axis)
+    assert pc.orientation == orientation
+    pc.assert_num_bins(20)
+    pc.assert_bins_allclose(bins, atol=1e-12)
+    pc.assert_counts_equal(counts)
+    pc.assert_counts_match_samples(samples)
+
+    with pytest.raises(AssertionError):
+        pc.assert_num_bins(10)
+    with pytest.raises(AssertionError):
+        pc.assert_counts_equal(counts + 1)
+    with pytest.raises(AssertionError):
+        pc.assert_counts_match_samples(samples[:500])
+
+
+@pytest.mark.parametrize("orientation", ['vertical', 'horizontal'])
+def test_single_bin(axis, orientation):
+    """Is the orientation of a histogram with a single bar correct?"""
+    axis.hist([1, 2, 3], bins=1, orientation=orientation)
+
+    pc = HistogramChecker(axis)
+    assert pc.orientation == orientation
+    pc.assert_bins_equal([1, 3])
+    pc.assert_counts_equal([3])
+
+
+@pytest.mark.parametrize("orientation", ['vertical', 'horizontal'])
+def test_rwidth(axis, orientation):
+    """Are the bins correct when the bars are narrower than their bins?"""
+    samples = np.random.randn(1000)
+    counts, bins = np.histogram(samples, bins=20)
+    axis.hist(samples, bins=20, rwidth=0.8, orientation=orientation)
+
+    pc = HistogramChecker(axis)
+    pc.assert_bins_allclose(bins, atol=1e-12)
+    pc.assert_counts_equal(counts)
+    pc.assert_counts_match_samples(samples)
+
+
+@pytest.mark.parametrize("align", ['mid', 'left', 'right'])
+@pytest.mark.parametrize("rwidth", [None, 0.5])
+def test_align(axis, align, rwidth):
+    """Are the bins correct when the bars are aligned with the edges of
+    their bins?"""
+    samples = np.random.rand(1000)
+    bins = np.array([0, 0.1, 0.3, 0.6, 1])
+    counts, _ = np.histogram(samples, bins=bins)
+    axis.hist(samples, bins=bins, align=align, rwidth=rwidth)
+
+    pc = HistogramChecker(axis)
+    pc.assert_bins_allclose(bins, atol=1e-12)
+    pc.assert_counts_equal(counts)
+
+
+def test_not_contiguous(axis):
+    """Is an error thrown when the bars can't belong to contiguous bins?"""
+    axis.bar([0, 1, 3], [1, 2, 3], width=1)
+    with pytest.raises(InvalidPlotError):
+        HistogramChecker(axis)
+
+
+@pytest.mark.parametrize("histtype", ['bar', 'step'])
+def test_density(axis, histtype):
+    """Are normalized histograms checked correctly?"""
+    samples = np.random.rand(1000)
+    bins = np.array([0, 0.1, 0.5, 0.6, 1])
+    counts, _ = np.histogram(samples, bins=bins, density=True)
+    axis.hist(samples, bins=bins, density=True, histtype=histtype)
+
+    pc = HistogramChecker(axis)
+    pc.assert_bins_allclose(bins, atol=1e-12)
+    pc.assert_counts_allclose(counts)
+    pc.assert_counts_match_samples(samples, density=True)
+
+    with pytest.raises(AssertionError):
+        pc.assert_counts_match_samples(samples)
@@ -0,0 +1,156 @@
+import pickle
+
+import pytest
+import numpy as np
+import matplotlib.colors
+
+from .. import ImagePlotChecker, InvalidPlotError, MemoryBudgetError
+
+
+def test_empty_plot(axis):
+    """Is an error thrown when there is nothing plotted?"""
+    with pytest.raises(InvalidPlotError):
+        ImagePlotChecker(axis)
+
+
+def test_multiple_images(axis):
+    """Is an error thrown when there is more than one image?"""
+    axis.imshow(np.random.rand(5, 5))
+    axis.imshow(np.random.rand(5, 5))
+    with pytest.raises(InvalidPlotError):
+        ImagePlotChecker(axis)
+
+
+def test_array(axis):
+    """Is the image data correct?"""
+    err = 1e-12
+    x = np.random.rand(20, 30)
+    axis.imshow(x + err)
+
+    pc = ImagePlotChecker(axis)
+    with pytest.raises(AssertionError):
+        pc.assert_array_equal(x)
+    with pytest.raises(AssertionError):
+        pc.assert_array_allclose(x, rtol=1e-13)
+    with pytest.raises(AssertionError):
+        pc.assert_array_allclose(x[:10])
+    pc.assert_array_allclose(x)
+    pc.assert_array_equal(x + err)
+
+
+def test_array_chunked(axis, monkeypatch):
+    """Are large images compared in chunks?"""
+    monkeypatch.setattr(ImagePlotChecker, "_chunk_size", 100)
+    x = np.random.rand(50, 40, 3)
+    axis.imshow(x)
+
+    pc = ImagePlotChecker(axis)
+    pc.assert_array_equal(x)
+
+    y = x.copy()
+    y[37, 5, 1] = 0
+    with pytest.raises(AssertionError) as excinfo:
+        pc.assert_array_equal(y)
+    assert "rows 37 to 37" in str(excinfo.value)
+
+
+def test_memory_budget(axis):
+    """Are images compared in chunks that fit within the memory budget?"""
+    x = np.random.rand(50, 40, 3)
+    axis.imshow(x)
+
+    pc = ImagePlotChecker(axis)
+    pc.memory_budget = 4 * 8 * 40 * 3 * 10
+    y = x.copy()
+    y[37, 5, 1] = 0
+    with pytest.raises(AssertionError) as excinfo:
+        pc.assert_array_equal(y)
+    assert "rows 30 to 39" in str(excinfo.value)
+
+    # not even a single row fits
+    pc.memory_budget = 100
+    with pytest.raises(MemoryBudgetError):
+        pc.assert_array_equal(x)
+
+    # the budget is kept by snapshots
+    snapshot = pickle.loads(pickle.dumps(pc))
+    assert snapshot.memory_budget == 100
+    with pytest.raises(MemoryBudgetError):
+        snapshot.assert_array_equal(x)
+
+
+def test_array_downsample(axis, monkeypatch):
+    """Can images be compared after downsampling?"""
+    monkeypatch.setattr(ImagePlotChecker, "_chunk_size", 100)
+    x = np.random.rand(64, 48)
+    axis.imshow(x)
+
+    pc = ImagePlotChecker(axis)
+    pc.assert_array_allclose(x, downsample=4)
+
+    # swapping pixels within a block doesn't change the downsampled image
+    y = x.copy()
+    y[0, 0], y[1, 1] = x[1, 1], x[0, 0]
+    with pytest.raises(AssertionError):
+        pc.assert_array_allclose(y)
+    pc.assert_array_allclose(y, downsample=4)
+
+    with pytest.raises(AssertionError):
+        pc.assert_array_allclose(x + 1, downsample=4)
+    with pytest.raises(AssertionError):
+        pc.assert_array_allclose(x[:32], downsample=4)
+
+
+def test_properties(axis):
+    """Are the extent, cmap, clim and interpolation correct?"""
+    axis.imshow(
+        np.random.rand(10, 10), extent=(0, 1, 2, 3), cmap='gray',
+        vmin=-1, vmax=2, interpolation='nearest')
+
+    pc = ImagePlotChecker(axis)
+    pc.assert_extent_equal((0, 1, 2, 3))
+    pc.assert_extent_allclose((0, 1, 2, 3))
+    pc.assert_cmap_equal('gray')
+    pc.assert_clim_equal((-1, 2))
+    pc.assert_clim_allclose((-1, 2))
+    pc.assert_interpolation_equal('nearest')
+    assert (pc.norm.vmin, pc.norm.vmax) == (-1, 2)
+
+    with pytest.raises(AssertionError):
+        pc.assert_extent_equal((0, 1, 2, 4))
+    with pytest.raises(AssertionError):
+        pc.assert_cmap_equal('viridis')
+    with pytest.raises(AssertionError):
+        pc.assert_clim_equal((0, 1))
+    with pytest.raises(AssertionError):
+        pc.assert_interpolation_equal('bilinear')
+
+
+def test_snapshot_norm(axis):
+    """Do snapshots store the norm without storing the matplotlib object?"""
+    axis.imshow(np.random.rand(10, 10) + 1, norm=matplotlib.colors.LogNorm(1, 2))
+
+    snapshot = pickle.loads(pickle.dumps(ImagePlotChecker(axis)))
+    assert 'norm' not in snapshot._frozen
+    assert isinstance(snapshot.norm, matplotlib.colors.LogNorm)
+    assert (snapshot.norm.vmin, snapshot.norm.vmax) == (1, 2)
+
+
+def test_snapshot_norm_arguments(axis):
+    """Do snapshots recreate norms that take other arguments than their
+    limits, and fail clearly for norms that they can't recreate?"""
+    for norm in (matplotlib.colors.TwoSlopeNorm(0.5, -1, 3),
+                 matplotlib.colors.CenteredNorm(1, 2),
+                 matplotlib.colors.PowerNorm(2, 0, 1)):
+        axis.clear()
+        axis.imshow(np.random.rand(10, 10), norm=norm)
+        snapshot = pickle.loads(pickle.dumps(ImagePlotChecker(axis)))
+        assert type(snapshot.norm) is type(norm)
+        np.testing.assert_allclose(snapshot.norm([-1, 0.5, 2]), norm([-1, 0.5, 2]))
+
+    axis.clear()
+    axis.imshow(np.random.rand(10, 10), norm=matplotlib.colors.BoundaryNorm([0, 0.5, 1], 2))
+    snapshot = pickle.loads(pickle.dumps(ImagePlotChecker(axis)))
+    with pytest.raises(InvalidPlotError) as excinfo:
+        snapshot.norm
+    assert 'BoundaryNorm' in str(excinfo.value)
@@ -1,7 +1,10 @@
+import pickle
+
 import pytest
 import numpy as np
+import matplotlib.lines
 
-from .. import LinePlotChecker, InvalidPlotError
+from .. import LinePlotChecker, InvalidPlotError, MemoryBudgetError
 
 
 def test_empty_plot(axis):
@@ -422,6 +425,61 @@ def test_legend_handles_and_labels(axis):
     pc.assert_labels_equal(['foo', 'bar', 'baz'])
 
 
+def test_legend_labels_per_line(axis):
+    """Are the legend labels matched up with the lines they belong to?"""
+    axis.plot([1, 2.17, 3.3, 4], [2.5, 3.25, 4.4, 5], 'r', label='foo')
+    axis.plot([2.17, 3.3, 4], [3.25, 4.4, 5], 'g')
+    axis.plot([1, 2.17, 3.3], [2.5, 3.25, 4.4], 'b', label='bar')
+
+    # no legend yet
+    pc = LinePlotChecker(axis)
+    pc.assert_legend_labels_equal([None, None, None])
+
+    axis.legend(loc='best')
+    pc = LinePlotChecker(axis)
+    pc.assert_labels_equal(['foo', 'bar'])
+    pc.assert_legend_labels_equal(['foo', None, 'bar'])
+    with pytest.raises(AssertionError):
+        pc.assert_legend_labels_equal(['foo', 'bar', None])
+
+    pc.find_permutation('colors', ['b', 'r', 'g'])
+    pc.assert_legend_labels_equal(['bar', 'foo', None])
+
+
+def test_legend_labels_per_line_explicit(axis):
+    """Are the legend labels matched up with the lines when the labels (or
+    handles) are passed into the legend call?"""
+    l0, = axis.plot([1, 2, 3], [2, 3, 4])
+    l1, = axis.plot([1, 2, 3], [4, 3, 2])
+
+    axis.legend(['train', 'test'])
+    pc = LinePlotChecker(axis)
+    pc.assert_legend_labels_equal(['train', 'test'])
+
+    l0.set_label('x')
+    l1.set_label('y')
+    axis.legend([l1, l0], ['y', 'x'])
+    pc = LinePlotChecker(axis)
+    pc.assert_labels_equal(['y', 'x'])
+    pc.assert_legend_labels_equal(['x', 'y'])
+
+    axis.legend([l1, l0], ['x', 'y'])
+    pc = LinePlotChecker(axis)
+    pc.assert_legend_labels_equal(['y', 'x'])
+
+
+def test_legend_labels_unmatched(axis):
+    """Are legend entries that don't look like any of the lines left out,
+    rather than given to another line?"""
+    axis.plot([1, 2, 3], [2, 3, 4], color='r', label='train')
+    axis.plot([1, 2, 3], [4, 3, 2], color='b', label='test')
+
+    proxy = matplotlib.lines.Line2D([], [], color='g')
+    axis.legend([proxy, axis.lines[1]], ['train', 'test'])
+    pc = LinePlotChecker(axis)
+    assert pc.legend_labels == [None, 'test']
+
+
 def test_alphas(axis):
     """Are the alphas correct?"""
     # first just try for a single line using rgb
@@ -506,3 +564,94 @@ def test_permutations(axis):
         pc.find_permutation('labels', labels[:-1])
     with pytest.raises(AssertionError):
         pc.find_permutation('labels', [x + 'a' for x in labels])
+
+
+def test_snapshot(axis):
+    x = [[1, 2, 3], [4, 5, 6]]
+    axis.plot(x[0], [3, 4, 5], 'r', label='foo')
+    axis.plot(x[1], [6, 7, 8], 'b', label='bar')
+    axis.legend()
+
+    pc = pickle.loads(pickle.dumps(LinePlotChecker(axis)))
+    pc.assert_num_lines(2)
+    pc.find_permutation('colors', ['b', 'r'])
+    pc.assert_x_data_equal(x[::-1])
+    pc.assert_legend_labels_equal(['bar', 'foo'])
+
+    # the permutation is part of the snapshot
+    pc = pickle.loads(pickle.dumps(pc))
+    pc.assert_x_data_equal(x[::-1])
+
+
+def test_scaled_comparison(axis):
+    x = np.array([1.0, 2.0, 3.0])
+    y = np.array([1.0, 100.0, 1e6])
+    axis.plot(x, y)
+    axis.set_yscale('log')
+
+    pc = LinePlotChecker(axis)
+    with pytest.raises(AssertionError):
+        pc.assert_y_data_allclose([y * 1.01], atol=0.005, rtol=0)
+
+    # on a log scale, a relative error is a small absolute error
+    pc.scaled_comparison = True
+    pc.assert_y_data_allclose([y * 1.01], atol=0.005, rtol=0)
+    pc.assert_x_data_allclose([x + 0.001], atol=0.005, rtol=0)
+    with pytest.raises(AssertionError):
+        pc.assert_y_data_allclose([y * 1.02], atol=0.005, rtol=0)
+
+    # the option and the scales are kept by snapshots
+    for snapshot in (pc.snapshot(), pickle.loads(pickle.dumps(pc))):
+        assert snapshot.scaled_comparison
+        snapshot.assert_y_data_allclose([y * 1.01], atol=0.005, rtol=0)
+        with pytest.raises(AssertionError):
+            snapshot.assert_y_data_allclose([y * 1.02], atol=0.005, rtol=0)
+
+    # the transformed data is recomputed if the scale changes
+    axis.set_yscale('linear')
+    with pytest.raises(AssertionError):
+        pc.assert_y_data_allclose([y * 1.01], atol=0.005, rtol=0)
+
+    # snapshots aren't affected by the change
+    snapshot.assert_y_data_allclose([y * 1.01], atol=0.005, rtol=0)
+
+
+def test_dates(axis):
+    x = np.arange('2020-01-01', '2020-01-11', dtype='datetime64[h]')
+    y = np.arange(len(x))
+    axis.plot(x, y)
+
+    pc = LinePlotChecker(axis)
+    pc.assert_x_data_equal([x])
+    pc.assert_x_data_allclose([x + np.timedelta64(1, 's')], atol=1e-4)
+    with pytest.raises(AssertionError):
+        pc.assert_x_data_allclose([x + np.timedelta64(1, 'h')], atol=1e-4)
+
+    # arrays of dates that are modified in place are converted again
+    expected = x.copy()
+    pc.assert_x_data_equal([expected])
+    expected[0] += np.timedelta64(1, 'h')
+    with pytest.raises(AssertionError):
+        pc.assert_x_data_equal([expected])
+
+    pc.assert_x_data_equal([list(x.astype(object))])
+
+
+def test_memory_budget(axis):
+    """Are lines compared in chunks that fit within the memory budget?"""
+    x = np.arange(1000.0)
+    axis.plot(x, x ** 2)
+
+    pc = LinePlotChecker(axis)
+    pc.memory_budget = 4 * 8 * 100
+    pc.assert_x_data_equal([x])
+    pc.assert_y_data_allclose([x ** 2])
+
+    y = x ** 2
+    y[250] += 1
+    with pytest.raises(AssertionError):
+        pc.assert_y_data_allclose([y])
+
+    pc.memory_budget = 8
+    with pytest.raises(MemoryBudgetError):
+        pc.assert_x_data_equal([x])
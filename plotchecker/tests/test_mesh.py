@@ -0,0 +1,126 @@
+import pytest
+import numpy as np
+import matplotlib
+import matplotlib.pyplot as plt
+
+from .. import MeshPlotChecker, ContourPlotChecker, InvalidPlotError, MemoryBudgetError
+
+
+def test_empty_plot(axis):
+    """Is an error thrown when there is nothing plotted?"""
+    with pytest.raises(InvalidPlotError):
+        MeshPlotChecker(axis)
+    with pytest.raises(InvalidPlotError):
+        ContourPlotChecker(axis)
+
+
+def test_memory_budget(axis):
+    """Are meshes compared in chunks that fit within the memory budget?"""
+    x = np.linspace(0, 1, 31)
+    y = np.linspace(2, 3, 21)
+    c = np.random.rand(20, 30)
+    axis.pcolormesh(x, y, c)
+
+    pc = MeshPlotChecker(axis)
+    pc.memory_budget = 4 * 8 * 30 * 5
+    pc.assert_x_coordinates_equal(x)
+    d = c.copy()
+    d[12, 3] += 1
+    with pytest.raises(AssertionError) as excinfo:
+        pc.assert_values_allclose(d)
+    assert "rows 10 to 14" in str(excinfo.value)
+
+    pc.memory_budget = 100
+    with pytest.raises(MemoryBudgetError):
+        pc.assert_values_equal(c)
+
+
+def test_mesh(axis):
+    """Are the coordinates and values of a mesh correct?"""
+    x = np.linspace(0, 1, 31)
+    y = np.linspace(2, 3, 21)
+    c = np.random.rand(20, 30)
+    axis.pcolormesh(x, y, c, cmap='gray', vmin=0, vmax=1)
+
+    pc = MeshPlotChecker(axis)
+    pc.assert_x_coordinates_equal(x)
+    pc.assert_y_coordinates_equal(y)
+    pc.assert_x_coordinates_allclose(np.meshgrid(x, y)[0])
+    pc.assert_y_coordinates_allclose(np.meshgrid(x, y)[1])
+    pc.assert_values_equal(c)
+    pc.assert_values_allclose(c + 1e-12)
+    pc.assert_values_allclose(c, downsample=5)
+    pc.assert_cmap_equal('gray')
+    pc.assert_clim_equal((0, 1))
+
+    with pytest.raises(AssertionError):
+        pc.assert_x_coordinates_equal(y)
+    with pytest.raises(AssertionError):
+        pc.assert_y_coordinates_allclose(y + 1)
+    with pytest.raises(AssertionError):
+        pc.assert_values_equal(c + 1e-12)
+    with pytest.raises(AssertionError):
+        pc.assert_values_allclose(c.T)
+    with pytest.raises(AssertionError):
+        pc.assert_values_allclose(c + 1, downsample=5)
+
+
+def test_hist2d(axis):
+    """Are the values of a 2D histogram correct?"""
+    x = np.random.rand(100)
+    y = np.random.rand(100)
+    counts, xedges, yedges = np.histogram2d(x, y, bins=5)
+    axis.hist2d(x, y, bins=5)
+
+    pc = MeshPlotChecker(axis)
+    pc.assert_x_coordinates_allclose(xedges)
+    pc.assert_y_coordinates_allclose(yedges)
+    pc.assert_values_equal(counts.T)
+
+
+def test_contour(axis):
+    """Are the levels and segments of contours correct?"""
+    x, y = np.meshgrid(np.linspace(0, 1, 20), np.linspace(0, 1, 15))
+    z = x * y
+    fig, ax = plt.subplots()
+    expected = ax.contour(x, y, z, levels=[0.2, 0.5])
+    plt.close(fig)
+
+    axis.contour(x, y, z, levels=[0.2, 0.5])
+
+    pc = ContourPlotChecker(axis)
+    assert not pc.filled
+    pc.assert_levels_equal([0.2, 0.5])
+    pc.assert_levels_allclose([0.2, 0.5])
+    pc.assert_segments_equal(expected.allsegs)
+    pc.assert_segments_allclose(expected.allsegs)
+
+    with pytest.raises(AssertionError):
+        pc.assert_levels_equal([0.2, 0.6])
+    with pytest.raises(AssertionError):
+        pc.assert_segments_allclose(expected.allsegs[:1])
+    with pytest.raises(AssertionError):
+        pc.assert_segments_allclose(
+            [[s + 0.1 for s in level] for level in expected.allsegs])
+
+
+def test_contour_matplotlib_version(axis, monkeypatch):
+    """Is a clear error thrown for contours on old versions of matplotlib?"""
+    x, y = np.meshgrid(np.linspace(0, 1, 20), np.linspace(0, 1, 15))
+    axis.contour(x, y, x * y)
+
+    monkeypatch.setattr(matplotlib, '__version__', '3.7.2')
+    with pytest.raises(InvalidPlotError) as excinfo:
+        ContourPlotChecker(axis)
+    assert '3.8' in str(excinfo.value)
+
+
+def test_contourf(axis):
+    """Are filled contours detected?"""
+    x, y = np.meshgrid(np.linspace(0, 1, 20), np.linspace(0, 1, 15))
+    axis.contourf(x, y, x * y, levels=[0, 0.5, 1], cmap='gray')
+
+    pc = ContourPlotChecker(axis)
+    assert pc.filled
+    pc.assert_levels_equal([0, 0.5, 1])
+    pc.assert_cmap_equal('gray')
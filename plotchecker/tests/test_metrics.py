@@ -0,0 +1,130 @@
+import json
+
+import pytest
+
+from .. import LinePlotChecker, InvalidPlotError, run_rubric, metrics
+from ..metrics import MetricsRegistry
+
+
+@pytest.fixture
+def registry(request):
+    metrics.registry.reset()
+    request.addfinalizer(metrics.registry.reset)
+    return metrics.registry
+
+
+def test_counters_and_histograms():
+    registry = MetricsRegistry(buckets=(1, 2, 4))
+    registry.inc('requests', {'status': 200})
+    registry.inc('requests', {'status': 200}, 2)
+    registry.inc('requests', {'status': 400})
+    for value in (0.5, 1.5, 1.5, 3, 10):
+        registry.observe('latency', value)
+
+    assert registry.quantile('latency', 0.5) == 1.75
+    assert registry.quantile('latency', 0.99) == 4
+    assert registry.quantile('missing', 0.5) is None
+
+    snapshot = registry.to_json()
+    assert snapshot['counters'] == [
+        {'name': 'requests', 'labels': {'status': '200'}, 'value': 3},
+        {'name': 'requests', 'labels': {'status': '400'}, 'value': 1}]
+    hist, = snapshot['histograms']
+    assert hist['count'] == 5
+    assert hist['sum'] == 16.5
+    assert hist['buckets'] == [[1, 1], [2, 2], [4, 1], [None, 1]]
+    assert hist['p50'] == 1.75
+    json.dumps(snapshot)
+
+    text = registry.to_prometheus()
+    assert '# TYPE requests counter\nrequests{status="200"} 3.0\n' in text
+    assert 'latency_bucket{le="2.0"} 3\n' in text
+    assert 'latency_bucket{le="+Inf"} 5\n' in text
+    assert 'latency_count 5\n' in text
+
+
+def test_merge_and_drain():
+    worker = MetricsRegistry(buckets=(1, 2, 4))
+    worker.inc('requests')
+    worker.observe('latency', 1.5)
+
+    server = MetricsRegistry(buckets=(1, 2, 4))
+    server.inc('requests')
+    server.merge(worker.drain())
+    assert worker.to_json() == {'counters': [], 'histograms': []}
+    assert server.to_json()['counters'][0]['value'] == 2
+    assert server.to_json()['histograms'][0]['count'] == 1
+
+    with pytest.raises(ValueError):
+        MetricsRegistry().merge(server.to_json())
+
+
+def test_instrumentation(registry, axis):
+    with pytest.raises(InvalidPlotError):
+        LinePlotChecker(axis)
+    # other errors are passed on as they are
+    with pytest.raises(AttributeError):
+        LinePlotChecker(None)
+
+    axis.plot([1, 2, 3], [4, 5, 6])
+    pc = LinePlotChecker(axis)
+    run_rubric(pc, [('assert_num_lines', [1]), ('assert_num_lines', [2])])
+    with pytest.raises(AttributeError):
+        run_rubric(pc, [('assert_foo', [])])
+
+    counters = dict(
+        ((c['name'], tuple(sorted(c['labels'].items()))), c['value'])
+        for c in registry.to_json()['counters'])
+    assert counters == {
+        ('plotchecker_checkers_total', (('checker', 'LinePlotChecker'), ('result', 'error'))): 1,
+        ('plotchecker_checkers_total', (('checker', 'LinePlotChecker'), ('result', 'invalid'))): 1,
+        ('plotchecker_checkers_total', (('checker', 'LinePlotChecker'), ('result', 'ok'))): 1,
+        ('plotchecker_rubric_items_total', (('item', 'assert_num_lines'), ('result', 'failed'))): 1,
+        ('plotchecker_rubric_items_total', (('item', 'assert_num_lines'), ('result', 'passed'))): 1,
+        ('plotchecker_rubric_items_total', (('item', 'assert_foo'), ('result', 'error'))): 1,
+        ('plotchecker_assertions_total', (
+            ('assertion', 'assert_num_lines'), ('checker', 'LinePlotChecker'),
+            ('result', 'failed'))): 1,
+        ('plotchecker_assertions_total', (
+            ('assertion', 'assert_num_lines'), ('checker', 'LinePlotChecker'),
+            ('result', 'passed'))): 1,
+    }
+    assert registry.quantile(
+        'plotchecker_rubric_item_seconds', 0.99, {'item': 'assert_num_lines'}) is not None
+
+    # snapshots aren't counted as new checkers
+    pc.snapshot()
+    assert len(registry.to_json()['counters']) == 8
+
+
+def test_assertion_instrumentation(registry, axis):
+    """Are assertions that are called directly (rather than through a
+    rubric) recorded, without recording the assertions that they call?"""
+    axis.plot([1, 2, 3], [4, 5, 6])
+    pc = LinePlotChecker(axis)
+    pc.assert_x_data_allclose([[1, 2, 3]])
+    with pytest.raises(AssertionError):
+        pc.assert_y_data_equal([[1, 2, 3]])
+    pc.snapshot().assert_x_data_allclose([[1, 2, 3]])
+
+    counters = dict(
+        ((c['labels']['assertion'], c['labels']['result']), c['value'])
+        for c in registry.to_json()['counters']
+        if c['name'] == 'plotchecker_assertions_total')
+    assert counters == {
+        ('assert_x_data_allclose', 'passed'): 2,
+        ('assert_y_data_equal', 'failed'): 1,
+    }
+    assert registry.quantile(
+        'plotchecker_assertion_seconds', 0.99,
+        {'checker': 'LinePlotChecker', 'assertion': 'assert_y_data_equal'}) is not None
+
+
+def test_write(registry, tmpdir):
+    registry.inc('requests')
+    metrics.write_prometheus(str(tmpdir.join('metrics.prom')))
+    metrics.write_json(str(tmpdir.join('metrics.json')))
+
+    assert tmpdir.join('metrics.prom').read() == '# TYPE requests counter\nrequests 1.0\n'
+    with open(str(tmpdir.join('metrics.json'))) as fh:
+        assert json.load(fh)['counters'][0]['value'] == 1
@@ -0,0 +1,59 @@
+import itertools
+
+import numpy as np
+
+from .. import PlotChecker, PlotHashIndex
+from ..phash import perceptual_hash, hamming_distance
+
+
+def test_perceptual_hash(axes_list):
+    x = np.linspace(0, 10, 100)
+    axes_list[0].plot(x, np.sin(x))
+    axes_list[1].plot(x, np.sin(x) + 1e-3)
+    axes_list[2].plot(x, np.cos(x), 'r--')
+    hashes = [PlotChecker(ax).perceptual_hash for ax in axes_list]
+
+    assert hashes[0] < 2 ** 64
+    assert hamming_distance(hashes[0], hashes[1]) <= 2
+    assert hamming_distance(hashes[0], hashes[2]) > 8
+
+
+def test_perceptual_hash_resized():
+    yy, xx = np.mgrid[0:40, 0:60]
+    g = np.exp(-((xx - 20) ** 2 + (yy - 25) ** 2) / 60.0)
+    g += 0.5 * ((xx > 35) & (yy < 15)) + 0.2 * np.sin((xx + 2 * yy) / 9.0)
+    x = np.dstack([g, g, g]) / 2 + 0.2
+    big = np.repeat(np.repeat(x, 3, axis=0), 3, axis=1)
+    assert hamming_distance(perceptual_hash(x), perceptual_hash(big)) <= 4
+
+    # images smaller than the hash are upsampled
+    assert perceptual_hash(x[:10, :10]) < 2 ** 64
+
+
+def test_hash_index():
+    rng = np.random.RandomState(1)
+    hashes = [int(rng.randint(0, 2 ** 16)) for _ in range(200)]
+    hashes.append(hashes[0])
+
+    index = PlotHashIndex()
+    for i, h in enumerate(hashes):
+        index.add(i, h)
+    assert len(index) == len(hashes)
+
+    # compare to a brute-force search
+    for max_distance in (0, 2, 3):
+        expected = sorted(
+            (i, j) for i, j in itertools.combinations(range(len(hashes)), 2)
+            if hamming_distance(hashes[i], hashes[j]) <= max_distance)
+        pairs = index.near_duplicates(max_distance)
+        assert sorted(tuple(sorted(p[:2])) for p in pairs) == expected
+        for i, j, d in pairs:
+            assert d == hamming_distance(hashes[i], hashes[j])
+
+        matches = index.query(hashes[5], max_distance)
+        assert sorted(k for k, _ in matches) == sorted(
+            i for i in range(len(hashes))
+            if hamming_distance(hashes[i], hashes[5]) <= max_distance)
+
+    assert PlotHashIndex().near_duplicates(3) == []
+    assert PlotHashIndex().query(0, 3) == []
@@ -0,0 +1,96 @@
+import pytest
+import numpy as np
+
+from .. import PlotChecker, LinePlotChecker
+from .. import raster
+
+
+def test_raster(axes):
+    axes[0].plot([0, 1], [0, 1])
+    pc = PlotChecker(axes[0])
+
+    image = pc.raster
+    assert image.ndim == 3
+    assert image.shape[2] == 4
+    assert image.dtype == np.uint8
+    assert not image.flags.writeable
+
+    # the raster is a view onto a single render of the whole figure
+    buf = raster.render(axes[0].figure)['buffer']
+    assert image.base is not None
+    assert np.shares_memory(image, buf)
+    assert np.shares_memory(PlotChecker(axes[1]).raster, buf)
+    assert image.shape[1] < buf.shape[1]
+
+
+def test_render_cache(axis):
+    axis.plot([0, 1], [0, 1])
+    fig = axis.figure
+    render = raster.render(fig)
+    assert raster.render(fig) is render
+
+    # rendering doesn't invalidate the checker cache
+    pc = LinePlotChecker.cached(axis)
+    pc.raster
+    assert LinePlotChecker.cached(axis) is pc
+
+    # modifying the plot invalidates the render
+    axis.plot([0, 1], [1, 0])
+    assert raster.render(fig) is not render
+
+    # even if the figure is drawn by some other means in the meantime
+    render = raster.render(fig)
+    axis.lines[0].set_color('r')
+    fig.canvas.draw()
+    assert raster.render(fig) is not render
+
+    # rendering leaves the stale flags alone
+    axis.lines[0].set_color('b')
+    raster.render(fig)
+    assert axis.lines[0].stale
+
+
+def test_assert_raster_allclose(axes_list):
+    axes = axes_list
+    for ax in axes:
+        ax.plot([0, 1], [0, 1], 'b-')
+        ax.set_title('foo')
+    axes[2].plot([0, 1], [1, 0], 'r-')
+
+    pc = PlotChecker(axes[0])
+    pc.assert_raster_allclose(axes[1])
+    pc.assert_raster_allclose(PlotChecker(axes[1]))
+    pc.assert_raster_allclose(np.array(pc.raster), downsample=None)
+    with pytest.raises(AssertionError):
+        pc.assert_raster_allclose(axes[2])
+
+    # images must have the same size
+    with pytest.raises(AssertionError):
+        pc.assert_raster_allclose(pc.raster[1:])
+
+
+def test_assert_raster_similar(axes_list):
+    axes = axes_list
+    for ax in axes:
+        ax.plot([0, 1], [0, 1], 'b-')
+        ax.set_title('foo')
+    axes[2].plot([0, 1], [1, 0], 'b-')
+
+    pc = PlotChecker(axes[0])
+    pc.assert_raster_similar(axes[1])
+    pc.assert_raster_similar(pc.raster / 255, downsample=None)
+    with pytest.raises(AssertionError):
+        pc.assert_raster_similar(axes[2])
+
+
+def test_metrics():
+    x = np.random.rand(32, 32, 3)
+    np.testing.assert_allclose(raster.rms(x, x), 0)
+    np.testing.assert_allclose(raster.rms(x, x + 0.5), 0.5)
+    np.testing.assert_allclose(raster.ssim(x, x), 1)
+    assert raster.ssim(x, 1 - x) < 0
+
+    y = (x * 255).astype(np.uint8)
+    np.testing.assert_allclose(raster.as_image(y), y / 255)
+    with pytest.raises(ValueError):
+        raster.as_image(x[..., 0])
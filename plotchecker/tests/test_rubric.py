@@ -0,0 +1,55 @@
+import pytest
+
+from .. import LinePlotChecker, ScatterPlotChecker, run_rubric, RubricResult
+
+
+def test_run_rubric(axis):
+    axis.plot([1, 2, 3], [4, 5, 6], label='foo')
+    axis.set_title('bar')
+    pc = LinePlotChecker(axis)
+
+    def check_title(pc):
+        pc.assert_title_equal('bar')
+
+    results = run_rubric(pc, [
+        ('assert_num_lines', [1]),
+        ('assert_num_lines', [2]),
+        ('assert_x_data_allclose', [[[1, 2, 3]]], {'rtol': 1e-5}),
+        check_title,
+        ('assert_legend_labels_equal', [['bar']]),
+    ])
+
+    assert [r.name for r in results] == [
+        'assert_num_lines', 'assert_num_lines', 'assert_x_data_allclose',
+        'check_title', 'assert_legend_labels_equal']
+    assert [r.passed for r in results] == [True, False, True, True, False]
+    assert results[0] == RubricResult('assert_num_lines', True, None)
+    assert 'incorrect number of lines' in results[1].message
+
+
+def test_invalid_rubric(axis):
+    axis.plot([1, 2, 3], [4, 5, 6])
+    pc = LinePlotChecker(axis)
+
+    with pytest.raises(ValueError):
+        run_rubric(pc, ['assert_num_lines'])
+
+    # errors other than failed assertions are not caught
+    with pytest.raises(AttributeError):
+        run_rubric(pc, [('assert_foo', [])])
+
+
+def test_memory_budget(axis):
+    """Does exceeding the memory budget fail the item, without stopping the
+    rest of the rubric?"""
+    axis.plot([1, 2, 3], [4, 5, 6], 'o')
+    axis.plot([4, 5, 6], [7, 8, 9], 'o')
+    pc = ScatterPlotChecker(axis)
+    pc.memory_budget = 10
+
+    results = run_rubric(pc, [
+        ('assert_num_points', [6]),
+        ('assert_colors_equal', ['b']),
+        ('assert_num_points', [6])])
+    assert [r.passed for r in results] == [True, False, True]
+    assert 'memory budget' in results[1].message
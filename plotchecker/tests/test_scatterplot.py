@@ -1,7 +1,7 @@
 import numpy as np
 import pytest
 
-from .. import ScatterPlotChecker, InvalidPlotError
+from .. import ScatterPlotChecker, InvalidPlotError, MemoryBudgetError
 
 
 def test_empty_plot(axis):
@@ -441,3 +441,94 @@ def test_bad_colors_and_sizes(axis):
 
     pc.assert_colors_equal(c[[0]])
     pc.assert_sizes_equal(s[0])
+
+
+def test_legend_labels(axis):
+    axis.scatter([1, 2, 3], [4, 5, 6], label='foo')
+    axis.plot([7, 8], [9, 10], 'o', label='bar')
+    axis.scatter([11], [12])
+
+    pc = ScatterPlotChecker(axis)
+    pc.assert_legend_labels_equal(None)
+
+    axis.legend()
+    pc = ScatterPlotChecker(axis)
+    pc.assert_legend_labels_equal(['bar', 'bar', 'foo', 'foo', 'foo', None])
+    with pytest.raises(AssertionError):
+        pc.assert_legend_labels_equal('foo')
+
+
+def test_lines_and_collections(axis):
+    """Are the styles of lines with several points each repeated for all of
+    their points, before the points of the collections?"""
+    axis.plot([1, 2, 3], [4, 5, 6], 'ro', markersize=2)
+    axis.plot([], [], 'bo')
+    axis.plot([7], [8], 'go', alpha=0.5, markersize=3)
+    axis.scatter([9, 10], [11, 12], c='k', s=16, label='dots')
+    axis.legend()
+
+    pc = ScatterPlotChecker(axis)
+    pc.assert_num_points(6)
+    pc.assert_x_data_equal([1, 2, 3, 7, 9, 10])
+    pc.assert_y_data_equal([4, 5, 6, 8, 11, 12])
+    pc.assert_colors_equal(['r', 'r', 'r', 'g', 'k', 'k'])
+    pc.assert_alphas_equal([1, 1, 1, 0.5, 1, 1])
+    pc.assert_sizes_equal([4, 4, 4, 9, 16, 16])
+    pc.assert_legend_labels_equal([None, None, None, None, 'dots', 'dots'])
+
+
+def test_memory_budget(axis):
+    """Is data that doesn't fit within the memory budget compared in chunks,
+    and is an error thrown for attributes that can't be?"""
+    x = np.arange(30000, dtype=float)
+    axis.plot(x[:10000], -x[:10000], 'o')
+    axis.plot(x[10000:20000], -x[10000:20000], 'o')
+    axis.scatter(x[20000:], -x[20000:])
+
+    pc = ScatterPlotChecker(axis)
+    pc.memory_budget = 300000
+    pc.assert_num_points(30000)
+    pc.assert_x_data_equal(x)
+    pc.assert_y_data_allclose(-x)
+    assert pc._line_points is None
+
+    y = -x
+    y[25000] += 1
+    with pytest.raises(AssertionError) as excinfo:
+        pc.assert_y_data_equal(y)
+    assert "rows 20000 to 29374" in str(excinfo.value)
+    with pytest.raises(AssertionError):
+        pc.assert_x_data_equal(x[:-1])
+
+    with pytest.raises(MemoryBudgetError):
+        pc.colors
+    with pytest.raises(MemoryBudgetError):
+        pc.assert_colors_equal('b')
+
+    pc.memory_budget = None
+    pc.assert_x_data_equal(x)
+    pc.colors
+
+
+def test_scaled_comparison(axis):
+    x = np.array([-1000.0, -1.0, 0.0, 1.0, 1000.0])
+    axis.scatter(x, x)
+    axis.set_xscale('symlog')
+
+    pc = ScatterPlotChecker(axis)
+    pc.scaled_comparison = True
+    pc.assert_x_data_allclose(x * 1.001, atol=0.002, rtol=0)
+    with pytest.raises(AssertionError):
+        pc.assert_y_data_allclose(x * 1.001, atol=0.002, rtol=0)
+
+
+def test_dates(axis):
+    x = np.arange('2020-01-01', '2020-03-01', dtype='datetime64[D]')
+    axis.scatter(x, np.arange(len(x)))
+
+    pc = ScatterPlotChecker(axis)
+    pc.assert_x_data_equal(x)
+    pc.assert_x_data_allclose(x, rtol=0)
+    with pytest.raises(AssertionError):
+        pc.assert_x_data_equal(x + 1)
+    pc.assert_y_data_equal(np.arange(len(x)))
@@ -0,0 +1,196 @@
+import json
+import os
+import socket
+import threading
+import time
+from http.client import HTTPConnection
+
+import pytest
+
+from .. import LinePlotChecker
+from ..server import (
+    GradingServer, UnixGradingServer, encode_request, encode_snapshot_request,
+    request_headers, main)
+
+
+class UnixHTTPConnection(HTTPConnection):
+
+    def __init__(self, path):
+        HTTPConnection.__init__(self, 'localhost')
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+def post(conn, body, token, path='/grade', headers=None):
+    if headers is None:
+        headers = request_headers(token)
+    conn.request('POST', path, body=body, headers=headers)
+    response = conn.getresponse()
+    return response.status, json.loads(response.read().decode('utf-8'))
+
+
+def _hang(checker):
+    time.sleep(60)
+
+
+@pytest.fixture
+def server(request):
+    server = GradingServer(('127.0.0.1', 0), workers=1, quiet=True)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    def fin():
+        server.shutdown()
+        server.server_close()
+    request.addfinalizer(fin)
+
+    return server
+
+
+def test_grade(server, axis):
+    axis.plot([1, 2, 3], [4, 5, 6])
+    conn = HTTPConnection(*server.server_address)
+
+    rubric = [('assert_num_lines', [1]), ('assert_num_lines', [2])]
+    request = encode_request(axis.figure, 'LinePlotChecker', rubric)
+    status, response = post(conn, request, server.token)
+    assert status == 200
+    assert [r['passed'] for r in response['results']] == [True, False]
+    assert response['results'][0] == {
+        'name': 'assert_num_lines', 'passed': True, 'message': None}
+
+
+def test_grade_snapshot(server, axis):
+    axis.plot([1, 2, 3], [4, 5, 6])
+    conn = HTTPConnection(*server.server_address)
+
+    rubric = [('assert_num_lines', [1]), ('assert_x_data_equal', [[[1, 2, 3]]])]
+    request = encode_snapshot_request(LinePlotChecker(axis), rubric)
+    assert len(request) < len(encode_request(axis.figure, 'LinePlotChecker', rubric))
+
+    status, response = post(conn, request, server.token)
+    assert status == 200
+    assert [r['passed'] for r in response['results']] == [True, True]
+
+
+def test_errors(server, axis):
+    axis.plot([1, 2, 3], [4, 5, 6])
+    conn = HTTPConnection(*server.server_address)
+
+    request = encode_request(axis.figure, 'BarPlotChecker', [])
+    status, response = post(conn, request, server.token)
+    assert status == 400
+    assert response['error'].startswith('Invalid plot')
+
+    request = encode_request(axis.figure, 'run_rubric', [])
+    status, response = post(conn, request, server.token)
+    assert status == 400
+    assert response['error'].startswith('Invalid plot checker')
+
+    status, response = post(conn, b'foo', server.token)
+    assert status == 400
+
+    status, response = post(conn, b'', server.token, path='/foo')
+    assert status == 404
+
+
+def test_unauthenticated(server, axis):
+    """Are requests rejected unless they have the right content type and
+    token?"""
+    axis.plot([1, 2, 3], [4, 5, 6])
+    request = encode_request(axis.figure, 'LinePlotChecker', [('assert_num_lines', [1])])
+
+    # e.g. a cross-site request from a web page
+    conn = HTTPConnection(*server.server_address)
+    status, response = post(conn, request, None, headers={'Content-Type': 'text/plain'})
+    assert status == 415
+
+    conn = HTTPConnection(*server.server_address)
+    status, response = post(conn, request, 'foo')
+    assert status == 403
+
+    conn = HTTPConnection(*server.server_address)
+    headers = request_headers(server.token)
+    del headers['X-Plotchecker-Token']
+    status, response = post(conn, request, None, headers=headers)
+    assert status == 403
+
+    conn = HTTPConnection(*server.server_address)
+    status, response = post(conn, request, server.token)
+    assert status == 200
+
+
+def test_loopback_only():
+    with pytest.raises(ValueError):
+        GradingServer(('0.0.0.0', 0), workers=1, quiet=True)
+
+
+def test_timeout(axis):
+    server = GradingServer(('127.0.0.1', 0), workers=1, timeout=1, quiet=True)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    try:
+        axis.plot([1, 2, 3], [4, 5, 6])
+        conn = HTTPConnection(*server.server_address)
+        hang = encode_request(axis.figure, 'LinePlotChecker', [_hang])
+        ok = encode_request(axis.figure, 'LinePlotChecker', [('assert_num_lines', [1])])
+
+        # the stuck worker is replaced, so later requests still succeed
+        for _ in range(2):
+            status, response = post(conn, hang, server.token)
+            assert status == 504
+            status, response = post(conn, ok, server.token)
+            assert status == 200
+            assert response['results'][0]['passed']
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_unix_socket(tmpdir, axis):
+    path = str(tmpdir.join('plotchecker.sock'))
+    server = UnixGradingServer(path, workers=1, quiet=True)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    try:
+        axis.plot([1, 2, 3], [4, 5, 6])
+        request = encode_request(axis.figure, 'LinePlotChecker', [('assert_num_lines', [1])])
+        status, response = post(UnixHTTPConnection(path), request, server.token)
+        assert status == 200
+        assert response['results'][0]['passed']
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert not os.path.exists(path)
+
+
+def test_main_usage(capsys):
+    assert main([]) == 1
+
+
+def test_metrics(server, axis):
+    axis.plot([1, 2, 3], [4, 5, 6])
+    conn = HTTPConnection(*server.server_address)
+
+    rubric = [('assert_num_lines', [1]), ('assert_title_equal', ['foo'])]
+    request = encode_request(axis.figure, 'LinePlotChecker', rubric)
+    status, response = post(conn, request, server.token)
+    assert status == 200
+    assert 'metrics' not in response
+
+    conn.request('GET', '/metrics')
+    response = conn.getresponse()
+    assert response.status == 200
+    text = response.read().decode('utf-8')
+    assert 'plotchecker_rubric_items_total{item="assert_title_equal",result="failed"}' in text
+    assert 'plotchecker_checkers_total{checker="LinePlotChecker",result="ok"}' in text
+    assert 'plotchecker_request_seconds_count' in text
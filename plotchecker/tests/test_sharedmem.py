@@ -0,0 +1,142 @@
+import gc
+import multiprocessing
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+# plotchecker.sharedmem needs Python 3.8
+shared_memory = pytest.importorskip("multiprocessing.shared_memory")
+
+from .. import LinePlotChecker, ScatterPlotChecker, run_rubric
+from .. import sharedmem
+from ..sharedmem import SharedSnapshot, load_shared_snapshot
+
+
+def _grade(args):
+    descriptor, rubric = args
+    with load_shared_snapshot(descriptor) as pc:
+        return [r.passed for r in run_rubric(pc, rubric)]
+
+
+def test_shared_snapshot(axis):
+    x = np.arange(10000.0)
+    axis.plot(x, x ** 2)
+    axis.set_title("Squares")
+
+    with SharedSnapshot(LinePlotChecker(axis)) as shared:
+        # the arrays are not part of the descriptor
+        assert len(shared.descriptor) < x.nbytes
+
+        with load_shared_snapshot(shared.descriptor) as pc:
+            assert not pc.x_data[0].flags.writeable
+            pc.assert_x_data_equal([x])
+            pc.assert_y_data_equal([x ** 2])
+            pc.assert_title_equal("Squares")
+
+
+def test_small_arrays(axis):
+    axis.scatter([1, 2, 3], [4, 5, 6])
+
+    with SharedSnapshot(ScatterPlotChecker(axis)) as shared:
+        assert pickle.loads(shared.descriptor)['name'] is None
+        with load_shared_snapshot(shared.descriptor) as pc:
+            pc.assert_x_data_equal([1, 2, 3])
+            pc.assert_y_data_equal([4, 5, 6])
+
+
+def test_workers(axis):
+    x = np.arange(10000.0)
+    axis.plot(x, x ** 2)
+    rubric = [
+        ('assert_x_data_equal', [[x]]),
+        ('assert_num_lines', [2])
+    ]
+
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    with SharedSnapshot(LinePlotChecker(axis)) as shared:
+        pool = context.Pool(2)
+        try:
+            results = pool.map(_grade, [(shared.descriptor, rubric)] * 2, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+    assert results == [[True, False], [True, False]]
+
+
+def test_close(axis):
+    x = np.arange(10000.0)
+    axis.plot(x, x)
+
+    shared = SharedSnapshot(LinePlotChecker(axis))
+    name = pickle.loads(shared.descriptor)['name']
+    shared.close()
+    shared.close()
+
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+
+
+def test_arrays_outlive_snapshot(axis):
+    x = np.arange(10000.0)
+    axis.plot(x, x)
+
+    with SharedSnapshot(LinePlotChecker(axis)) as shared:
+        with load_shared_snapshot(shared.descriptor) as pc:
+            y = pc.y_data[0]
+        del pc
+        np.testing.assert_array_equal(y, x)
+        del y
+
+
+def test_detach_on_exit(axis, monkeypatch):
+    """Is the shared memory closed at the end of the with statement when
+    nothing from the snapshot is referenced any more?"""
+    x = np.arange(10000.0)
+    axis.plot(x, x)
+
+    attached = []
+    _attach = sharedmem._attach
+    def attach(name):
+        attached.append(_attach(name))
+        return attached[-1]
+    monkeypatch.setattr(sharedmem, '_attach', attach)
+
+    with SharedSnapshot(LinePlotChecker(axis)) as shared:
+        with load_shared_snapshot(shared.descriptor) as pc:
+            assert pc.y_data[0].sum() == x.sum()
+            del pc
+        assert attached[0]._mmap is None
+
+        with load_shared_snapshot(shared.descriptor) as pc:
+            y = pc.y_data[0]
+        assert attached[1]._mmap is not None
+        np.testing.assert_array_equal(y, x)
+
+
+def test_detach_without_collecting(axis, monkeypatch):
+    """Is the shared memory detached from without a garbage collection, even
+    when the snapshot is still referenced on exit?"""
+    x = np.arange(10000.0)
+    axis.plot(x, x)
+
+    def collect(*args):
+        raise AssertionError("garbage collection forced")
+    monkeypatch.setattr(gc, 'collect', collect)
+
+    def load(descriptor):
+        with load_shared_snapshot(descriptor) as pc:
+            return pc.y_data[0].sum()
+
+    with SharedSnapshot(LinePlotChecker(axis)) as shared:
+        load(shared.descriptor)
+        if os.path.isdir('/proc/self/fd'):
+            fds = len(os.listdir('/proc/self/fd'))
+            for i in range(20):
+                assert load(shared.descriptor) == x.sum()
+            assert len(os.listdir('/proc/self/fd')) == fds
+        else:
+            assert load(shared.descriptor) == x.sum()
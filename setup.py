@@ -15,7 +15,13 @@ def install_plotchecker(symlink):
     import mock
 
     # Hack to make docs build on RTD
-    MOCK_MODULES = ['numpy', 'matplotlib', 'matplotlib.pyplot', 'matplotlib.colors', 'matplotlib.markers']
+    MOCK_MODULES = [
+        'numpy', 'matplotlib', 'matplotlib.axes', 'matplotlib.axis',
+        'matplotlib.backends', 'matplotlib.backends.backend_agg',
+        'matplotlib.collections', 'matplotlib.colors', 'matplotlib.container',
+        'matplotlib.contour', 'matplotlib.dates', 'matplotlib.image',
+        'matplotlib.lines', 'matplotlib.markers', 'matplotlib.patches',
+        'matplotlib.pyplot', 'matplotlib.spines', 'matplotlib.text']
     for mod_name in MOCK_MODULES:
         sys.modules[mod_name] = mock.Mock()
 